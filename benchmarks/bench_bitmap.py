@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the bitmap row sets against Python sets.
+
+Builds the rows matched by a number of constraints, each selecting a share of
+all rows at random, and times intersecting and uniting them as ``set`` and as
+``Bitmap`` objects. The memory held by each representation is reported too.
+
+Usage::
+
+    $ python benchmarks/bench_bitmap.py
+    $ python benchmarks/bench_bitmap.py --rows 10000000
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+# pylint: disable=wrong-import-position
+from fiql_parser.bitmap import Bitmap
+
+
+def set_size(rows):
+    """Approximate bytes held by a ``set`` of ``int`` rows."""
+    # Small ints are cached by CPython; larger ones are 28 bytes each.
+    return sys.getsizeof(rows) + 28 * len(rows)
+
+
+def bitmap_size(bitmap):
+    """Bytes held by a ``Bitmap``."""
+    # pylint: disable=protected-access
+    return sys.getsizeof(bitmap._int())
+
+
+def time_operation(operation, min_time=0.2):
+    """Seconds taken by a single call of ``operation``."""
+    timer = timeit.Timer(operation)
+    number = 1
+    while True:
+        elapsed = min(timer.repeat(repeat=3, number=number))
+        if elapsed >= min_time:
+            return elapsed / number
+        number *= 2
+
+
+def run(rows, constraints, share, seed=0):
+    """Run the benchmarks.
+
+    Returns:
+        list: ``(name, set seconds, bitmap seconds)`` tuples and the memory
+        held by either.
+    """
+    rng = random.Random(seed)
+    sets = [set(row for row in range(rows) if rng.random() < share)
+            for _ in range(constraints)]
+    bitmaps = [Bitmap(rows_set) for rows_set in sets]
+    results = [
+        ('intersection',
+         time_operation(lambda: set.intersection(*sets)),
+         time_operation(lambda: Bitmap.intersection(*bitmaps))),
+        ('union',
+         time_operation(lambda: set.union(*sets)),
+         time_operation(lambda: Bitmap.union(*bitmaps))),
+        ('difference',
+         time_operation(lambda: sets[0] - sets[1]),
+         time_operation(lambda: bitmaps[0] - bitmaps[1])),
+        ('count',
+         time_operation(lambda: len(sets[0] & sets[1])),
+         time_operation(lambda: len(bitmaps[0] & bitmaps[1]))),
+    ]
+    memory = (sum(set_size(rows_set) for rows_set in sets),
+              sum(bitmap_size(bitmap) for bitmap in bitmaps))
+    return results, memory
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=1000000,
+                        help='number of rows (default: 1000000)')
+    parser.add_argument('--constraints', type=int, default=4,
+                        help='number of row sets combined (default: 4)')
+    parser.add_argument('--share', type=float, default=0.5,
+                        help='share of rows in each row set (default: 0.5)')
+    args = parser.parse_args(argv)
+
+    results, memory = run(args.rows, args.constraints, args.share)
+    print('%-14s %12s %12s %9s' % ('operation', 'set ms', 'bitmap ms',
+                                   'speedup'))
+    for name, set_seconds, bitmap_seconds in results:
+        print('%-14s %12.2f %12.2f %8.1fx' % (
+            name, set_seconds * 1000, bitmap_seconds * 1000,
+            set_seconds / bitmap_seconds))
+    print('%-14s %12.1f %12.1f %8.1fx' % (
+        'memory MiB', memory[0] / 2 ** 20, memory[1] / 2 ** 20,
+        memory[0] / memory[1]))
+
+
+if __name__ == '__main__':
+    main()
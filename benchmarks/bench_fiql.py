@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the FIQL parser.
+
+Generates corpora of FIQL strings varying in size (number of constraints),
+nesting depth, operator mix and percent-encoding density, and times the
+tokenizer, parser, serializer and the ``to_python``/``from_python``
+round-trip against each of them.
+
+For every benchmark the throughput (operations per second), the peak memory
+allocated during a single operation and the number of memory blocks the
+result of a single operation holds on to are reported.
+
+Usage::
+
+    $ python benchmarks/bench_fiql.py
+    $ python benchmarks/bench_fiql.py --save baseline.json
+    $ python benchmarks/bench_fiql.py --compare baseline.json
+
+The comparison reports the change in throughput of every benchmark relative
+to the saved baseline; positive numbers are speedups.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import argparse
+import gc
+import io
+import json
+import os
+import random
+import sys
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+# pylint: disable=wrong-import-position
+from fiql_parser import parse_str_to_expression
+from fiql_parser.parser import iter_parse, from_python_to_expression
+from fiql_parser.binary import dumps, loads
+from fiql_parser.expression import walk, _UNRENDERED
+
+
+COMPARISONS = ['==', '!=', '=gt=', '=ge=', '=lt=', '=le=']
+
+# Characters which must be percent-encoded in a selector or argument.
+ENCODED = ['%20', '%24', '%23', '%2F', '%26', '+']
+
+# (name, constraints, depth, or_ratio, pct_density)
+CORPORA = [
+    ('size-4', 4, 1, 0.5, 0.0),
+    ('size-32', 32, 1, 0.5, 0.0),
+    ('size-256', 256, 1, 0.5, 0.0),
+    ('depth-4', 32, 4, 0.5, 0.0),
+    ('depth-16', 32, 16, 0.5, 0.0),
+    ('ops-and', 32, 1, 0.0, 0.0),
+    ('ops-or', 32, 1, 1.0, 0.0),
+    ('pct-25', 32, 1, 0.5, 0.25),
+    ('pct-100', 32, 1, 0.5, 1.0),
+]
+
+
+def generate_constraint(rng, index, pct_density):
+    """Generate a single FIQL constraint."""
+    selector = 'field%d' % (index % 17)
+    argument = 'value%d' % rng.randint(0, 10000)
+    if rng.random() < pct_density:
+        argument = argument + rng.choice(ENCODED) + 'x'
+    if rng.random() < pct_density / 4:
+        selector = selector + rng.choice(ENCODED[:-1]) + 'y'
+    return selector + rng.choice(COMPARISONS) + argument
+
+
+def generate_fiql(rng, constraints, depth, or_ratio, pct_density):
+    """Generate a FIQL string.
+
+    Args:
+        rng (random.Random): Source of randomness.
+        constraints (integer): Number of constraints in the string.
+        depth (integer): Number of levels of (parenthesized) nesting.
+        or_ratio (float): Share of operators which are "OR".
+        pct_density (float): Share of arguments needing percent-encoding.
+
+    Returns:
+        string: The FIQL string.
+    """
+    per_level = max(1, constraints // depth)
+    fiql_str = ''
+    index = 0
+    # Build from the innermost group outwards.
+    for level in range(depth):
+        count = per_level if level < depth - 1 else \
+            constraints - per_level * (depth - 1)
+        parts = [generate_constraint(rng, index + i, pct_density)
+                 for i in range(max(1, count))]
+        index += len(parts)
+        if fiql_str:
+            parts.insert(rng.randint(0, len(parts)), '(' + fiql_str + ')')
+        fiql_str = parts[0]
+        for part in parts[1:]:
+            fiql_str += (',' if rng.random() < or_ratio else ';') + part
+    return fiql_str
+
+
+def generate_corpus(seed=0, count=20):
+    """Generate the corpus of FIQL strings for each of ``CORPORA``.
+
+    Returns:
+        list: ``(name, strings)`` tuples.
+    """
+    rng = random.Random(seed)
+    return [(name, [generate_fiql(rng, constraints, depth, or_ratio, pct)
+                    for _ in range(count)])
+            for name, constraints, depth, or_ratio, pct in CORPORA]
+
+
+def forget_renderings(expressions):
+    """Drop the kept string and python renderings of ``expressions`` (See
+    :class:`fiql_parser.expression.BaseExpression`), so that rendering them
+    again is timed rather than the lookup of the kept result.
+
+    Returns:
+        list: ``expressions``.
+    """
+    # pylint: disable=protected-access
+    for expression in expressions:
+        for node in walk(expression):
+            node._str = node._python = _UNRENDERED
+    return expressions
+
+
+def benchmark_operations(fiql_strs):
+    """Build the operations to benchmark for a corpus.
+
+    Returns:
+        list: ``(name, callable)`` tuples; each callable runs the operation
+        over the whole corpus and returns the results.
+    """
+    expressions = [parse_str_to_expression(s) for s in fiql_strs]
+    fiql_bytes = [s.encode('ascii') for s in fiql_strs]
+    pythons = [e.to_python() for e in expressions]
+    buffers = [dumps(e) for e in expressions]
+    return [
+        ('iter_parse', lambda: [list(iter_parse(s)) for s in fiql_strs]),
+        ('parse', lambda: [parse_str_to_expression(s) for s in fiql_strs]),
+        ('parse_bytes',
+         lambda: [parse_str_to_expression(b) for b in fiql_bytes]),
+        ('str', lambda: [str(e) for e in forget_renderings(expressions)]),
+        ('str_kept', lambda: [str(e) for e in expressions]),
+        ('to_python',
+         lambda: [e.to_python() for e in forget_renderings(expressions)]),
+        ('to_python_kept', lambda: [e.to_python() for e in expressions]),
+        ('from_python',
+         lambda: [from_python_to_expression(p) for p in pythons]),
+        ('binary_dumps', lambda: [dumps(e) for e in expressions]),
+        ('binary_loads', lambda: [loads(b) for b in buffers]),
+    ]
+
+
+def measure(operation, per_call, min_time):
+    """Measure a single operation.
+
+    Returns:
+        dict: ``ops`` per second, ``peak_kib`` and retained ``blocks`` per
+        call of the operation.
+    """
+    timer = timeit.Timer(operation)
+    number = 1
+    while True:
+        elapsed = min(timer.repeat(repeat=3, number=number))
+        if elapsed >= min_time:
+            break
+        number *= 2
+    result = {'ops': number * per_call / elapsed}
+    gc.collect()
+    gc.disable()
+    try:
+        blocks = sys.getallocatedblocks()
+        retained = operation()
+        result['blocks'] = (sys.getallocatedblocks() - blocks) / per_call
+        del retained
+        if tracemalloc is not None:
+            tracemalloc.start()
+            operation()
+            result['peak_kib'] = \
+                tracemalloc.get_traced_memory()[1] / 1024 / per_call
+            tracemalloc.stop()
+    finally:
+        gc.enable()
+    return result
+
+
+def run(seed=0, count=20, min_time=0.2, only=None):
+    """Run every benchmark.
+
+    Returns:
+        dict: Results keyed by ``"<corpus>/<operation>"``.
+    """
+    results = {}
+    for name, fiql_strs in generate_corpus(seed, count):
+        for operation_name, operation in benchmark_operations(fiql_strs):
+            key = '%s/%s' % (name, operation_name)
+            if only and only not in key:
+                continue
+            results[key] = measure(operation, len(fiql_strs), min_time)
+    return results
+
+
+def report(results, baseline=None, stream=sys.stdout):
+    """Print ``results``, compared against ``baseline`` if given."""
+    header = '%-24s %14s %10s %10s' % ('benchmark', 'ops/s', 'peak KiB',
+                                       'blocks')
+    if baseline is not None:
+        header += ' %9s' % 'change'
+    print(header, file=stream)
+    for key in sorted(results):
+        result = results[key]
+        line = '%-24s %14.1f %10.2f %10.1f' % (
+            key, result['ops'], result.get('peak_kib', 0.0),
+            result.get('blocks', 0.0))
+        if baseline is not None:
+            if key in baseline:
+                change = result['ops'] / baseline[key]['ops'] - 1
+                line += ' %+8.1f%%' % (change * 100)
+            else:
+                line += ' %9s' % 'new'
+        print(line, file=stream)
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--save', metavar='FILE',
+                        help='save the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare the results with a JSON baseline')
+    parser.add_argument('--only', metavar='TEXT',
+                        help='only run benchmarks whose name contains TEXT')
+    parser.add_argument('--count', type=int, default=20,
+                        help='FIQL strings per corpus (default: 20)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed for corpus generation (default: 0)')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='minimum seconds per measurement (default: 0.2)')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with io.open(args.compare, encoding='utf-8') as fd:
+            baseline = json.load(fd)
+    results = run(args.seed, args.count, args.min_time, args.only)
+    report(results, baseline)
+    if args.save:
+        with io.open(args.save, 'w', encoding='utf-8') as fd:
+            fd.write(json.dumps(results, indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
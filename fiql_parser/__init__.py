@@ -25,7 +25,15 @@ __version__ = "1.0"
 
 from .exceptions import FiqlException
 from .exceptions import FiqlObjectException, FiqlFormatException
+from .exceptions import FiqlLimitException
 from .operator import Operator
 from .constraint import Constraint
 from .expression import Expression
 from .parser import parse_str_to_expression, from_python_to_expression
+from .parser import ParseLimits
+from .cache import ExpressionCache, ShapeCache
+from .columnar import evaluate_columns
+from .stream import FilterStats, filter_iter, iter_json_lines
+from .batch import ParseResult, parse_many
+from .index import DocumentIndex
+from .frozen import FrozenExpression, FrozenConstraint
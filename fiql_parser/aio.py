@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Parsing a FIQL string or filtering records runs to completion without giving
+other tasks a chance to run; within an ``asyncio`` event loop (e.g., an API
+server) a single, very long, FIQL string or large data set holds up every
+other request for as long as that takes.
+
+The ``aio`` module includes coroutine versions of
+:func:`fiql_parser.parser.parse_str_to_expression` and
+:func:`fiql_parser.stream.filter_iter` which return control to the event loop
+every so many tokens or records, and which give up with a
+``FiqlBudgetException`` once the time allowed (or number of records) is
+exceeded. Both build on the same code as their counterparts, so they accept
+(and reject) exactly the same input; including the ``limits`` on the FIQL
+strings parsed.
+
+Note:
+    This module is not imported by the ``fiql_parser`` package.
+"""
+import asyncio
+import time
+from itertools import islice
+
+from .exceptions import FiqlBudgetException
+from .parser import ExpressionBuilder, _iter_tokens
+from .predicate import compile_expression
+
+
+def _check_time(deadline, max_seconds):
+    """Raise ``FiqlBudgetException`` if ``deadline`` has passed."""
+    if deadline is not None and time.monotonic() > deadline:
+        raise FiqlBudgetException(
+            "Exceeded the time allowed (%ss)" % max_seconds)
+
+
+async def parse_str_to_expression_async(fiql_str, limits=None, *,
+                                        yield_every=256, max_seconds=None):
+    """Parse a FIQL formatted string into an ``Expression``, returning
+    control to the event loop every ``yield_every`` constraints.
+
+    Args:
+        fiql_str (string): The FIQL formatted string we want to parse; may
+            also be ``bytes``, ``bytearray`` or ``memoryview``.
+        limits (ParseLimits, optional): See
+            :func:`fiql_parser.parser.parse_str_to_expression`.
+        yield_every (integer, optional): Number of constraints parsed
+            between returns to the event loop. Defaults to ``256``.
+        max_seconds (float, optional): Time allowed for parsing, including
+            the time spent by other tasks while suspended.
+
+    Returns:
+        Expression: An ``Expression`` object representing the parsed FIQL
+        string.
+
+    Raises:
+        FiqlBudgetException: The string took too long to parse.
+        FiqlFormatException: Unable to parse string due to incorrect
+            formatting.
+        FiqlLimitException: The FIQL string exceeds one of the ``limits``.
+
+    Example:
+
+        >>> expression = await parse_str_to_expression_async(
+        ...     request.query_string, ParseLimits(max_length=65536),
+        ...     max_seconds=0.05)
+
+    """
+    deadline = None if max_seconds is None else \
+        time.monotonic() + max_seconds
+    builder = ExpressionBuilder(fiql_str)
+    tokens = _iter_tokens(fiql_str, limits)
+    while True:
+        batch = list(islice(tokens, yield_every))
+        if not batch:
+            break
+        builder.feed(batch)
+        if len(batch) < yield_every:
+            break
+        await asyncio.sleep(0)
+        _check_time(deadline, max_seconds)
+    return builder.finish()
+
+
+async def filter_iter_async(expression, iterable, stats=None, getter=None, *,
+                            yield_every=1024, max_seconds=None,
+                            max_records=None):
+    """Asynchronously yield the records from ``iterable`` which satisfy
+    ``expression``, returning control to the event loop every
+    ``yield_every`` records tested (See
+    :func:`fiql_parser.stream.filter_iter`).
+
+    Args:
+        expression (BaseExpression): The ``Expression`` or ``Constraint`` to
+            apply.
+        iterable (iterable): The records to filter.
+        stats (FilterStats, optional): Updated with the number of records
+            scanned and matched as the pipeline is consumed.
+        getter (callable, optional): Function taking a record and a selector
+            and returning the value of the selector for that record.
+        yield_every (integer, optional): Number of records tested between
+            returns to the event loop. Defaults to ``1024``.
+        max_seconds (float, optional): Time allowed for filtering, including
+            the time spent by other tasks (and the consumer) while
+            suspended.
+        max_records (integer, optional): Maximum number of records tested.
+
+    Yields:
+        The records which satisfy ``expression``.
+
+    Raises:
+        FiqlBudgetException: More than ``max_records`` records were
+            tested, or filtering took too long.
+
+    Example:
+
+        >>> async for record in filter_iter_async(expression, records,
+        ...                                       max_seconds=1.0):
+        ...     await handle(record)
+
+    """
+    # pylint: disable=too-many-arguments
+    predicate = compile_expression(expression, getter)
+    deadline = None if max_seconds is None else \
+        time.monotonic() + max_seconds
+    if stats is not None:
+        stats.started = time.time()
+        stats.finished = None
+    # Records left before the next return to the event loop and before the
+    # budget is exhausted.
+    countdown = yield_every
+    remaining = -1 if max_records is None else max_records
+    for record in iterable:
+        if not remaining:
+            raise FiqlBudgetException(
+                "Exceeded the maximum number of records (%d)" % max_records)
+        remaining -= 1
+        if stats is not None:
+            stats.scanned += 1
+        if predicate(record):
+            if stats is not None:
+                stats.matched += 1
+            yield record
+        countdown -= 1
+        if not countdown:
+            countdown = yield_every
+            await asyncio.sleep(0)
+            _check_time(deadline, max_seconds)
+    if stats is not None:
+        stats.finished = time.time()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Validating a large corpus of stored FIQL strings one at a time in a single
+thread leaves all but one processor idle.
+
+The ``batch`` module includes the code used to parse many FIQL strings at
+once, optionally fanning the work out to a pool of processes. A string which
+fails to parse does not abort the batch; its error is reported alongside the
+results of the other strings.
+
+Attributes:
+    ParseResult (namedtuple): The result of parsing a single FIQL string;
+        ``expression`` is ``None`` if parsing failed in which case ``error``
+        holds the ``FiqlException`` raised.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+from collections import namedtuple
+
+from .exceptions import FiqlException
+from .parser import parse_str_to_expression
+
+
+ParseResult = namedtuple('ParseResult', ['expression', 'error'])
+
+
+def _parse_chunk(fiql_strs):
+    """Parse a chunk of FIQL strings, capturing any parsing errors.
+
+    Args:
+        fiql_strs (list): The FIQL formatted strings to parse.
+
+    Returns:
+        list: A ``ParseResult`` for each string in ``fiql_strs``.
+    """
+    results = []
+    for fiql_str in fiql_strs:
+        try:
+            results.append(ParseResult(parse_str_to_expression(fiql_str), None))
+        except FiqlException as exc:
+            results.append(ParseResult(None, exc))
+    return results
+
+
+def _parse_chunk_pickled(fiql_strs):
+    """Parse a chunk of FIQL strings in a worker process, pickling the
+    result for each string on its own.
+
+    A result which can not be pickled becomes the error of its string
+    rather than failing the chunk (and with it the whole batch).
+
+    Args:
+        fiql_strs (list): The FIQL formatted strings to parse.
+
+    Returns:
+        list: The pickled ``ParseResult`` for each string in ``fiql_strs``.
+    """
+    # pylint: disable=import-outside-toplevel
+    import pickle
+    pickled = []
+    for fiql_str, result in zip(fiql_strs, _parse_chunk(fiql_strs)):
+        try:
+            pickled.append(pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+        except Exception as exc:  # pylint: disable=broad-except
+            error = FiqlException(
+                "The result of parsing '%s' could not be returned from the "
+                "worker process: %r" % (fiql_str, exc))
+            pickled.append(pickle.dumps(ParseResult(None, error),
+                                        pickle.HIGHEST_PROTOCOL))
+    return pickled
+
+
+def parse_many(fiql_strs, workers=None, chunksize=None):
+    """Parse many FIQL formatted strings.
+
+    The strings are split into chunks which are parsed by a pool of
+    ``workers`` processes. Each parsed ``Expression`` is pickled as its flat
+    binary encoding (See :meth:`Expression.__reduce__`) to keep the cost of
+    returning it to this process low, however deeply it is nested.
+
+    Args:
+        fiql_strs (iterable): The FIQL formatted strings we want to parse.
+        workers (integer, optional): Number of worker processes. Defaults to
+            the number of processors; a value of ``1`` or less parses the
+            strings in the calling process.
+        chunksize (integer, optional): Number of strings sent to a worker at
+            a time. Defaults to a size which gives each worker about four
+            chunks.
+
+    Returns:
+        list: A ``ParseResult`` for each string, in input order.
+
+    Example:
+
+        >>> results = parse_many(saved_searches, workers=4)
+        >>> invalid = [(fiql_str, result.error) for fiql_str, result
+        ...            in zip(saved_searches, results) if result.error]
+
+    """
+    # Importing multiprocessing (and pickle) takes a noticeable share of the
+    # time taken to import this package; they are only imported when needed.
+    # pylint: disable=import-outside-toplevel
+    import pickle
+    from multiprocessing import Pool, cpu_count
+    fiql_strs = list(fiql_strs)
+    if workers is None:
+        workers = cpu_count()
+    if workers <= 1 or len(fiql_strs) < 2:
+        return _parse_chunk(fiql_strs)
+    if not chunksize:
+        chunksize = max(1, -(-len(fiql_strs) // (workers * 4)))
+    chunks = [fiql_strs[i:i + chunksize]
+              for i in range(0, len(fiql_strs), chunksize)]
+    results = []
+    # Leaving the block terminates the workers, even on error.
+    with Pool(min(workers, len(chunks))) as pool:
+        for chunk_results in pool.imap(_parse_chunk_pickled, chunks):
+            results.extend(pickle.loads(result) for result in chunk_results)
+    return results
@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+Sending an ``Expression`` to another process (or storing it) as its FIQL
+string means parsing it again on the other side; as its python
+representation (e.g., JSON) means rebuilding it through
+:func:`fiql_parser.parser.from_python_to_expression`.
+
+The ``binary`` module includes a compact, versioned binary encoding of an
+``Expression`` (or ``Constraint``) which is decoded in well under half the
+time the FIQL string takes to parse, and from which the constraints can be
+read without building any objects at all (See :func:`iter_constraints`).
+
+The encoding is, in order:
+
+  - The magic bytes ``FIQL`` and a one byte format version (``1``).
+  - The string table; the number of distinct selectors, comparisons and
+    arguments, the length (in characters) of each and the length (in bytes)
+    of their UTF-8 encoding followed by the encoding itself, so that the
+    table is decoded in one go.
+  - The tree, in pre-order; a one byte tag per node. An ``Expression`` is
+    tagged by its ``Operator`` (or its lack of one) and followed by its
+    number of elements; a ``Constraint`` is followed by the table indexes of
+    its selector, comparison and argument (Each plus one; ``0`` stands for
+    ``None``).
+
+Every number is an unsigned LEB128 varint.
+
+Attributes:
+    MAGIC (bytes): The bytes every encoding starts with.
+    VERSION (integer): The version of the format written.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+from .exceptions import FiqlFormatException
+from .constraint import Constraint
+from .expression import Expression, walk
+from .operator import OPERATOR_AND, OPERATOR_OR
+
+
+MAGIC = b'FIQL'
+VERSION = 1
+
+# Node tags.
+_TAG_EXPRESSION = 0x00
+_TAG_AND = 0x01
+_TAG_OR = 0x02
+_TAG_CONSTRAINT = 0x10
+
+_OPERATOR_TAGS = {None: _TAG_EXPRESSION, OPERATOR_AND: _TAG_AND,
+                  OPERATOR_OR: _TAG_OR}
+_TAG_OPERATORS = {_TAG_EXPRESSION: None, _TAG_AND: OPERATOR_AND,
+                  _TAG_OR: OPERATOR_OR}
+
+
+def _write_varint(out, value):
+    """Append ``value`` to the ``bytearray`` ``out`` as a varint."""
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, position):
+    """Read a varint from the ``bytearray`` ``data``.
+
+    Returns:
+        tuple: The value and the position following it.
+
+    Raises:
+        FiqlFormatException: The varint is truncated.
+    """
+    value = 0
+    shift = 0
+    try:
+        while True:
+            byte = data[position]
+            position += 1
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return value, position
+            shift += 7
+    except IndexError as exc:
+        raise FiqlFormatException(
+            "Truncated binary expression at position %d" % position,
+            position) from exc
+
+
+def dumps(expression):
+    """Encode an ``Expression`` or ``Constraint``.
+
+    Args:
+        expression (BaseExpression): The ``Expression`` or ``Constraint``.
+
+    Returns:
+        bytes: The encoded ``expression``.
+
+    Example:
+
+        >>> buffer = dumps(parse_str_to_expression("a==1;(b==2,c)"))
+        >>> str(loads(buffer))
+        'a==1;(b==2,c)'
+
+    """
+    # Index (plus one) of each distinct string in the table.
+    strings = {None: 0}
+    table = []
+    tree = bytearray()
+    for node in walk(expression):
+        if isinstance(node, Expression):
+            tree.append(_OPERATOR_TAGS[node.operator])
+            _write_varint(tree, len(node.elements))
+            continue
+        tree.append(_TAG_CONSTRAINT)
+        for string in (node.selector, node.comparison, node.argument):
+            index = strings.get(string)
+            if index is None:
+                index = strings[string] = len(table) + 1
+                table.append(string)
+            _write_varint(tree, index)
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    _write_varint(out, len(table))
+    for string in table:
+        _write_varint(out, len(string))
+    encoded = ''.join(table).encode('utf-8')
+    _write_varint(out, len(encoded))
+    out.extend(encoded)
+    out.extend(tree)
+    return bytes(out)
+
+
+def _read_header(buffer):
+    """Check the magic bytes and version, and read the string table.
+
+    Returns:
+        tuple: The buffer as a ``bytearray``, the strings (preceded by
+        ``None``) and the position of the tree.
+
+    Raises:
+        FiqlFormatException: Not a binary expression or of an unsupported
+            version.
+    """
+    data = bytearray(buffer)
+    if data[:len(MAGIC)] != MAGIC:
+        raise FiqlFormatException("Not a binary expression", 0)
+    if len(data) <= len(MAGIC) or data[len(MAGIC)] != VERSION:
+        raise FiqlFormatException(
+            "Unsupported binary expression version", len(MAGIC))
+    count, position = _read_varint(data, len(MAGIC) + 1)
+    lengths = []
+    for _ in range(count):
+        length = data[position] if position < len(data) else 0x80
+        if length < 0x80:
+            position += 1
+        else:
+            length, position = _read_varint(data, position)
+        lengths.append(length)
+    length, position = _read_varint(data, position)
+    end = position + length
+    if end > len(data):
+        raise FiqlFormatException(
+            "Truncated binary expression at position %d" % len(data),
+            len(data))
+    try:
+        table = data[position:end].decode('utf-8')
+    except UnicodeDecodeError as exc:
+        raise FiqlFormatException(
+            "Invalid string table at position %d" % position,
+            position) from exc
+    strings = [None]
+    start = 0
+    for length in lengths:
+        strings.append(table[start:start + length])
+        start += length
+    if start != len(table):
+        raise FiqlFormatException(
+            "Invalid string table at position %d" % position, position)
+    return data, strings, end
+
+
+def _read_constraint(data, position, strings):
+    """Read the selector, comparison and argument of a ``Constraint``.
+
+    Returns:
+        tuple: The selector, comparison, argument and the position
+        following them.
+
+    Raises:
+        FiqlFormatException: A string index is out of range.
+    """
+    # Tables of fewer than 128 strings (most) have one byte indexes.
+    indexes = data[position:position + 3]
+    if len(indexes) == 3 and max(indexes) < 0x80:
+        selector, comparison, argument = indexes
+        position += 3
+    else:
+        selector, position = _read_varint(data, position)
+        comparison, position = _read_varint(data, position)
+        argument, position = _read_varint(data, position)
+    try:
+        return (strings[selector], strings[comparison], strings[argument],
+                position)
+    except IndexError as exc:
+        raise FiqlFormatException(
+            "Invalid string index before position %d" % position,
+            position) from exc
+
+
+def loads(buffer):
+    """Decode an ``Expression`` or ``Constraint`` encoded with
+    :func:`dumps`.
+
+    Args:
+        buffer (bytes): The encoding; may also be a ``bytearray`` or
+            ``memoryview``.
+
+    Returns:
+        BaseExpression: The decoded ``Expression`` or ``Constraint``.
+
+    Raises:
+        FiqlFormatException: The encoding is invalid, truncated or of an
+            unsupported version.
+    """
+    data, strings, position = _read_header(buffer)
+    # Decode without recursion. Each stack entry is an Expression and the
+    # number of its elements still to be decoded.
+    stack = []
+    root = None
+    while root is None:
+        try:
+            tag = data[position]
+        except IndexError as exc:
+            raise FiqlFormatException(
+                "Truncated binary expression at position %d" % position,
+                position) from exc
+        position += 1
+        if tag == _TAG_CONSTRAINT:
+            selector, comparison, argument, position = _read_constraint(
+                data, position, strings)
+            node = Constraint(selector, comparison, argument)
+            count = 0
+        elif tag in _TAG_OPERATORS:
+            count, position = _read_varint(data, position)
+            node = Expression()
+            node.operator = _TAG_OPERATORS[tag]
+        else:
+            raise FiqlFormatException(
+                "Invalid tag %d at position %d" % (tag, position - 1),
+                position - 1)
+        if stack:
+            # The decoded Expression is new and already valid; the elements
+            # are attached directly rather than through ``add_element``.
+            parent = stack[-1]
+            node.parent = parent[0]
+            parent[0].elements.append(node)
+            parent[1] -= 1
+        if count:
+            stack.append([node, count])
+        while stack and not stack[-1][1]:
+            node = stack.pop()[0]
+        if not stack:
+            root = node
+    if position != len(data):
+        raise FiqlFormatException(
+            "Unexpected data at position %d" % position, position)
+    return root
+
+
+def iter_constraints(buffer):
+    """Iterate through the constraints of an encoding (See :func:`dumps`),
+    in the order they appear, without building any objects.
+
+    Args:
+        buffer (bytes): The encoding; may also be a ``bytearray`` or
+            ``memoryview``.
+
+    Yields:
+        tuple: The ``selector``, FIQL ``comparison`` (e.g., "=gt=") and
+        ``argument`` of each ``Constraint``; the last two may be ``None``.
+
+    Raises:
+        FiqlFormatException: The encoding is invalid, truncated or of an
+            unsupported version.
+    """
+    data, strings, position = _read_header(buffer)
+    end = len(data)
+    while position < end:
+        tag = data[position]
+        position += 1
+        if tag == _TAG_CONSTRAINT:
+            selector, comparison, argument, position = _read_constraint(
+                data, position, strings)
+            yield selector, comparison, argument
+        elif tag in _TAG_OPERATORS:
+            _, position = _read_varint(data, position)
+        else:
+            raise FiqlFormatException(
+                "Invalid tag %d at position %d" % (tag, position - 1),
+                position - 1)
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Combining the rows matched by each ``Constraint`` of a large ``Expression``
+as Python ``set`` objects costs a hash table insert or lookup per row, and
+about 30 to 70 bytes of memory per row.
+
+The ``bitmap`` module includes a compact set of row numbers, the ``Bitmap``,
+which keeps one bit per row. The bits are held in a Python ``int`` so that
+intersection, union and difference run a machine word at a time in C,
+without a C extension. Rows are added to (or removed from) a ``bytearray``
+instead, in constant time, and the two are converted between as needed.
+
+The ``Bitmap`` is used by :class:`fiql_parser.index.DocumentIndex` to
+combine the results of the constraints of an ``Expression``.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+
+# Positions of the set bits of each byte value.
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1)
+              for byte in range(256)]
+
+
+def _from_buffer(buffer):
+    """Convert a little-endian ``bytearray`` into an ``int``."""
+    return int.from_bytes(bytes(buffer), 'little')
+
+
+def _to_buffer(value):
+    """Convert a non-negative ``int`` into a little-endian ``bytearray``."""
+    return bytearray(value.to_bytes((value.bit_length() + 7) // 8, 'little'))
+
+
+def _count(value):
+    """Count the set bits of a non-negative ``int``."""
+    try:
+        return value.bit_count()
+    except AttributeError:
+        return bin(value).count('1')
+
+
+class Bitmap(object):
+    """
+    The ``Bitmap`` is a set of non-negative integers (row numbers) kept as
+    one bit per row.
+
+    Note:
+        A ``Bitmap`` takes about ``n / 8`` bytes for rows up to ``n``;
+        0.125 MiB for a million rows compared to about 32 MiB for a ``set``
+        holding all of them.
+
+    Example:
+
+        >>> Bitmap([1, 5, 9]) & Bitmap([5, 9, 12])
+        Bitmap([5, 9])
+
+    """
+
+    __slots__ = ('_value', '_buffer')
+
+    def __init__(self, rows=()):
+        """Initialize instance of ``Bitmap``.
+
+        Args:
+            rows (iterable, optional): The row numbers in the ``Bitmap``.
+        """
+        # Exactly one of the two is kept up to date at any time; ``_value``
+        # for the set operations and ``_buffer`` for adding and removing.
+        self._value = 0
+        self._buffer = None
+        for row in rows:
+            self.add(row)
+
+    @classmethod
+    def _wrap(cls, value):
+        """Create a ``Bitmap`` from its ``int`` representation."""
+        bitmap = cls()
+        bitmap._value = value
+        return bitmap
+
+    def _int(self):
+        """Get the ``int`` representation of the ``Bitmap``."""
+        if self._buffer is not None:
+            self._value = _from_buffer(self._buffer)
+            self._buffer = None
+        return self._value
+
+    def _bytes(self):
+        """Get the ``bytearray`` representation of the ``Bitmap``."""
+        if self._buffer is None:
+            self._buffer = _to_buffer(self._value)
+            self._value = None
+        return self._buffer
+
+    def add(self, row):
+        """Add a row.
+
+        Args:
+            row (integer): The non-negative row number.
+        """
+        buffer = self._bytes()
+        index = row >> 3
+        if index >= len(buffer):
+            buffer.extend(bytearray(max(index + 1 - len(buffer),
+                                        len(buffer) // 2)))
+        buffer[index] |= 1 << (row & 7)
+
+    def discard(self, row):
+        """Remove a row if it is present.
+
+        Args:
+            row (integer): The non-negative row number.
+        """
+        buffer = self._bytes()
+        index = row >> 3
+        if index < len(buffer):
+            buffer[index] &= ~(1 << (row & 7)) & 0xff
+
+    def copy(self):
+        """Create a copy of the ``Bitmap``.
+
+        Returns:
+            Bitmap: The copy.
+        """
+        return Bitmap._wrap(self._int())
+
+    def __contains__(self, row):
+        if self._buffer is not None:
+            index = row >> 3
+            return index < len(self._buffer) and \
+                bool(self._buffer[index] >> (row & 7) & 1)
+        return bool(self._value >> row & 1)
+
+    def __len__(self):
+        return _count(self._int())
+
+    def __iter__(self):
+        buffer = self._buffer if self._buffer is not None else \
+            _to_buffer(self._value)
+        for index, byte in enumerate(buffer):
+            if byte:
+                base = index << 3
+                for bit in _BYTE_BITS[byte]:
+                    yield base + bit
+
+    def __bool__(self):
+        if self._buffer is not None:
+            return any(self._buffer)
+        return bool(self._value)
+
+    def __and__(self, other):
+        return Bitmap._wrap(self._int() & other._int())
+
+    def __or__(self, other):
+        return Bitmap._wrap(self._int() | other._int())
+
+    def __sub__(self, other):
+        return Bitmap._wrap(self._int() & ~other._int())
+
+    def __xor__(self, other):
+        return Bitmap._wrap(self._int() ^ other._int())
+
+    def __iand__(self, other):
+        self._value = self._int() & other._int()
+        return self
+
+    def __ior__(self, other):
+        self._value = self._int() | other._int()
+        return self
+
+    def __isub__(self, other):
+        self._value = self._int() & ~other._int()
+        return self
+
+    def __eq__(self, other):
+        if not isinstance(other, Bitmap):
+            return NotImplemented
+        return self._int() == other._int()
+
+    def __ne__(self, other):
+        if not isinstance(other, Bitmap):
+            return NotImplemented
+        return self._int() != other._int()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "Bitmap(%s)" % list(self)
+
+    @staticmethod
+    def union(*bitmaps):
+        """Unite any number of bitmaps.
+
+        Returns:
+            Bitmap: The rows in any of ``bitmaps``.
+        """
+        value = 0
+        for bitmap in bitmaps:
+            value |= bitmap._int()  # pylint: disable=protected-access
+        return Bitmap._wrap(value)
+
+    @staticmethod
+    def intersection(*bitmaps):
+        """Intersect any number of bitmaps, stopping as soon as the result
+        is empty.
+
+        The sparsest bitmaps are intersected first, so the result shrinks
+        (and empties) as early as possible.
+
+        Returns:
+            Bitmap: The rows in every one of ``bitmaps``.
+        """
+        # pylint: disable=protected-access
+        values = sorted((bitmap._int() for bitmap in bitmaps), key=_count)
+        if not values:
+            return Bitmap()
+        value = values[0]
+        for other in values[1:]:
+            if not value:
+                break
+            value &= other
+        return Bitmap._wrap(value)
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Parsing the same FIQL string over and over again (a dashboard polling the
+same ``?filter=`` for example) rebuilds an identical ``Expression`` every
+time. Similarly, many different FIQL strings share the same shape and differ
+only in their arguments, yet whatever is built from them (SQL, predicates,
+query plans) is rebuilt for every one.
+
+The ``cache`` module includes opt-in, bounded, least recently used caches of
+parsed ``Expression`` objects keyed by the raw FIQL string and of artifacts
+keyed by the shape of the ``Expression`` they were built from.
+
+Attributes:
+    CacheInfo (namedtuple): Statistics reported by the ``info`` method of
+        each cache.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+from collections import namedtuple, OrderedDict
+from threading import Lock
+
+from .parser import parse_str_to_expression
+
+
+CacheInfo = namedtuple(
+    'CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+# Marker for a missing cache entry.
+_MISSING = object()
+
+
+class _BoundedCache(object):
+    """
+    Thread-safe mapping with a maximum size and least recently used eviction
+    which keeps count of its hits, misses and evictions.
+
+    Attributes:
+        maxsize (integer): The maximum number of entries to keep.
+        hits (integer): Number of lookups answered from the cache.
+        misses (integer): Number of lookups not answered from the cache.
+        evictions (integer): Number of entries evicted from the cache.
+    """
+
+    def __init__(self, maxsize=128):
+        """Initialize instance of the cache.
+
+        Args:
+            maxsize (integer, optional): The maximum number of entries to
+                keep. Defaults to ``128``.
+
+        Raises:
+            ValueError: ``maxsize`` is less than one.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1 not %s" % maxsize)
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def _lookup(self, key):
+        """Look up an entry, marking it as the most recently used.
+
+        Returns:
+            The cached value or ``_MISSING``.
+        """
+        with self._lock:
+            value = self._entries.pop(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                # Re-insert to mark as most recently used.
+                self._entries[key] = value
+                self.hits += 1
+            return value
+
+    def _store(self, key, value):
+        """Add an entry, evicting the least recently used as required."""
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def info(self):
+        """Report the cache statistics.
+
+        Returns:
+            CacheInfo: Hits, misses, evictions, maximum and current size.
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions,
+                             self.maxsize, len(self._entries))
+
+    def clear(self):
+        """Remove every cached entry and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ExpressionCache(_BoundedCache):
+    """
+    The ``ExpressionCache`` is a bounded cache of parsed ``Expression``
+    objects with least recently used eviction.
+
+    Because an ``Expression`` can be modified after it is parsed (See
+    :meth:`Expression.op_and` and :meth:`Expression.add_element`), the
+    cached instance is never handed out; each call to :meth:`parse` returns
+    a copy of it instead.
+
+    Strings which fail to parse are not cached.
+
+    Example:
+
+        >>> cache = ExpressionCache(maxsize=256)
+        >>> expression = cache.parse("name==bar,dob=gt=1990-01-01")
+
+    """
+
+    def parse(self, fiql_str):
+        """Parse a FIQL formatted string into an ``Expression`` using the
+        cache.
+
+        Args:
+            fiql_str (string): The FIQL formatted string we want to parse;
+                may also be ``bytes``, ``bytearray`` or ``memoryview``.
+
+        Returns:
+            Expression: A private copy of the cached ``Expression``.
+
+        Raises:
+            FiqlFormatException: Unable to parse string due to incorrect
+                formatting.
+        """
+        # A bytearray or memoryview is neither hashable nor fixed.
+        key = bytes(fiql_str) if isinstance(
+            fiql_str, (bytearray, memoryview)) else fiql_str
+        expression = self._lookup(key)
+        if expression is _MISSING:
+            expression = parse_str_to_expression(fiql_str)
+            self._store(key, expression)
+        return expression.copy()
+
+
+class ShapeCache(_BoundedCache):
+    """
+    The ``ShapeCache`` is a bounded cache, with least recently used eviction,
+    of artifacts built from an ``Expression`` and keyed by its shape (See
+    :meth:`Expression.shape_key`) rather than the ``Expression`` itself.
+
+    Artifacts stored in the cache must not depend on the arguments of the
+    ``Expression`` they are built from; the arguments of each ``Expression``
+    (See :meth:`Expression.arguments`) are bound to the artifact when it is
+    used instead. The work done per ``Expression`` is then proportional to
+    the number of distinct shapes rather than the number of expressions.
+
+    Only the SQL templates built by :func:`fiql_parser.sql.to_sql` are kept
+    in a ``ShapeCache``; compiled predicates and index plans coerce the
+    arguments when they are built, so they are not shared between
+    expressions of the same shape.
+
+    Example:
+
+        >>> cache = ShapeCache()
+        >>> query = to_sql(expression, column_map, cache=cache)
+
+    """
+
+    def get(self, expression, factory, namespace=None):
+        """Get the artifact for the shape of ``expression``, building it
+        with ``factory`` if it is not cached.
+
+        Args:
+            expression (BaseExpression): The ``Expression`` or
+                ``Constraint``.
+            factory (callable): Function building the artifact from
+                ``expression``.
+            namespace (optional): Hashable value distinguishing between
+                different kinds of artifacts kept in the same cache.
+
+        Returns:
+            The cached or newly built artifact.
+        """
+        key = (namespace, expression.shape_key())
+        artifact = self._lookup(key)
+        if artifact is _MISSING:
+            artifact = factory(expression)
+            self._store(key, artifact)
+        return artifact
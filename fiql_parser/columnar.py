@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Applying a filter one record at a time (See :mod:`fiql_parser.predicate`) is
+a poor fit for data which is already held in columns. The ``columnar`` module
+evaluates an ``Expression`` against a mapping of selector to column using
+vectorized NumPy operations; each ``Constraint`` becomes a single comparison
+over the whole column and each ``Operator`` a single ``&`` or ``|`` over the
+resulting boolean masks.
+
+NumPy is an optional dependency (``pip install fiql-parser[numpy]``) and is
+only imported when :func:`evaluate_columns` is first called.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+from .constants import COMPARISON_MAP
+from .exceptions import FiqlObjectException
+from .expression import fold
+from .operator import OPERATOR_OR
+from .predicate import (COMPARISON_FUNCTIONS, coerce_argument,
+                        compile_constraint)
+
+
+def _import_numpy():
+    """Import NumPy on demand.
+
+    Returns:
+        module: The ``numpy`` module.
+
+    Raises:
+        ImportError: NumPy is not installed.
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        import numpy
+    except ImportError as exc:
+        raise ImportError(
+            "Columnar evaluation requires NumPy; install it with "
+            "'pip install fiql-parser[numpy]'") from exc
+    return numpy
+
+
+def _coerce_number(_numpy, argument):
+    """Coerce a FIQL argument for comparison with numbers."""
+    coerced = coerce_argument(argument)
+    return None if coerced is argument else coerced
+
+
+def _coerce_bool(_numpy, argument):
+    """Coerce a FIQL argument for comparison with booleans."""
+    if argument.lower() in ('true', 'false'):
+        return argument.lower() == 'true'
+    return None
+
+
+def _coerce_bytes(_numpy, argument):
+    """Coerce a FIQL argument for comparison with byte strings."""
+    return argument.encode('utf-8')
+
+
+def _coerce_datetime(numpy, argument):
+    """Coerce a FIQL argument for comparison with ``datetime64`` values."""
+    try:
+        return numpy.datetime64(argument.rstrip('Zz'))
+    except ValueError:
+        return None
+
+
+# Coercion of the argument for each ``dtype.kind``; the argument is compared
+# as is with columns of any other kind.
+_COLUMN_COERCIONS = {
+    'i': _coerce_number,
+    'u': _coerce_number,
+    'f': _coerce_number,
+    'b': _coerce_bool,
+    'S': _coerce_bytes,
+    'M': _coerce_datetime,
+}
+
+
+def _coerce_for_column(numpy, column, argument):
+    """Coerce a FIQL argument for comparison with the values of ``column``.
+
+    Args:
+        numpy (module): The ``numpy`` module.
+        column (numpy.ndarray): The column being compared.
+        argument (string): The URL decoded argument.
+
+    Returns:
+        The coerced argument or ``None`` if the argument can not be compared
+        with the values of ``column``.
+    """
+    if argument is None:
+        return None
+    coercion = _COLUMN_COERCIONS.get(column.dtype.kind)
+    return argument if coercion is None else coercion(numpy, argument)
+
+
+def _evaluate_constraint(numpy, constraint, columns, size):
+    """Evaluate a ``Constraint`` against ``columns``.
+
+    Returns:
+        numpy.ndarray: Boolean mask of the rows satisfying ``constraint``.
+    """
+    if constraint.selector not in columns:
+        return numpy.zeros(size, dtype=bool)
+    column = numpy.asarray(columns[constraint.selector])
+    if column.dtype.kind == 'O':
+        # Values of mixed types (or ``None``) are tested one at a time, as
+        # the predicate would; a single comparison over the column raises
+        # ``TypeError`` on the first incomparable value.
+        predicate = compile_constraint(constraint, lambda value, _: value)
+        return numpy.fromiter((predicate(value) for value in column),
+                              dtype=bool, count=len(column))
+    if not constraint.comparison:
+        if column.dtype.kind == 'f':
+            return ~numpy.isnan(column)
+        return numpy.ones(size, dtype=bool)
+    function = COMPARISON_FUNCTIONS.get(
+        COMPARISON_MAP.get(constraint.comparison))
+    if function is None:
+        raise FiqlObjectException(
+            "'%s' is not a supported FIQL comparison" % constraint.comparison)
+    argument = _coerce_for_column(numpy, column, constraint.argument)
+    if argument is None:
+        return numpy.zeros(size, dtype=bool)
+    return numpy.asarray(function(column, argument), dtype=bool)
+
+
+def evaluate_columns(expression, columns, size=None):
+    """Evaluate an ``Expression`` against columnar data.
+
+    Args:
+        expression (BaseExpression): The ``Expression`` or ``Constraint`` to
+            evaluate.
+        columns (dict): Mapping of selector to a one dimensional array (or
+            anything ``numpy.asarray`` accepts) of values. All columns must be
+            of the same length.
+        size (integer, optional): The number of rows. Defaults to the length
+            of the first column in ``columns``.
+
+    Returns:
+        numpy.ndarray: Boolean mask of the rows satisfying the
+        ``Expression``. A selector missing from ``columns`` matches no rows.
+
+    Raises:
+        ImportError: NumPy is not installed.
+        FiqlObjectException: A comparison is not supported.
+
+    Example:
+
+        >>> mask = evaluate_columns(
+        ...     parse_str_to_expression("age=gt=30;name==foo"),
+        ...     {'age': numpy.array([45, 12]),
+        ...      'name': numpy.array(['foo', 'foo'])})
+
+    """
+    numpy = _import_numpy()
+    if size is None:
+        size = len(next(iter(columns.values()))) if columns else 0
+    def combine(expression, masks):
+        """Combine the masks of the elements of an ``Expression``."""
+        if not masks:
+            return numpy.ones(size, dtype=bool)
+        function = numpy.logical_or if expression.operator is OPERATOR_OR \
+            else numpy.logical_and
+        mask = masks[0]
+        for other in masks[1:]:
+            function(mask, other, out=mask)
+        return mask
+
+    return fold(expression,
+                lambda constraint: _evaluate_constraint(numpy, constraint,
+                                                        columns, size),
+                combine)
@@ -11,6 +11,8 @@ Attributes:
         (:rfc:`3986#section-2.1`).
     UNRESERVED_REGEX: Regular expression repesenting Unreserved Characters
         (:rfc:`3986#section-2.3`).
+    UNRESERVED_CHARS: The Unreserved Characters as a string; the characters
+        which are never percent-encoded.
     FIQL_DELIM_REGEX: Regular expression representing the FIQL Delimiter
         (`FIQL Draft#section-3.2`_).
     COMPARISON_REGEX: Regular expression representing the FIQL Comparison
@@ -46,6 +48,10 @@ PCT_ENCODING_REGEX = r'%[A-Fa-f0-9]{2}'
 # Unreserved Characters
 UNRESERVED_REGEX = r'[A-Za-z0-9-\._~]'
 
+# Unreserved Characters
+UNRESERVED_CHARS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz' \
+        '0123456789-._~'
+
 # FIQL delimiter
 FIQL_DELIM_REGEX = r'[\!\$\'\*\+]'
 
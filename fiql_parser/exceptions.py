@@ -32,5 +32,51 @@ class FiqlParserException(FiqlException):
 
 
 class FiqlFormatException(FiqlParserException):
-    """Exception class for FIQL string parsing errors."""
+    """Exception class for FIQL string parsing errors.
+
+    Attributes:
+        position (integer): Offset in the FIQL string at which the error was
+            found or ``None`` if unknown.
+        token (string): The offending token (an operator, a parenthesis or a
+            percent-encoded selector) or ``None`` if the string ended early.
+        expected (tuple): The tokens which would have been accepted at
+            ``position``; "constraint" stands for any ``Constraint``.
+    """
+
+    def __init__(self, message, position=None, token=None, expected=None):
+        super(FiqlFormatException, self).__init__(message)
+        self.position = position
+        self.token = token
+        self.expected = expected
+
+
+class FiqlBudgetException(FiqlFormatException):
+    """Exception class for FIQL input exceeding the time or size allowed for
+    parsing or evaluating it."""
+    pass
+
+
+class FiqlLimitException(FiqlFormatException):
+    """Exception class for FIQL strings exceeding one of the ``ParseLimits``;
+    the ``position`` is the offset at which the limit was exceeded."""
+    pass
+
+
+class FiqlLengthException(FiqlLimitException):
+    """Exception class for FIQL strings exceeding the maximum length."""
+    pass
+
+
+class FiqlConstraintCountException(FiqlLimitException):
+    """Exception class for FIQL strings with too many constraints."""
+    pass
+
+
+class FiqlDepthException(FiqlLimitException):
+    """Exception class for FIQL strings nested too deeply."""
+    pass
+
+
+class FiqlArgumentLengthException(FiqlLimitException):
+    """Exception class for FIQL strings with too long an argument."""
     pass
@@ -10,7 +10,18 @@ from __future__ import unicode_literals
 from __future__ import absolute_import
 
 from .exceptions import FiqlObjectException
-from .operator import Operator
+from .operator import Operator, OPERATOR_AND, OPERATOR_OR
+
+
+# Marker for a rendering (string or python) which has not been worked out or
+# is out of date.
+_UNRENDERED = object()
+
+# Marker for the string of a nested ``Expression`` which is not kept itself
+# but is part of that of an ``Expression`` containing it; it is dropped like
+# a kept one (See :meth:`BaseExpression._invalidate`) but rendered again
+# when asked for.
+_RENDERED_WITHIN = object()
 
 
 class BaseExpression(object):
@@ -31,13 +42,37 @@ class BaseExpression(object):
         ``Constraint`` and FIQL ``Expression`` can only be sub-expressions of
         an actual FIQL ``Expression``.
 
+    Note:
+        The FIQL string and python representation of each object are kept
+        once worked out (The string of a nested ``Expression`` only if it is
+        rendered on its own); they are dropped (for the object and every
+        ``Expression`` containing it) when it is changed with its methods or
+        properties. Changing the ``elements`` or ``operator`` of an
+        ``Expression`` directly does not drop them.
+
     Attributes:
         parent (Expression): The ``Expression`` which contains this object.
     """
 
+    __slots__ = ('parent', '_str', '_python')
+
     def __init__(self):
         """Initialize instance of ``BaseExpression``."""
         self.parent = None
+        self._str = _UNRENDERED
+        self._python = _UNRENDERED
+
+    def _invalidate(self):
+        """Drop the renderings of this object and of every ``Expression``
+        containing it."""
+        # A rendering is only kept if those of the elements within are, so
+        # there is nothing left to drop above an object without any.
+        # pylint: disable=protected-access
+        node = self
+        while node is not None and (node._str is not _UNRENDERED or
+                                    node._python is not _UNRENDERED):
+            node._str = node._python = _UNRENDERED
+            node = node.parent
 
     def set_parent(self, parent):
         """Set parent ``Expression`` for this object.
@@ -51,6 +86,9 @@ class BaseExpression(object):
         if not isinstance(parent, Expression):
             raise FiqlObjectException("Parent must be of %s not %s" % (
                 Expression, type(parent)))
+        if self.parent is not parent:
+            # The parenthesization of an Expression depends on its parent.
+            self._str = _UNRENDERED
         self.parent = parent
 
     def get_parent(self):
@@ -86,6 +124,12 @@ class Expression(BaseExpression):
         friendly format of ``Constraint``, ``Operator``, ``Constraint``, etc.
         than the more string friendly format can be converted to the other.
 
+    Note:
+        Like the ``Constraint``, the ``Expression`` uses ``__slots__`` rather
+        than a per instance ``__dict__``; an empty ``Expression`` takes about
+        136 bytes (CPython 3.11, 64-bit) including its ``elements`` list,
+        down from about 170 bytes.
+
     Attributes:
         elements (list): List of ``Constraint`` and ``Expression`` elements in
             this ``Expression``.
@@ -93,15 +137,16 @@ class Expression(BaseExpression):
             this ``Expression``.
     """
 
+    __slots__ = ('elements', 'operator', '_working_fragment')
+
     def __init__(self):
         """Initialize instance of ``Expression``."""
         super(Expression, self).__init__()
         self.elements = []
         self.operator = None
-        # Keep track of which nested fragment we are in.
-        self._working_fragment = self
-        # Keep track of what was last added.
-        self._last_element = None
+        # Keep track of which nested fragment we are in while building;
+        # ``None`` when it is this ``Expression``.
+        self._working_fragment = None
 
     def has_constraint(self):
         """Return whether or not the working ``Expression`` has any
@@ -130,7 +175,9 @@ class Expression(BaseExpression):
             ``Operator`` belongs to the parent of the working ``Expression``
             whether one currently exists or not. To remain in the context of
             the top ``Expression``, this method will return the parent here
-            rather than ``self``.
+            rather than ``self``. An explicitly nested ``Expression`` (e.g.,
+            a parenthesized one) is never left this way; its existing
+            elements are moved into a sub-expression instead.
 
         Args:
             operator (Operator): What we are adding.
@@ -141,25 +188,69 @@ class Expression(BaseExpression):
         Raises:
             FiqlObjectExpression: Operator is not a valid ``Operator``.
         """
+        # pylint: disable=protected-access
         if not isinstance(operator, Operator):
             raise FiqlObjectException("%s is not a valid element type" % (
                 operator.__class__))
 
-        if not self._working_fragment.operator:
-            self._working_fragment.operator = operator
-        elif operator > self._working_fragment.operator:
-            last_constraint = self._working_fragment.elements.pop()
-            self._working_fragment = self._working_fragment \
-                .create_nested_expression()
+        fragment = self._working_fragment or self
+        if not fragment.operator:
+            fragment.operator = operator
+            fragment._invalidate_elements()
+        elif operator > fragment.operator:
+            last_constraint = fragment.elements.pop()
+            self._working_fragment = fragment.create_nested_expression()
             self._working_fragment.add_element(last_constraint)
             self._working_fragment.add_operator(operator)
-        elif operator < self._working_fragment.operator:
-            if self._working_fragment.parent:
-                return self._working_fragment.parent.add_operator(operator)
-            return Expression().add_element(self._working_fragment) \
-                .add_operator(operator)
+        elif operator < fragment.operator:
+            parent = fragment.parent
+            if fragment is not self:
+                # Leave the implicitly nested fragment for its parent.
+                self._working_fragment = None if parent is self else parent
+                return self.add_operator(operator)
+            if parent is None:
+                return Expression().add_element(self).add_operator(operator)
+            if parent._working_fragment is self:
+                # Implicitly nested by the parent; the operator is its own.
+                parent._working_fragment = None
+                return parent.add_operator(operator)
+            self._nest_elements(operator)
         return self
 
+    def _nest_elements(self, operator):
+        """Move the elements of this explicitly nested ``Expression`` into a
+        sub-expression and take the lower precedence ``operator``.
+
+        ``(a;b,c)`` is ``((a;b),c)``; the "OR" must stay within the
+        parentheses rather than be added to the parent.
+
+        Args:
+            operator (Operator): The ``Operator`` of lower precedence than
+                that of this ``Expression``.
+        """
+        # pylint: disable=protected-access
+        sub = Expression()
+        sub.operator = self.operator
+        sub.elements = self.elements
+        for element in sub.elements:
+            element.parent = sub
+        sub.parent = self
+        self.elements = [sub]
+        self.operator = operator
+        sub._invalidate_elements()
+        self._invalidate()
+
+    def _invalidate_elements(self):
+        """Drop the renderings of this ``Expression``, of every
+        ``Expression`` containing it and of the string of every
+        ``Expression`` directly within it (Its parenthesization depends on
+        the ``operator`` of this one)."""
+        # pylint: disable=protected-access
+        for element in self.elements:
+            if isinstance(element, Expression):
+                element._str = _UNRENDERED
+        self._invalidate()
+
     def add_element(self, element):
         """Add an element of type ``Operator``, ``Constraint``, or
         ``Expression`` to the ``Expression``.
@@ -174,8 +265,13 @@ class Expression(BaseExpression):
             FiqlObjectException: Element is not a valid type.
         """
         if isinstance(element, BaseExpression):
-            element.set_parent(self._working_fragment)
-            self._working_fragment.elements.append(element)
+            # pylint: disable=protected-access
+            fragment = self._working_fragment or self
+            element.set_parent(fragment)
+            fragment.elements.append(element)
+            if fragment._str is not _UNRENDERED or \
+                    fragment._python is not _UNRENDERED:
+                fragment._invalidate()
             return self
         return self.add_operator(element)
 
@@ -190,6 +286,87 @@ class Expression(BaseExpression):
         self.add_element(sub)
         return sub
 
+    def copy(self):
+        """Create an unattached copy of this ``Expression``.
+
+        The copy shares no mutable state with the original; every nested
+        ``Expression`` and ``Constraint`` is copied as well, which is
+        considerably cheaper than parsing the FIQL string again.
+
+        Returns:
+            Expression: A new ``Expression`` equivalent to this one and with
+            no ``parent``.
+        """
+        # The elements of each Expression are copied before the Expression.
+        return fold(self, _copy, _combine_copy)
+
+    def freeze(self):
+        """Create an immutable copy of this ``Expression`` which can be
+        shared between threads without locking or copying.
+
+        See :func:`fiql_parser.frozen.freeze`.
+
+        Returns:
+            FrozenExpression: The frozen copy.
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from .frozen import freeze
+        return freeze(self)
+
+    def compile(self, getter=None, comparisons=None):
+        """Compile the ``Expression`` into a predicate for filtering records
+        in memory.
+
+        See :func:`fiql_parser.predicate.compile_expression`.
+
+        Returns:
+            callable: Function taking a record and returning ``True`` if the
+            record satisfies this ``Expression``.
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from .predicate import compile_expression
+        return compile_expression(self, getter, comparisons)
+
+    def to_sql(self, column_map, dialect='qmark', cache=None):
+        """Convert the ``Expression`` into a parameterized SQL ``WHERE``
+        clause fragment.
+
+        See :func:`fiql_parser.sql.to_sql`.
+
+        Returns:
+            SqlQuery: The SQL fragment, its params and its fingerprint.
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from .sql import to_sql
+        return to_sql(self, column_map, dialect, cache)
+
+    def normalize(self):
+        """Rewrite the ``Expression`` into an equivalent, canonical and
+        usually smaller ``Expression``.
+
+        See :func:`fiql_parser.normalize.normalize`.
+
+        Returns:
+            Expression: A new, normalized ``Expression``.
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from .normalize import normalize
+        return normalize(self)
+
+    def optimize(self, stats=None):
+        """Reorder the elements of the ``Expression`` to minimize the
+        expected cost of testing a record against it.
+
+        See :func:`fiql_parser.optimizer.optimize`.
+
+        Returns:
+            EvaluationPlan: The reordered ``Expression`` and the estimated
+            number of constraints tested per record before and after.
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from .optimizer import optimize
+        return optimize(self, stats)
+
     def op_and(self, *elements):
         """Update the ``Expression`` by joining the specified additional
         ``elements`` using an "AND" ``Operator``
@@ -202,7 +379,7 @@ class Expression(BaseExpression):
         Returns:
             Expression: ``self`` or related ``Expression``.
         """
-        expression = self.add_operator(Operator(';'))
+        expression = self.add_operator(OPERATOR_AND)
         for element in elements:
             expression.add_element(element)
         return expression
@@ -219,25 +396,81 @@ class Expression(BaseExpression):
         Returns:
             Expression: ``self`` or related ``Expression``.
         """
-        expression = self.add_operator(Operator(','))
+        expression = self.add_operator(OPERATOR_OR)
         for element in elements:
             expression.add_element(element)
         return expression
 
+    def shape_key(self):
+        """Fingerprint the structure of the ``Expression``, ignoring the
+        arguments of its constraints.
+
+        Two expressions have the same shape key if they differ only in their
+        arguments (e.g., "status==new;created=gt=2020" and
+        "status==old;created=gt=2021"), so artifacts built from one which
+        do not depend on its arguments (e.g., the SQL template built by
+        :func:`fiql_parser.sql.to_sql`) can be reused for the other by
+        binding its :meth:`arguments` instead.
+
+        Returns:
+            tuple: A flat, hashable fingerprint; each ``Expression`` is
+            represented by a tuple of its FIQL operator and number of
+            elements, followed by its elements; each ``Constraint`` by its
+            ``selector`` and ``comparison``.
+        """
+        key = []
+        for node in walk(self):
+            if isinstance(node, Expression):
+                key.append(((node.operator or OPERATOR_AND).value,
+                            len(node.elements)))
+            else:
+                key.extend(node.shape_key())
+        return tuple(key)
+
+    def arguments(self):
+        """List the arguments of every ``Constraint`` in the ``Expression``
+        in the order they appear.
+
+        Returns:
+            list: The ``argument`` of each ``Constraint`` (``None`` for those
+            without one).
+        """
+        return [node.argument for node in walk(self)
+                if not isinstance(node, Expression)]
+
     def to_python(self):
         """Deconstruct the ``Expression`` instance to a list or tuple
         (If ``Expression`` contains only one ``Constraint``).
 
         Returns:
-            list or tuple: The deconstructed ``Expression``.
+            list or tuple: The deconstructed ``Expression``. It is kept (See
+            :class:`BaseExpression`) and a copy of its lists returned, so the
+            result may be modified; the tuples of the constraints are shared.
         """
-        if not self.elements:
-            return None
-        if len(self.elements) == 1:
-            return self.elements[0].to_python()
-        operator = self.operator or Operator(';')
-        return [operator.to_python()] + \
-               [elem.to_python() for elem in self.elements]
+        python = self._python
+        if python is _UNRENDERED:
+            # Only those nested Expressions not already deconstructed are
+            # descended into.
+            python = fold(self, _to_python, _combine_python,
+                          _unrendered_python)
+        return _copy_python(python)
+
+    def __reduce__(self):
+        """Pickle the ``Expression`` as its binary encoding (See
+        :func:`fiql_parser.binary.dumps`).
+
+        The builder state and ``parent`` references are not pickled; they are
+        restored when the ``Expression`` is unpickled. This keeps pickles
+        small and free of reference cycles and, as the encoding is flat, the
+        ``Expression`` is pickled (and copied with ``copy.deepcopy``) without
+        recursion however deeply it is nested.
+
+        Returns:
+            tuple: Callable and arguments which recreate the ``Expression``.
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from .binary import dumps
+        return (_restore_expression, (dumps(self),))
 
     def __str__(self):
         """Represent the ``Expression`` instance as a string.
@@ -245,11 +478,244 @@ class Expression(BaseExpression):
         Returns:
             string: The represented ``Expression``.
         """
-        operator = self.operator or Operator(';')
-        elements_str = str(operator).join(
-            ["{0}".format(elem) for elem in self.elements])
-        if self.parent:
-            parent_operator = self.parent.operator or Operator(';')
-            if parent_operator > operator:
-                return "(" + elements_str + ")"
-        return elements_str
+        # Read once; another thread rendering an Expression containing this
+        # one may mark it as rendered within that one at any time.
+        result = self._str
+        if result is not _UNRENDERED and result is not _RENDERED_WITHIN:
+            return result
+        result = "".join(_render_tokens(self))
+        self._str = result
+        return result
+
+
+def _copy(constraint):
+    """Copy a ``Constraint``."""
+    return constraint.copy()
+
+
+def _combine_copy(node, elements):
+    """Copy an ``Expression`` given the copies of its elements."""
+    expression = Expression()
+    expression.operator = node.operator
+    for element in elements:
+        expression.add_element(element)
+    return expression
+
+
+def _to_python(element):
+    """Deconstruct a ``Constraint`` (or take the kept deconstruction of an
+    ``Expression``)."""
+    if isinstance(element, Expression):
+        return element._python  # pylint: disable=protected-access
+    return element.to_python()
+
+
+def _copy_python(python):
+    """Copy the lists of a deconstructed ``Expression``, without recursion.
+
+    Args:
+        python (list or tuple): The deconstructed ``Expression``.
+
+    Returns:
+        list or tuple: A copy sharing only the (immutable) tuples of the
+        constraints with ``python``.
+    """
+    if not isinstance(python, list):
+        return python
+    result = list(python)
+    pending = [result]
+    while pending:
+        current = pending.pop()
+        for index, item in enumerate(current):
+            if isinstance(item, list):
+                current[index] = item = list(item)
+                pending.append(item)
+    return result
+
+
+def _unrendered_python(node):
+    """The elements of ``node`` if it is an ``Expression`` which is not
+    deconstructed yet; See :func:`fold`."""
+    # pylint: disable=protected-access
+    if isinstance(node, Expression) and node._python is _UNRENDERED:
+        return node.elements
+    return None
+
+
+def _combine_python(node, parts):
+    """Deconstruct an ``Expression`` from its deconstructed elements,
+    keeping the result."""
+    if not parts:
+        result = None
+    elif len(parts) == 1:
+        result = parts[0]
+    else:
+        result = [(node.operator or OPERATOR_AND).to_python()]
+        result.extend(parts)
+    node._python = result  # pylint: disable=protected-access
+    return result
+
+
+def _render_tokens(expression):
+    """Render an ``Expression`` as a list of string tokens.
+
+    The tokens of every nested ``Expression`` are added to the one list, so
+    that the string is joined once rather than once per level of nesting.
+    Nested expressions already rendered on their own are added as a single
+    token; the others are marked as rendered within ``expression``.
+
+    Args:
+        expression (Expression): The ``Expression`` to render.
+
+    Returns:
+        list: The tokens of the FIQL string.
+    """
+    # pylint: disable=protected-access
+    tokens = []
+    stack = [expression]
+    while stack:
+        item = stack.pop()
+        if not isinstance(item, BaseExpression):
+            tokens.append(item)
+            continue
+        if not isinstance(item, Expression):
+            tokens.append(str(item))
+            continue
+        if item is not expression:
+            # Read once, as in ``Expression.__str__``.
+            rendered = item._str
+            if rendered is not _UNRENDERED and \
+                    rendered is not _RENDERED_WITHIN:
+                tokens.append(rendered)
+                continue
+            item._str = _RENDERED_WITHIN
+        operator = item.operator or OPERATOR_AND
+        enclose = item.parent is not None and \
+            (item.parent.operator or OPERATOR_AND) > operator
+        if enclose:
+            tokens.append("(")
+            stack.append(")")
+        separator = str(operator)
+        elements = item.elements
+        for index in range(len(elements) - 1, 0, -1):
+            stack.append(elements[index])
+            stack.append(separator)
+        if elements:
+            stack.append(elements[0])
+    return tokens
+
+
+def _elements(node):
+    """The elements of ``node`` if it is an ``Expression``; See
+    :func:`fold`."""
+    if isinstance(node, Expression):
+        return node.elements
+    return None
+
+
+def fold(expression, leaf, combine, children=_elements):
+    """Reduce an ``Expression`` to a single result, bottom up.
+
+    Every ``Constraint`` is passed to ``leaf`` and every ``Expression``,
+    once all of its elements are, to ``combine`` along with the results for
+    its elements. The ``Expression`` is folded without recursion so that the
+    depth of nesting is not limited by the interpreter's recursion limit.
+
+    Args:
+        expression (BaseExpression): The ``Expression`` or ``Constraint`` to
+            fold.
+        leaf (callable): Function taking a ``Constraint`` and returning its
+            result.
+        combine (callable): Function taking an ``Expression`` and the list
+            of results for its elements (in order) and returning its
+            result.
+        children (callable, optional): Function taking a node and returning
+            the nodes within it, or ``None`` if the node is to be passed to
+            ``leaf``. Defaults to the ``elements`` of each ``Expression``;
+            any other tree (e.g., the python representation of an
+            ``Expression``) may be folded by passing another.
+
+    Returns:
+        The result for ``expression``.
+
+    Example:
+
+        >>> fold(parse_str_to_expression("a==1;(b==2,c==3)"),
+        ...      lambda constraint: 1,
+        ...      lambda expression, counts: sum(counts))
+        3
+
+    """
+    elements = children(expression)
+    if elements is None:
+        return leaf(expression)
+    # Each stack entry is a node, an iterator over the nodes within it and
+    # the results for those so far.
+    stack = [(expression, iter(elements), [])]
+    while True:
+        node, elements, results = stack[-1]
+        for element in elements:
+            nested = children(element)
+            if nested is not None:
+                stack.append((element, iter(nested), []))
+                break
+            results.append(leaf(element))
+        else:
+            stack.pop()
+            result = combine(node, results)
+            if not stack:
+                return result
+            stack[-1][2].append(result)
+
+
+def walk(expression):
+    """Iterate through an ``Expression`` and every ``Expression`` and
+    ``Constraint`` within it, in the order they appear; each ``Expression``
+    before its elements.
+
+    The ``Expression`` is walked without recursion (See :func:`fold`).
+
+    Args:
+        expression (BaseExpression): The ``Expression`` or ``Constraint`` to
+            walk.
+
+    Yields:
+        BaseExpression: ``expression`` and every element within it.
+    """
+    stack = [expression]
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, Expression):
+            stack.extend(reversed(node.elements))
+
+
+def _restore_expression(buffer):
+    """Recreate a pickled ``Expression`` (See
+    :meth:`Expression.__reduce__`).
+
+    Args:
+        buffer (bytes): The binary encoding of the ``Expression``.
+
+    Returns:
+        Expression: The recreated ``Expression``.
+    """
+    # pylint: disable=import-outside-toplevel,cyclic-import
+    from .binary import loads
+    return loads(buffer)
+
+
+def release_builder_state(expression):
+    """Drop the state used to track the working fragment while building
+    ``expression`` and every ``Expression`` nested within it.
+
+    Once released, further elements and operators are added relative to the
+    top of each ``Expression`` rather than the fragment last worked on; the
+    result is logically equivalent.
+
+    Args:
+        expression (Expression): The ``Expression`` which is complete.
+    """
+    for node in walk(expression):
+        if isinstance(node, Expression):
+            node._working_fragment = None  # pylint: disable=protected-access
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+An ``Expression`` changes itself as it is built (and may be changed by any
+holder of a reference to it), so sharing one between threads requires either
+a lock or a copy per thread.
+
+The ``frozen`` module includes the immutable counterparts of the
+``Expression`` and ``Constraint``; the ``FrozenExpression`` and
+``FrozenConstraint``. A frozen tree can not be changed once created, so it
+can be shared freely. It is compared and hashed by structure and, as any
+``Expression`` does, it keeps its FIQL string and python representation once
+worked out.
+
+Frozen nodes are instances of ``Expression`` and ``Constraint``; they can be
+rendered, compiled (See :mod:`fiql_parser.predicate`), converted to SQL,
+normalized and optimized just the same. A mutable copy is made with
+``copy()``.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+from .exceptions import FiqlObjectException
+from .operator import Operator
+from .expression import Expression, fold, _UNRENDERED
+from .constraint import Constraint
+from .binary import dumps, loads
+
+
+# The attributes kept once worked out (See ``BaseExpression``); the only ones
+# set after a frozen node is created.
+_RENDERINGS = frozenset(['_str', '_python'])
+
+
+def _frozen(*_):
+    """Reject any attempt to change a frozen node."""
+    raise FiqlObjectException("Frozen expressions can not be changed; "
+                              "change a copy() instead")
+
+
+class FrozenConstraint(Constraint):
+    """
+    The ``FrozenConstraint`` is an immutable ``Constraint`` (See
+    :func:`freeze`).
+
+    Two instances are equal if their ``selector``, ``comparison`` and
+    ``argument`` are.
+    """
+
+    __slots__ = ('_hash',)
+
+    # Set once by ``__init__``; declared here as ``__setattr__`` is disabled.
+    _hash: int
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, selector, comparison=None, argument=None):
+        """Initialize instance of ``FrozenConstraint``.
+
+        Args:
+            selector (string): URL decoded constraint ``selector``.
+            comparison (string, optional): Parsed/mapped ``comparison``
+                operator. Defaults to ``None``.
+            argument (string, optional): URL decoded constraint ``argument``.
+                Defaults to ``None``.
+
+        Raises:
+            FiqlObjectException: Not a valid FIQL comparison.
+        """
+        # Validate and map the comparison as a Constraint would.
+        constraint = Constraint(selector, comparison, argument)
+        setattr_ = object.__setattr__
+        setattr_(self, 'parent', None)
+        setattr_(self, '_selector', constraint.selector)
+        setattr_(self, '_comparison', constraint.comparison)
+        setattr_(self, '_argument', argument)
+        setattr_(self, '_encoded_argument', None)
+        # Shared (as are the coerced arguments within); a race only means a
+        # coercion is done more than once.
+        setattr_(self, '_coerced_arguments', {})
+        setattr_(self, '_str', _UNRENDERED)
+        setattr_(self, '_python', _UNRENDERED)
+        setattr_(self, '_hash', hash((self.selector, self.comparison,
+                                      argument)))
+
+    def __setattr__(self, name, value):
+        if name not in _RENDERINGS:
+            raise AttributeError("'FrozenConstraint' instances are immutable")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError("'FrozenConstraint' instances are immutable")
+
+    set_parent = _frozen
+
+    def freeze(self):
+        """Return this ``FrozenConstraint``; it is already frozen.
+
+        Returns:
+            FrozenConstraint: ``self``.
+        """
+        return self
+
+    def __reduce__(self):
+        """Pickle the ``FrozenConstraint`` as its components only.
+
+        Returns:
+            tuple: Callable and arguments which recreate the
+            ``FrozenConstraint``.
+        """
+        return (FrozenConstraint, (self.selector, self.comparison,
+                                   self.argument))
+
+    def __eq__(self, other):
+        if not isinstance(other, FrozenConstraint):
+            return NotImplemented
+        return self is other or (
+            self._hash == other._hash and
+            self.selector == other.selector and
+            self.comparison == other.comparison and
+            self.argument == other.argument)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return self._hash
+
+
+class FrozenExpression(Expression):
+    """
+    The ``FrozenExpression`` is an immutable ``Expression`` (See
+    :func:`freeze`); its ``elements`` are a tuple of ``FrozenExpression``
+    and ``FrozenConstraint`` elements.
+
+    Two instances are equal if their ``operator`` and ``elements`` are.
+    """
+
+    __slots__ = ('_hash',)
+
+    # Set once by ``__init__``; declared here as ``__setattr__`` is disabled.
+    _hash: int
+
+    # pylint: disable=super-init-not-called,protected-access
+    def __init__(self, operator=None, elements=()):
+        """Initialize instance of ``FrozenExpression``.
+
+        Args:
+            operator (Operator, optional): The ``Operator`` which relates the
+                elements. Defaults to ``None``.
+            elements (iterable, optional): The ``FrozenExpression`` and
+                ``FrozenConstraint`` elements; they must not already be
+                elements of another ``FrozenExpression``.
+
+        Raises:
+            FiqlObjectException: An element is not frozen or already has a
+                parent.
+        """
+        elements = tuple(elements)
+        for element in elements:
+            if not isinstance(element, (FrozenExpression, FrozenConstraint)):
+                raise FiqlObjectException(
+                    "%s is not a valid element type" % element.__class__)
+            if element.parent is not None:
+                raise FiqlObjectException(
+                    "%s is already an element of another expression" % (
+                        element.__class__))
+        if operator is not None and not isinstance(operator, Operator):
+            raise FiqlObjectException("%s is not a valid element type" % (
+                operator.__class__))
+        setattr_ = object.__setattr__
+        setattr_(self, 'parent', None)
+        setattr_(self, 'elements', elements)
+        setattr_(self, 'operator', operator)
+        setattr_(self, '_working_fragment', None)
+        setattr_(self, '_str', _UNRENDERED)
+        setattr_(self, '_python', _UNRENDERED)
+        for element in elements:
+            setattr_(element, 'parent', self)
+        # Each element's hash is already known, so hashing does not recurse
+        # however deeply the tree is nested.
+        setattr_(self, '_hash', hash((
+            operator.value if operator else None,
+            tuple(element._hash for element in elements))))
+
+    def __setattr__(self, name, value):
+        if name not in _RENDERINGS:
+            raise AttributeError("'FrozenExpression' instances are immutable")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError("'FrozenExpression' instances are immutable")
+
+    set_parent = _frozen
+    add_operator = _frozen
+    add_element = _frozen
+    create_nested_expression = _frozen
+    op_and = _frozen
+    op_or = _frozen
+
+    def freeze(self):
+        """Return this ``FrozenExpression``; it is already frozen.
+
+        Returns:
+            FrozenExpression: ``self``.
+        """
+        return self
+
+    def __reduce__(self):
+        """Pickle the ``FrozenExpression`` as its binary encoding, without
+        recursion (See :meth:`Expression.__reduce__`).
+
+        Returns:
+            tuple: Callable and arguments which recreate the
+            ``FrozenExpression``.
+        """
+        return (_restore_frozen_expression, (dumps(self),))
+
+    def __eq__(self, other):
+        if not isinstance(other, FrozenExpression):
+            return NotImplemented
+        # Compare without recursion; the hashes rule out most differences
+        # without descending at all.
+        stack = [(self, other)]
+        while stack:
+            left, right = stack.pop()
+            if left is right:
+                continue
+            if left._hash != right._hash:
+                return False
+            if isinstance(left, FrozenExpression):
+                if not isinstance(right, FrozenExpression) or \
+                        left.operator is not right.operator or \
+                        len(left.elements) != len(right.elements):
+                    return False
+                stack.extend(zip(left.elements, right.elements))
+            elif left != right:
+                return False
+        return True
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return self._hash
+
+
+def _restore_frozen_expression(buffer):
+    """Recreate a pickled ``FrozenExpression`` (See
+    :meth:`FrozenExpression.__reduce__`).
+
+    Args:
+        buffer (bytes): The binary encoding of the ``FrozenExpression``.
+
+    Returns:
+        FrozenExpression: The recreated ``FrozenExpression``.
+    """
+    return freeze(loads(buffer))
+
+
+def _freeze_constraint(constraint):
+    """Create a ``FrozenConstraint`` copy of a ``Constraint``."""
+    return FrozenConstraint(constraint.selector, constraint.comparison,
+                            constraint.argument)
+
+
+def freeze(expression):
+    """Create an immutable copy of an ``Expression`` or ``Constraint``.
+
+    Args:
+        expression (BaseExpression): The ``Expression`` or ``Constraint``.
+
+    Returns:
+        FrozenExpression or FrozenConstraint: The frozen copy (or
+        ``expression`` itself if it is already frozen).
+
+    Example:
+
+        >>> shared = parse_str_to_expression("last_name==foo*").freeze()
+        >>> str(shared)
+        'last_name==foo*'
+
+    """
+    if isinstance(expression, (FrozenExpression, FrozenConstraint)):
+        return expression
+    # The elements of each Expression are frozen before the Expression.
+    return fold(expression, _freeze_constraint,
+                lambda node, elements: FrozenExpression(node.operator,
+                                                        elements))
@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+"""
+Applying a filter to an in-memory collection one record at a time (See
+:mod:`fiql_parser.predicate`) takes time proportional to the size of the
+collection no matter how few records match.
+
+The ``index`` module includes an in-memory document store which keeps hash
+indexes (for the "==" and "!=" comparisons) and sorted indexes (for the
+range comparisons) of chosen selectors. An ``Expression`` is evaluated
+against the indexes as set operations on a ``Bitmap`` of rows (See
+:mod:`fiql_parser.bitmap`); the constraints joined by an "AND" ``Operator``
+are intersected and those joined by an "OR" ``Operator`` are united.
+Constraints on selectors which are not indexed are tested against the
+candidate documents only.
+
+Documents match exactly the same constraints as they would using
+:func:`fiql_parser.predicate.compile_expression`.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+from bisect import bisect_left, bisect_right
+
+from .bitmap import Bitmap
+from .constants import COMPARISON_MAP
+from .expression import Expression, fold
+from .operator import OPERATOR_OR
+from .predicate import (compile_expression, _default_getter,
+                        _typed_arguments, _INCOMPARABLE)
+
+
+# Indexed kind of each type of value; values of any other type are tested
+# using the predicate instead (See ``_typed_arguments``).
+_KINDS = {
+    type(''): 'string',
+    int: 'number',
+    float: 'number',
+    bool: 'boolean',
+}
+
+
+def _kind_arguments(argument):
+    """Coerce a FIQL argument for comparison with each kind of value.
+
+    Returns:
+        dict: Mappings of kind to the coerced argument; kinds of value which
+        can not be compared with the argument are left out.
+    """
+    arguments = _typed_arguments(argument)[0]
+    kind_arguments = {}
+    for value_type, kind in _KINDS.items():
+        if arguments.get(value_type, _INCOMPARABLE) is not _INCOMPARABLE:
+            kind_arguments[kind] = arguments[value_type]
+    return kind_arguments
+
+
+class _SelectorIndex(object):
+    """
+    The hash and/or sorted indexes of the values of a single selector.
+
+    Attributes:
+        kinds (dict): Mappings of kind to the ``Bitmap`` of the rows with a
+            value of that kind.
+        values (dict): Mappings of ``(kind, value)`` to the ``Bitmap`` of the
+            rows with that value; ``None`` without a hash index.
+        ordered (dict): Mappings of kind to the sorted values, the
+            corresponding rows and the ``(value, row)`` pairs not yet sorted;
+            ``None`` without a sorted index.
+        others (Bitmap): The rows with a value which is not of an indexed
+            kind.
+    """
+
+    def __init__(self, hashed, ordered):
+        """Initialize instance of ``_SelectorIndex``."""
+        self.kinds = {}
+        self.values = {} if hashed else None
+        self.ordered = {} if ordered else None
+        self.others = Bitmap()
+
+    def add(self, row, value):
+        """Index the ``value`` of a row."""
+        if value is None:
+            return
+        kind = _KINDS.get(value.__class__)
+        if kind is None:
+            self.others.add(row)
+            return
+        self.kinds.setdefault(kind, Bitmap()).add(row)
+        if self.values is not None:
+            self.values.setdefault((kind, value), Bitmap()).add(row)
+        if self.ordered is not None:
+            # Sorted when next looked up; See ``_sorted``.
+            self.ordered.setdefault(kind, ([], [], []))[2].append(
+                (value, row))
+
+    def remove(self, row, value):
+        """Remove the ``value`` of a row from the index."""
+        if value is None:
+            return
+        kind = _KINDS.get(value.__class__)
+        if kind is None:
+            self.others.discard(row)
+            return
+        self.kinds[kind].discard(row)
+        if self.values is not None:
+            rows = self.values[(kind, value)]
+            rows.discard(row)
+            if not rows:
+                del self.values[(kind, value)]
+        if self.ordered is not None:
+            keys, rows, pending = self.ordered[kind]
+            try:
+                pending.remove((value, row))
+                return
+            except ValueError:
+                pass
+            position = bisect_left(keys, value)
+            while rows[position] != row:
+                position += 1
+            del keys[position]
+            del rows[position]
+
+    def present(self):
+        """The ``Bitmap`` of the rows with a value which is not ``None``."""
+        return Bitmap.union(self.others, *self.kinds.values())
+
+    def _sorted(self, kind):
+        """Get the sorted values of ``kind`` and the corresponding rows,
+        first merging in the values added since the last lookup.
+
+        Adding values one at a time to the sorted lists would take time
+        proportional to the number of values each; they are sorted in bulk
+        instead.
+        """
+        keys, rows, pending = self.ordered.get(kind, ((), (), ()))
+        if pending:
+            pairs = sorted(pending + list(zip(keys, rows)),
+                           key=lambda pair: pair[0])
+            keys[:] = [pair[0] for pair in pairs]
+            rows[:] = [pair[1] for pair in pairs]
+            del pending[:]
+        return keys, rows
+
+    def _equal(self, kind, argument):
+        """The ``Bitmap`` of the rows with a value of ``kind`` equal to
+        ``argument``."""
+        if self.values is not None:
+            return self.values.get((kind, argument), Bitmap())
+        keys, rows = self._sorted(kind)
+        return Bitmap(rows[bisect_left(keys, argument):
+                           bisect_right(keys, argument)])
+
+    def lookup(self, comparison, argument):
+        """The rows with a value of an indexed kind which satisfies the
+        comparison.
+
+        Args:
+            comparison (string): The common FIQL comparison (e.g., ">").
+            argument (string): The URL decoded argument.
+
+        Returns:
+            Bitmap: The matching rows or ``None`` if the index does not
+            support the comparison.
+        """
+        arguments = _kind_arguments(argument)
+        results = []
+        if comparison in ('==', '!='):
+            for kind, kind_argument in arguments.items():
+                if kind not in self.kinds:
+                    continue
+                equal = self._equal(kind, kind_argument)
+                results.append(
+                    equal if comparison == '==' else self.kinds[kind] - equal)
+            return Bitmap.union(*results)
+        if self.ordered is None or comparison not in ('>', '>=', '<', '<='):
+            return None
+        for kind, kind_argument in arguments.items():
+            if kind not in self.ordered:
+                continue
+            keys, rows = self._sorted(kind)
+            if comparison == '>':
+                rows = rows[bisect_right(keys, kind_argument):]
+            elif comparison == '>=':
+                rows = rows[bisect_left(keys, kind_argument):]
+            elif comparison == '<':
+                rows = rows[:bisect_left(keys, kind_argument)]
+            else:
+                rows = rows[:bisect_right(keys, kind_argument)]
+            results.append(Bitmap(rows))
+        return Bitmap.union(*results)
+
+
+class DocumentIndex(object):
+    """
+    The ``DocumentIndex`` is an in-memory store of documents (``dict``
+    objects by default) indexed by selected selectors and queried with an
+    ``Expression``.
+
+    Documents can be added and removed at any time; the indexes are updated
+    incrementally. A document must not be modified while it is in the
+    ``DocumentIndex``; remove it and add it again instead.
+
+    Each document is assigned a row; the rows of removed documents are
+    reused.
+
+    Example:
+
+        >>> index = DocumentIndex(hashed=['status'], ordered=['age'])
+        >>> index.add(1, {'status': 'new', 'age': 45})
+        >>> index.add(2, {'status': 'old', 'age': 12})
+        >>> index.query(parse_str_to_expression("status==new,age=lt=18"))
+        {1, 2}
+
+    """
+
+    def __init__(self, hashed=(), ordered=(), getter=None):
+        """Initialize instance of ``DocumentIndex``.
+
+        Args:
+            hashed (iterable, optional): Selectors to keep a hash index of;
+                supports the "==" and "!=" comparisons.
+            ordered (iterable, optional): Selectors to keep a sorted index
+                of; supports every common FIQL comparison.
+            getter (callable, optional): Function taking a document and a
+                selector and returning the value of the selector for that
+                document. Defaults to ``document.get(selector)``.
+        """
+        hashed, ordered = set(hashed), set(ordered)
+        self.getter = getter or _default_getter
+        # Row of each document id, and id and document of each row.
+        self._rows = {}
+        self._entries = []
+        self._free = []
+        self._present = Bitmap()
+        self._indexes = dict(
+            (selector, _SelectorIndex(selector in hashed,
+                                      selector in ordered))
+            for selector in hashed | ordered)
+
+    def add(self, doc_id, document):
+        """Add (or replace) a document.
+
+        Args:
+            doc_id: Hashable id of the document.
+            document: The document.
+        """
+        if doc_id in self._rows:
+            self.remove(doc_id)
+        if self._free:
+            row = self._free.pop()
+            self._entries[row] = (doc_id, document)
+        else:
+            row = len(self._entries)
+            self._entries.append((doc_id, document))
+        self._rows[doc_id] = row
+        self._present.add(row)
+        for selector, index in self._indexes.items():
+            index.add(row, self.getter(document, selector))
+
+    def remove(self, doc_id):
+        """Remove a document.
+
+        Args:
+            doc_id: Id of the document.
+
+        Raises:
+            KeyError: There is no document with ``doc_id``.
+        """
+        row = self._rows.pop(doc_id)
+        document = self._entries[row][1]
+        self._entries[row] = None
+        self._free.append(row)
+        self._present.discard(row)
+        for selector, index in self._indexes.items():
+            index.remove(row, self.getter(document, selector))
+
+    def get(self, doc_id, default=None):
+        """Get a document by its id."""
+        row = self._rows.get(doc_id)
+        return default if row is None else self._entries[row][1]
+
+    def __contains__(self, doc_id):
+        return doc_id in self._rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _scan(self, predicate, rows):
+        """The ``Bitmap`` of the ``rows`` satisfying ``predicate``."""
+        entries = self._entries
+        return Bitmap(row for row in rows if predicate(entries[row][1]))
+
+    def _lookup(self, constraint):
+        """Evaluate a ``Constraint`` against the indexes.
+
+        Returns:
+            Bitmap: The matching rows or ``None`` if the ``Constraint`` can
+            not be answered by the indexes.
+        """
+        index = self._indexes.get(constraint.selector)
+        if index is None:
+            return None
+        if not constraint.comparison:
+            return index.present()
+        comparison = COMPARISON_MAP.get(constraint.comparison)
+        result = index.lookup(comparison, constraint.argument) \
+            if comparison else None
+        if result is None or not index.others:
+            return result
+        return result | self._scan(
+            compile_expression(constraint, self.getter), index.others)
+
+    def _combine(self, node, results):
+        """Combine the results of the elements of an ``Expression``.
+
+        Returns:
+            Bitmap: The matching rows or ``None`` if none of the elements can
+            be answered by the indexes.
+        """
+        if not results:
+            return self._present.copy()
+        bitmaps = [result for _, result in results if result is not None]
+        deferred = [element for element, result in results if result is None]
+        if not bitmaps:
+            return None
+        if node.operator is OPERATOR_OR:
+            matched = Bitmap.union(*bitmaps)
+            if deferred:
+                matched |= self._scan(self._predicate(node, deferred),
+                                      self._present - matched)
+            return matched
+        matched = Bitmap.intersection(*bitmaps)
+        if deferred and matched:
+            matched = self._scan(self._predicate(node, deferred), matched)
+        return matched
+
+    def _predicate(self, node, elements):
+        """Compile the ``elements`` of ``node`` which are tested against each
+        candidate document."""
+        expression = Expression()
+        expression.operator = node.operator
+        expression.elements = list(elements)
+        return compile_expression(expression, self.getter)
+
+    def query_rows(self, expression):
+        """Find the rows of the documents satisfying an ``Expression`` (or
+        ``Constraint``).
+
+        Args:
+            expression (BaseExpression): The ``Expression`` to evaluate.
+
+        Returns:
+            Bitmap: The rows of the matching documents.
+
+        Raises:
+            FiqlObjectException: A comparison is not supported.
+        """
+        _, result = fold(
+            expression,
+            lambda constraint: (constraint, self._lookup(constraint)),
+            lambda node, results: (node, self._combine(node, results)))
+        if result is None:
+            return self._scan(compile_expression(expression, self.getter),
+                              self._present)
+        return result
+
+    def count(self, expression):
+        """Count the documents satisfying an ``Expression`` (or
+        ``Constraint``) without looking any of them up.
+
+        Returns:
+            integer: The number of matching documents.
+        """
+        return len(self.query_rows(expression))
+
+    def query(self, expression):
+        """Find the documents satisfying an ``Expression`` (or
+        ``Constraint``).
+
+        Args:
+            expression (BaseExpression): The ``Expression`` to evaluate.
+
+        Returns:
+            set: The ids of the matching documents.
+
+        Raises:
+            FiqlObjectException: A comparison is not supported.
+        """
+        entries = self._entries
+        return set(entries[row][0] for row in self.query_rows(expression))
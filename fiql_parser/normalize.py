@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+An ``Expression`` built with :meth:`Expression.add_operator`,
+:meth:`Expression.create_nested_expression` or by chaining
+:meth:`Expression.op_and`/:meth:`Expression.op_or` often contains nesting
+which adds nothing (e.g., ``a;(b;c)`` or a nested ``Expression`` with a
+single element) and duplicate constraints. Every evaluator, and the SQL
+generated from it, pays for that extra depth.
+
+The ``normalize`` module includes the code used to rewrite an ``Expression``
+into an equivalent, canonical and usually smaller one. Two expressions which
+differ only in the order of their elements, redundant nesting or repeated
+constraints normalize to the same ``Expression``; caches keyed by the FIQL
+string or shape (See :mod:`fiql_parser.cache`) hit more often as a result.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import hashlib
+
+from .expression import Expression, fold
+from .operator import OPERATOR_AND
+
+
+# Result for an element which is always ``True``.
+_TRUE = (None, '', frozenset(), None)
+
+
+class _Terms(object):
+    """
+    The normalized elements of one or more nested expressions of the same
+    ``Operator``, flattened into one another (Associativity) but not yet
+    built into an ``Expression``. They are only built (See :func:`_build`)
+    once contained by an ``Expression`` of the other ``Operator``, or at
+    the top, so flattening deep nesting does not rebuild every level.
+
+    Attributes:
+        operator (Operator): The ``Operator`` joining the elements.
+        constraints (dict): Mappings of key to the result of each
+            ``Constraint``.
+        expressions (dict): Mappings of key to the result of each
+            sub-expression.
+    """
+
+    __slots__ = ('operator', 'constraints', 'expressions')
+
+    def __init__(self, operator):
+        """Initialize instance of ``_Terms``."""
+        self.operator = operator
+        self.constraints = {}
+        self.expressions = {}
+
+    def __len__(self):
+        return len(self.constraints) + len(self.expressions)
+
+    def merge(self, other):
+        """Add the elements of ``other`` (of the same ``Operator``)."""
+        self.constraints.update(other.constraints)
+        self.expressions.update(other.expressions)
+
+
+def _reduce(operator, results):
+    """Reduce the normalized elements of an ``Expression``.
+
+    Args:
+        operator (Operator): The ``Operator`` of the ``Expression``.
+        results (list): The result for each element; ``_Terms`` for an
+            ``Expression`` not built yet, otherwise an ``(element, key,
+            constraint_keys, terms)`` tuple (See :func:`_build`) where
+            ``element`` is ``None`` for an element which is always ``True``.
+
+    Returns:
+        The ``_Terms`` of the ``Expression``, or ``_TRUE``.
+    """
+    if not results:
+        return _TRUE
+    # The elements of the largest nested Expression of the same operator are
+    # added to rather than copied; flattening deep nesting of a single
+    # operator is then linear.
+    same = [result for result in results
+            if isinstance(result, _Terms) and result.operator is operator]
+    terms = max(same, key=len) if same else _Terms(operator)
+    for result in results:
+        if result is terms:
+            continue
+        if isinstance(result, _Terms):
+            if result.operator is operator:
+                terms.merge(result)
+                continue
+            result = _build(result)
+        element = result[0]
+        if element is None:
+            if operator is OPERATOR_AND:
+                # "AND" with ``True`` is the other elements.
+                continue
+            # "OR" with ``True`` is ``True``.
+            return _TRUE
+        if not isinstance(element, Expression):
+            terms.constraints[result[1]] = result
+        elif element.operator is operator:
+            # Flatten elements of the same operator (Associativity).
+            terms.merge(result[3])
+        else:
+            terms.expressions[result[1]] = result
+    return terms
+
+
+def _build(terms):
+    """Build the ``Expression`` of gathered elements.
+
+    Args:
+        terms (_Terms): The normalized elements.
+
+    Returns:
+        tuple: ``(element, key, constraint_keys, terms)``; ``element`` is the
+        ``Expression`` (or its only element) or ``None`` if it is always
+        ``True``, ``key`` its canonical key and ``constraint_keys`` the keys
+        of the constraints directly within it.
+    """
+    constraints = terms.constraints
+    expressions = terms.expressions
+    # Absorption; ``a;(a,b)`` is ``a`` and ``a,(a;b)`` is ``a``.
+    for key in [key for key, result in expressions.items()
+                if any(constraint_key in constraints
+                       for constraint_key in result[2])]:
+        del expressions[key]
+    parts = [constraints[key] for key in sorted(constraints)]
+    parts.extend(expressions[key] for key in sorted(expressions))
+    if not parts:
+        return _TRUE
+    if len(parts) == 1:
+        return parts[0]
+    expression = Expression()
+    expression.operator = terms.operator
+    for part in parts:
+        expression.add_element(part[0])
+    # The key of an Expression is the digest of those of its elements, so
+    # its length (and the time taken to build the key of the Expression
+    # containing it) does not grow with the depth of nesting. Each is
+    # parenthesized so it can not be mistaken for that of a Constraint.
+    digest = hashlib.sha1(
+        str(terms.operator).join(part[1] for part in parts).encode('utf-8'))
+    key = "(" + digest.hexdigest() + ")"
+    return (expression, key, frozenset(constraints), terms)
+
+
+def _normalize_constraint(constraint):
+    """The result (See :func:`_build`) for a ``Constraint``."""
+    key = str(constraint)
+    return (constraint.copy(), key, frozenset([key]), None)
+
+
+def normalize(expression):
+    """Rewrite an ``Expression`` (or ``Constraint``) into an equivalent,
+    canonical ``Expression``.
+
+    The rewrite, applied bottom up, is:
+
+      - A nested ``Expression`` with the same ``Operator`` as the
+        ``Expression`` containing it is flattened into it (``a;(b;c)`` is
+        ``a;b;c``) and a nested ``Expression`` with a single element is
+        replaced by that element.
+      - Duplicate constraints and sub-expressions are dropped (``a;a`` is
+        ``a``).
+      - Trivially ``True`` sub-expressions are folded. FIQL has no literals,
+        so an ``Expression`` without elements is the only constant; it is
+        dropped from an "AND" and makes an "OR" ``True``. A sub-expression
+        which repeats a ``Constraint`` of the ``Expression`` containing it is
+        absorbed (``a;(a,b)`` and ``a,(a;b)`` are both ``a``).
+      - Elements are sorted; constraints first, by their FIQL string, then
+        sub-expressions, by a digest of their normalized elements.
+
+    Every ``Expression`` is visited once and keyed by a digest of fixed
+    length, so apart from the sorting the time taken is linear in the size
+    of the ``Expression``. The original is not modified.
+
+    Args:
+        expression (BaseExpression): The ``Expression`` or ``Constraint`` to
+            normalize.
+
+    Returns:
+        Expression: A new, equivalent ``Expression``; without elements if the
+        original is always ``True``.
+
+    Example:
+
+        >>> str(normalize(parse_str_to_expression("b==2;(a==1;b==2)")))
+        'a==1;b==2'
+
+    """
+    result = fold(expression, _normalize_constraint,
+                  lambda node, results: _reduce(node.operator or OPERATOR_AND,
+                                                results))
+    if isinstance(result, _Terms):
+        result = _build(result)
+    element = result[0]
+    if element is None:
+        return Expression()
+    if isinstance(element, Expression):
+        return element
+    return Expression().add_element(element)
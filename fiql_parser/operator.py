@@ -11,6 +11,8 @@ Attributes:
     OPERATOR_MAP (dict of tuple): Mappings of FIQL operators to common terms
         and their associated precedence.
     REV_OPERATOR_MAP (dict): Reverse mappings for common FIQL operators.
+    OPERATOR_AND (Operator): The "AND" ``Operator``.
+    OPERATOR_OR (Operator): The "OR" ``Operator``.
 """
 from __future__ import unicode_literals
 from __future__ import absolute_import
@@ -32,28 +34,72 @@ class Operator(object):
     The comparison ``Operator`` is the representation of the FIQL comparison
     operator.
 
+    There are only two FIQL operators so there are only ever two instances
+    of ``Operator``; ``Operator(';')`` and ``Operator('AND')`` both return
+    ``OPERATOR_AND`` and ``Operator(',')`` and ``Operator('OR')`` both return
+    ``OPERATOR_OR``. Instances are immutable.
+
     Attributes:
         value (string): The FIQL operator.
+        precedence (integer): The precedence of the FIQL operator.
     """
 
-    # pylint: disable=too-few-public-methods
+    __slots__ = ('value', 'precedence')
+
+    # Set once by ``_intern``; declared here as ``__setattr__`` is disabled.
+    value: str
+    precedence: int
+
+    # Mapping of FIQL operators and common terms to the shared instances.
+    _instances = {}
 
-    def __init__(self, fiql_op_str):
-        """Initialize instance of ``Operator``.
+    def __new__(cls, fiql_op_str):
+        """Return the instance of ``Operator`` for the FIQL operator.
 
         Args:
-            fiql_op_str (string): The FIQL operator (e.g., ";").
+            fiql_op_str (string): The FIQL operator (e.g., ";") or its common
+                term (e.g., "AND").
+
+        Returns:
+            Operator: The shared instance for the FIQL operator.
 
         Raises:
             FiqlObjectException: Invalid FIQL operator.
         """
-        if fiql_op_str not in OPERATOR_MAP:
-            # Check for 'AND' or 'OR'.
-            if not REV_OPERATOR_MAP.get(fiql_op_str):
-                raise FiqlObjectException(
-                    "'%s' is not a valid FIQL operator" % fiql_op_str)
-            fiql_op_str = REV_OPERATOR_MAP.get(fiql_op_str)
-        self.value = fiql_op_str
+        try:
+            return cls._instances[fiql_op_str]
+        except KeyError as exc:
+            raise FiqlObjectException(
+                "'%s' is not a valid FIQL operator" % fiql_op_str) from exc
+
+    @classmethod
+    def _intern(cls, fiql_op_str):
+        """Create the shared instance of ``Operator`` for a FIQL operator.
+
+        Args:
+            fiql_op_str (string): The FIQL operator (e.g., ";").
+
+        Returns:
+            Operator: The newly created instance.
+        """
+        operator = object.__new__(cls)
+        object.__setattr__(operator, 'value', fiql_op_str)
+        object.__setattr__(operator, 'precedence',
+                           OPERATOR_MAP[fiql_op_str][1])
+        cls._instances[fiql_op_str] = operator
+        cls._instances[OPERATOR_MAP[fiql_op_str][0]] = operator
+        return operator
+
+    def __setattr__(self, name, value):
+        raise AttributeError("'Operator' instances are immutable")
+
+    def __reduce__(self):
+        """Pickle the ``Operator`` as its FIQL operator.
+
+        Returns:
+            tuple: Callable and arguments which return the shared instance.
+        """
+        return (Operator, (self.value,))
 
     def to_python(self):
         """Deconstruct the ``Operator`` instance to a string.
@@ -82,11 +128,9 @@ class Operator(object):
             integer: ``1`` if greater than ``other``, ``-1`` if less than
             ``other``, and ``0`` if of equal precedence of ``other``.
         """
-        prec_self = OPERATOR_MAP[self.value][1]
-        prec_other = OPERATOR_MAP[other.value][1]
-        if prec_self < prec_other:
+        if self.precedence < other.precedence:
             return -1
-        if prec_self > prec_other:
+        if self.precedence > other.precedence:
             return 1
         return 0
 
@@ -100,7 +144,19 @@ class Operator(object):
         Returns:
             boolean: ``True`` if of equal precedence of ``other``.
         """
-        return OPERATOR_MAP[self.value][1] == OPERATOR_MAP[other.value][1]
+        return self.precedence == other.precedence
+
+    def __ne__(self, other):
+        """Of different precedence.
+
+        Args:
+            other (Operator): The ``Operator`` we are comparing precedence
+                against.
+
+        Returns:
+            boolean: ``True`` if not of equal precedence of ``other``.
+        """
+        return self.precedence != other.precedence
 
     def __lt__(self, other):
         """Of less than precedence.
@@ -112,4 +168,24 @@ class Operator(object):
         Returns:
             boolean: ``True`` if of less than precedence of ``other``.
         """
-        return OPERATOR_MAP[self.value][1] < OPERATOR_MAP[other.value][1]
+        return self.precedence < other.precedence
+
+    def __gt__(self, other):
+        """Of greater than precedence.
+
+        Args:
+            other (Operator): The ``Operator`` we are comparing precedence
+                against.
+
+        Returns:
+            boolean: ``True`` if of greater than precedence of ``other``.
+        """
+        return self.precedence > other.precedence
+
+    def __hash__(self):
+        return hash(self.precedence)
+
+
+# pylint: disable=protected-access
+OPERATOR_AND = Operator._intern(';')
+OPERATOR_OR = Operator._intern(',')
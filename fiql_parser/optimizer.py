@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+A predicate compiled from an ``Expression`` (See
+:mod:`fiql_parser.predicate`) tests the elements joined by an "AND"
+``Operator`` until one fails and those joined by an "OR" ``Operator`` until
+one succeeds. How soon that happens, and so the number of constraints tested
+per record, depends on the order of the elements; by default that is the
+order they were parsed in.
+
+The ``optimizer`` module includes the code used to reorder the elements of an
+``Expression`` using the cost and selectivity (the probability of being
+satisfied) of each ``Constraint``. The elements of an "AND" are ordered by
+``cost / (1 - selectivity)`` and those of an "OR" by ``cost / selectivity``;
+assuming the constraints are independent, this minimizes the expected cost of
+testing a record.
+
+Attributes:
+    SelectorStats (namedtuple): The relative ``cost`` of testing a
+        ``Constraint`` and its ``selectivity``.
+    EvaluationPlan (namedtuple): The reordered ``expression``, its estimated
+        ``selectivity`` and the expected number of constraints tested
+        (``checks_before``, ``checks_after``) and expected cost
+        (``cost_before``, ``cost_after``) per record before and after
+        reordering.
+    DEFAULT_STATS (SelectorStats): The statistics assumed for a
+        ``Constraint`` without any.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import division
+
+from collections import namedtuple
+from functools import partial
+from timeit import default_timer
+
+from .expression import Expression, fold, walk
+from .operator import OPERATOR_OR
+from .predicate import compile_constraint
+
+
+SelectorStats = namedtuple('SelectorStats', ['cost', 'selectivity'])
+
+EvaluationPlan = namedtuple('EvaluationPlan', [
+    'expression', 'selectivity', 'checks_before', 'checks_after',
+    'cost_before', 'cost_after'])
+
+DEFAULT_STATS = SelectorStats(1.0, 0.5)
+
+
+def gather_stats(expression, records, getter=None, comparisons=None):
+    """Gather the statistics of every ``Constraint`` in ``expression`` by
+    testing a sample of records.
+
+    Args:
+        expression (BaseExpression): The ``Expression`` or ``Constraint``.
+        records (iterable): The sample of records.
+        getter (callable, optional): See
+            :func:`fiql_parser.predicate.compile_constraint`.
+        comparisons (dict, optional): See
+            :func:`fiql_parser.predicate.compile_constraint`.
+
+    Returns:
+        dict: Mappings of the FIQL string of each ``Constraint`` to its
+        ``SelectorStats``. The costs are relative; their mean is ``1.0``.
+        Empty if there are no records.
+    """
+    records = list(records)
+    if not records:
+        return {}
+    timings = {}
+    for constraint in walk(expression):
+        if isinstance(constraint, Expression):
+            continue
+        key = str(constraint)
+        if key in timings:
+            continue
+        predicate = compile_constraint(constraint, getter, comparisons)
+        started = default_timer()
+        matched = sum(1 for record in records if predicate(record))
+        timings[key] = (default_timer() - started, matched / len(records))
+    mean = sum(elapsed for elapsed, _ in timings.values()) / len(timings)
+    return dict(
+        (key, SelectorStats(elapsed / mean if mean else 1.0, selectivity))
+        for key, (elapsed, selectivity) in timings.items())
+
+
+def _constraint_stats(stats, constraint, default):
+    """Look up the statistics of ``constraint`` by its FIQL string, then by
+    its ``selector``."""
+    return stats.get(str(constraint)) or stats.get(constraint.selector) or \
+        default
+
+
+def _combine(is_or, results):
+    """Combine the estimates of the elements of an ``Expression`` in the
+    order given.
+
+    Returns:
+        tuple: The selectivity, expected checks and expected cost.
+    """
+    if not results:
+        # An Expression without elements is always satisfied.
+        return 1.0, 0.0, 0.0
+    checks = cost = 0.0
+    # Probability that the remaining elements are tested at all.
+    reached = 1.0
+    for result in results:
+        checks += reached * result[1]
+        cost += reached * result[2]
+        reached *= (1.0 - result[0]) if is_or else result[0]
+    selectivity = 1.0 - reached if is_or else reached
+    return selectivity, checks, cost
+
+
+def _rank(is_or, result):
+    """Sort key placing the elements most likely to short-circuit the
+    evaluation cheaply first."""
+    selectivity, cost = result[0], result[4]
+    likelihood = selectivity if is_or else 1.0 - selectivity
+    if likelihood <= 0:
+        return float('inf')
+    return cost / likelihood
+
+
+def _reorder(expression, results):
+    """Reorder the elements of an ``Expression`` given the result (See
+    :func:`optimize`) for each of them.
+
+    Returns:
+        tuple: The result for the ``Expression``.
+    """
+    is_or = expression.operator is OPERATOR_OR
+    selectivity, checks_before, cost_before = _combine(
+        is_or, [result[:3] for result in results])
+    results.sort(key=partial(_rank, is_or))
+    _, checks_after, cost_after = _combine(
+        is_or, [(result[0],) + result[3:5] for result in results])
+    reordered = Expression()
+    reordered.operator = expression.operator
+    for result in results:
+        reordered.add_element(result[5])
+    return (selectivity, checks_before, cost_before, checks_after,
+            cost_after, reordered)
+
+
+def optimize(expression, stats=None, default=DEFAULT_STATS):
+    """Reorder the elements of an ``Expression`` (or ``Constraint``) to
+    minimize the expected cost of testing a record.
+
+    Args:
+        expression (BaseExpression): The ``Expression`` or ``Constraint`` to
+            reorder.
+        stats (dict, optional): Mappings of the FIQL string of a
+            ``Constraint`` (e.g., as returned by :func:`gather_stats`) or of a
+            selector to ``SelectorStats``.
+        default (SelectorStats, optional): The statistics for a
+            ``Constraint`` without any. Defaults to ``DEFAULT_STATS``.
+
+    Returns:
+        EvaluationPlan: The reordered copy of ``expression`` and the
+        estimates before and after reordering.
+
+    Example:
+
+        >>> plan = optimize(parse_str_to_expression("a==1;b==2"),
+        ...                 {'a': SelectorStats(1.0, 0.9),
+        ...                  'b': SelectorStats(1.0, 0.1)})
+        >>> str(plan.expression)
+        'b==2;a==1'
+
+    """
+    stats = stats or {}
+    # Each result is the selectivity, the expected checks and cost before
+    # reordering, the expected checks and cost after reordering and the
+    # reordered element.
+    def reorder_constraint(constraint):
+        """The result for a ``Constraint``."""
+        cost, selectivity = _constraint_stats(stats, constraint, default)
+        return (selectivity, 1.0, cost, 1.0, cost, constraint.copy())
+
+    result = fold(expression, reorder_constraint, _reorder)
+    return EvaluationPlan(result[5], result[0], result[1], result[3],
+                          result[2], result[4])
@@ -6,22 +6,37 @@ a FIQL ``Expression`` into an object representing the same FIQL
 
 The ``Expression`` object returned is ideally suited for use in filtering
 database queries with many ORMs.
+
+Attributes:
+    ParseLimits (namedtuple): The limits on the FIQL strings accepted; the
+        ``max_length`` of the string, the ``max_constraints`` it contains,
+        the ``max_depth`` of nested expressions and the
+        ``max_argument_length`` of any (percent-encoded) argument. A limit of
+        ``None`` (the default) is not enforced.
 """
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
-try:
-    # pylint: disable=no-name-in-module
-    from urllib import unquote_plus
-except ImportError:
-    # pylint: disable=import-error,no-name-in-module
-    from urllib.parse import unquote_plus
+from codecs import latin_1_decode
+from collections import namedtuple
 
 from .constants import CONSTRAINT_COMP, COMPARISON_MAP
 from .exceptions import FiqlFormatException, FiqlParserException
-from .expression import BaseExpression, Expression
-from .constraint import Constraint
-from .operator import Operator
+from .exceptions import FiqlLengthException, FiqlConstraintCountException
+from .exceptions import FiqlDepthException, FiqlArgumentLengthException
+from .expression import (BaseExpression, Expression, fold,
+                         release_builder_state)
+from .constraint import Constraint, _unquote
+from .operator import Operator, OPERATOR_MAP
+
+
+# The tokens which may start a Constraint or nested Expression; for error
+# reporting.
+_OPERAND = ('constraint', '(')
+
+ParseLimits = namedtuple('ParseLimits', [
+    'max_length', 'max_constraints', 'max_depth', 'max_argument_length'])
+ParseLimits.__new__.__defaults__ = (None,) * len(ParseLimits._fields)
 
 
 def iter_parse(fiql_str):
@@ -37,6 +52,11 @@ def iter_parse(fiql_str):
       - argument: The argument portion of a FIQL constraint or ``None`` if
         yielding the last portion of the string.
 
+    The FIQL string may also be given as ``bytes``, ``bytearray`` or
+    ``memoryview`` (e.g., the raw query string of a request). Only the
+    selectors and arguments which contain a percent-encoding (or "+") are
+    percent-decoded.
+
     For usage see :func:`parse_str_to_expression`.
 
     Args:
@@ -45,25 +65,273 @@ def iter_parse(fiql_str):
     Yields:
         tuple: Preamble, selector, comparison, argument.
     """
-    while fiql_str:
-        constraint_match = CONSTRAINT_COMP.split(fiql_str, 1)
-        if len(constraint_match) < 2:
-            yield (constraint_match[0], None, None, None)
-            break
+    for (preamble, selector, comparison, argument,
+         _) in _iter_tokens(fiql_str):
         yield (
-            constraint_match[0],
-            unquote_plus(constraint_match[1]),
-            constraint_match[4],
-            unquote_plus(constraint_match[6]) if constraint_match[6] else None
+            preamble,
+            _unquote(selector) if selector else None,
+            comparison,
+            _unquote(argument) if argument else None
         )
-        fiql_str = constraint_match[8]
 
 
-def parse_str_to_expression(fiql_str):
-    """Parse a FIQL formatted string into an ``Expression``.
+def _iter_tokens(fiql_str, limits=None):
+    """Iterate through the FIQL string like :func:`iter_parse` but without
+    percent-decoding the selectors and arguments, and with the offset of
+    each preamble as a fifth item.
 
     Args:
         fiql_str (string): The FIQL formatted string we want to parse.
+        limits (ParseLimits, optional): The limits to enforce while
+            tokenizing.
+
+    Raises:
+        FiqlLimitException: The FIQL string exceeds one of the ``limits``;
+            the maximum length is checked before anything is yielded.
+    """
+    if isinstance(fiql_str, (bytes, bytearray, memoryview)):
+        # FIQL is ASCII only, so the buffer is decoded in one go rather than
+        # a component at a time; with Latin-1 every byte decodes to a single
+        # character and any byte outside ASCII is left for the preamble (and
+        # rejected) just as the same character in a string would be.
+        fiql_str = latin_1_decode(fiql_str)[0]
+    if limits is None:
+        return _scan(fiql_str)
+    if limits.max_length is not None and len(fiql_str) > limits.max_length:
+        raise FiqlLengthException(
+            "FIQL string of length %d exceeds the maximum length (%d)" % (
+                len(fiql_str), limits.max_length), limits.max_length)
+    return _scan_limited(fiql_str, limits)
+
+
+def _scan(fiql_str):
+    """Yield the components of a decoded FIQL string."""
+    if not fiql_str:
+        return
+    # A single left-to-right scan over the original string; each constraint is
+    # located by position rather than by re-splitting the remaining input.
+    position = 0
+    for constraint_match in CONSTRAINT_COMP.finditer(fiql_str):
+        yield (
+            fiql_str[position:constraint_match.start()],
+            constraint_match.group(1),
+            constraint_match.group(4),
+            constraint_match.group(6),
+            position
+        )
+        position = constraint_match.end()
+    if position < len(fiql_str):
+        yield (fiql_str[position:], None, None, None, position)
+
+
+def _scan_limited(fiql_str, limits):
+    """Yield the components of a decoded FIQL string like :func:`_scan`,
+    raising as soon as the string exceeds one of the ``limits``."""
+    max_constraints = limits.max_constraints
+    max_depth = limits.max_depth
+    max_argument_length = limits.max_argument_length
+    depth = 0
+    constraints = 0
+    position = 0
+    for constraint_match in CONSTRAINT_COMP.finditer(fiql_str):
+        start = constraint_match.start()
+        preamble = fiql_str[position:start]
+        if '(' in preamble or ')' in preamble:
+            depth = _check_depth(preamble, position, depth, max_depth)
+        constraints += 1
+        if max_constraints is not None and constraints > max_constraints:
+            raise FiqlConstraintCountException(
+                "FIQL string exceeds the maximum number of constraints (%d)"
+                " at position %d" % (max_constraints, start), start)
+        argument = constraint_match.group(6)
+        if max_argument_length is not None and argument and \
+                len(argument) > max_argument_length:
+            start = constraint_match.start(6)
+            raise FiqlArgumentLengthException(
+                "Argument exceeds the maximum length (%d) at position %d" % (
+                    max_argument_length, start), start)
+        yield (preamble, constraint_match.group(1),
+               constraint_match.group(4), argument, position)
+        position = constraint_match.end()
+    if position < len(fiql_str):
+        _check_depth(fiql_str[position:], position, depth, max_depth)
+        yield (fiql_str[position:], None, None, None, position)
+
+
+def _check_depth(preamble, position, depth, max_depth):
+    """Track the nesting depth through a preamble.
+
+    Returns:
+        integer: The nesting depth after the preamble.
+
+    Raises:
+        FiqlDepthException: The nesting depth exceeds ``max_depth``.
+    """
+    for offset, char in enumerate(preamble):
+        if char == '(':
+            depth += 1
+            if max_depth is not None and depth > max_depth:
+                raise FiqlDepthException(
+                    "Nested expression exceeds the maximum depth (%d) at "
+                    "position %d" % (max_depth, position + offset),
+                    position + offset)
+        elif char == ')':
+            depth -= 1
+    return depth
+
+
+class ExpressionBuilder(object):
+    """
+    The ``ExpressionBuilder`` builds an ``Expression`` from the components
+    of a FIQL string (See :func:`iter_parse`) fed to it in one or more
+    batches; it holds the state of :func:`parse_str_to_expression` between
+    batches so that parsing can be suspended and resumed (See
+    :mod:`fiql_parser.aio`).
+
+    Attributes:
+        fiql_str (string): The FIQL string being parsed (For error messages
+            only).
+        expression (Expression): The ``Expression`` currently being built;
+            a nested ``Expression`` while within parenthesis.
+    """
+
+    def __init__(self, fiql_str=None):
+        """Initialize instance of ``ExpressionBuilder``.
+
+        Args:
+            fiql_str (string, optional): The FIQL string being parsed.
+        """
+        self.fiql_str = fiql_str
+        self.expression = Expression()
+        # The Expression to return to as each nested Expression is closed;
+        # the parent of a nested Expression may be an implicitly nested
+        # fragment.
+        self._enclosing = []
+        self._last_element = None
+
+    def feed(self, tokens):
+        """Add the next components of the FIQL string.
+
+        Args:
+            tokens (iterable): Tuples of preamble, percent-encoded selector,
+                comparison, percent-encoded argument (See :func:`iter_parse`)
+                and the offset of the preamble in the FIQL string.
+
+        Raises:
+            FiqlFormatException: Unable to parse string due to incorrect
+                formatting.
+        """
+        # pylint: disable=too-many-branches
+        # The state is kept in locals while feeding (for speed) and saved
+        # once done; a builder is not fed again once it has raised.
+        enclosing = self._enclosing
+        last_element = self._last_element
+        expression = self.expression
+        for preamble, selector, comparison, argument, position in tokens:
+            if preamble:
+                # The offset of a character is only worked out (from the
+                # characters left) if it is in error.
+                chars = iter(preamble)
+                for char in chars:
+                    if char == '(':
+                        if isinstance(last_element, BaseExpression):
+                            offset = _offset(preamble, position, chars)
+                            raise FiqlFormatException(
+                                "%s can not be followed by %s at "
+                                "position %d" % (
+                                    last_element.__class__, Expression,
+                                    offset),
+                                offset, char, _after_operand(enclosing))
+                        enclosing.append(expression)
+                        expression = expression.create_nested_expression()
+                    elif char == ')':
+                        if not enclosing:
+                            offset = _offset(preamble, position, chars)
+                            raise FiqlFormatException(
+                                "Nested expression closed without being "
+                                "opened at position %d" % offset,
+                                offset, char, _after_operand(enclosing))
+                        last_element = expression
+                        expression = enclosing.pop()
+                    elif char not in OPERATOR_MAP:
+                        offset = _offset(preamble, position, chars)
+                        raise FiqlFormatException(
+                            "'%s' is not a valid FIQL operator at "
+                            "position %d" % (char, offset),
+                            offset, char, _after_operand(enclosing))
+                    else:
+                        if not expression.has_constraint():
+                            offset = _offset(preamble, position, chars)
+                            raise FiqlFormatException(
+                                "%s proceeding initial %s at position "
+                                "%d" % (Operator, Constraint, offset),
+                                offset, char, _OPERAND)
+                        if isinstance(last_element, Operator):
+                            offset = _offset(preamble, position, chars)
+                            raise FiqlFormatException(
+                                "%s can not be followed by %s at "
+                                "position %d" % (
+                                    Operator, Operator, offset),
+                                offset, char, _OPERAND)
+                        last_element = Operator(char)
+                        expression = expression.add_operator(last_element)
+            if selector:
+                if isinstance(last_element, BaseExpression):
+                    position += len(preamble)
+                    raise FiqlFormatException(
+                        "%s can not be followed by %s at position %d" % (
+                            last_element.__class__, Constraint, position),
+                        position, selector, _after_operand(enclosing))
+                last_element = Constraint.from_encoded(
+                    selector, comparison, argument)
+                expression.add_element(last_element)
+        self._last_element = last_element
+        self.expression = expression
+
+    def finish(self):
+        """Complete the ``Expression``.
+
+        Returns:
+            Expression: The ``Expression`` built.
+
+        Raises:
+            FiqlFormatException: The FIQL string is incomplete.
+        """
+        end = None if self.fiql_str is None else len(self.fiql_str)
+        if self._enclosing:
+            raise FiqlFormatException(
+                "At least one nested expression was not correctly closed",
+                end, None, (')',))
+        if not self.expression.has_constraint():
+            raise FiqlFormatException(
+                "Parsed string '%s' contained no constraint" % self.fiql_str,
+                end, None, _OPERAND)
+        release_builder_state(self.expression)
+        return self.expression
+
+
+def _offset(preamble, position, chars):
+    """The offset in the FIQL string of the character of ``preamble`` (at
+    ``position``) last taken from the iterator ``chars``."""
+    return position + len(preamble) - len(list(chars)) - 1
+
+
+def _after_operand(enclosing):
+    """The tokens which may follow a ``Constraint`` or nested
+    ``Expression``; for error reporting."""
+    return (';', ',', ')') if enclosing else (';', ',')
+
+
+def parse_str_to_expression(fiql_str, limits=None):
+    """Parse a FIQL formatted string into an ``Expression``.
+
+    Args:
+        fiql_str (string): The FIQL formatted string we want to parse; may
+            also be ``bytes``, ``bytearray`` or ``memoryview`` (See
+            :func:`iter_parse`).
+        limits (ParseLimits, optional): The limits on the FIQL string. These
+            are enforced while the string is scanned, so a string exceeding
+            one is rejected without scanning the rest of it.
 
     Returns:
         Expression: An ``Expression`` object representing the parsed FIQL
@@ -72,56 +340,22 @@ def parse_str_to_expression(fiql_str):
     Raises:
         FiqlFormatException: Unable to parse string due to incorrect
             formatting.
+        FiqlLimitException: The FIQL string exceeds one of the ``limits``;
+            a ``FiqlFormatException`` with the ``position`` at which it did.
 
     Example:
 
         >>> expression = parse_str_to_expression(
         ...     "name==bar,dob=gt=1990-01-01"
         ... )
+        >>> expression = parse_str_to_expression(
+        ...     query, ParseLimits(max_length=4096, max_depth=8)
+        ... )
 
     """
-    # pylint: disable=too-many-branches
-    nesting_lvl = 0
-    last_element = None
-    expression = Expression()
-    for (preamble, selector, comparison, argument) in iter_parse(fiql_str):
-        if preamble:
-            for char in preamble:
-                if char == '(':
-                    if isinstance(last_element, BaseExpression):
-                        raise FiqlFormatException(
-                            "%s can not be followed by %s" % (
-                                last_element.__class__, Expression))
-                    expression = expression.create_nested_expression()
-                    nesting_lvl += 1
-                elif char == ')':
-                    expression = expression.get_parent()
-                    last_element = expression
-                    nesting_lvl -= 1
-                else:
-                    if not expression.has_constraint():
-                        raise FiqlFormatException(
-                            "%s proceeding initial %s" % (
-                                Operator, Constraint))
-                    if isinstance(last_element, Operator):
-                        raise FiqlFormatException(
-                            "%s can not be followed by %s" % (
-                                Operator, Operator))
-                    last_element = Operator(char)
-                    expression = expression.add_operator(last_element)
-        if selector:
-            if isinstance(last_element, BaseExpression):
-                raise FiqlFormatException("%s can not be followed by %s" % (
-                    last_element.__class__, Constraint))
-            last_element = Constraint(selector, comparison, argument)
-            expression.add_element(last_element)
-    if nesting_lvl != 0:
-        raise FiqlFormatException(
-            "At least one nested expression was not correctly closed")
-    if not expression.has_constraint():
-        raise FiqlFormatException(
-            "Parsed string '%s' contained no constraint" % fiql_str)
-    return expression
+    builder = ExpressionBuilder(fiql_str)
+    builder.feed(_iter_tokens(fiql_str, limits))
+    return builder.finish()
 
 
 def from_python_to_expression(constraints):
@@ -153,6 +387,28 @@ def from_python_to_expression(constraints):
         ... )
 
     """
+    # The elements of each Expression are constructed before the
+    # Expression; without recursion.
+    return fold(constraints, _from_python_constraint,
+                _from_python_expression, _python_elements)
+
+
+def _python_elements(constraints):
+    """The deconstructed elements of a deconstructed ``Expression``; See
+    :func:`fiql_parser.expression.fold`.
+
+    Args:
+        constraints (list or tuple): Expression as a tuple or list
+            containing the constraints.
+
+    Returns:
+        list or tuple: The deconstructed elements, or ``None`` if
+        ``constraints`` is a deconstructed ``Constraint`` (or empty).
+
+    Raises:
+        FiqlParserException: Unable to determine the input is expression
+            or constraint.
+    """
     if not constraints:
         return None
     if len(constraints) == 1:
@@ -163,16 +419,25 @@ def from_python_to_expression(constraints):
     if len(constraints) == 3 and (
             constraints[1] is None or constraints[1] in COMPARISON_MAP.values()
     ):
-        return Constraint(*constraints)
-    if constraints[0] == "OR":
-        return Expression().op_or(
-            *[from_python_to_expression(c) for c in constraints[1:]]
-        )
-    if constraints[0] == "AND":
-        return Expression().op_and(
-            *[from_python_to_expression(c) for c in constraints[1:]]
-        )
+        return None
+    if constraints[0] in ("OR", "AND"):
+        return constraints[1:]
     raise FiqlParserException(
         "Unable to determine the input is expression or constraint. - %s" \
         % constraints
     )
+
+
+def _from_python_constraint(constraints):
+    """Construct a ``Constraint`` (or ``None`` if ``constraints`` is
+    empty)."""
+    if not constraints:
+        return None
+    return Constraint(*constraints)
+
+
+def _from_python_expression(constraints, elements):
+    """Construct an ``Expression`` from its constructed ``elements``."""
+    if constraints[0] == "OR":
+        return Expression().op_or(*elements)
+    return Expression().op_and(*elements)
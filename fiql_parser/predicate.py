@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+An ``Expression`` describes a filter; the ``predicate`` module turns that
+description into a plain Python callable which can be applied to records held
+in memory (``dict`` objects by default).
+
+All of the work which does not depend on the record being tested (selector
+and comparison lookup, argument coercion, operator dispatch) is done once when
+the predicate is compiled rather than once per record.
+
+Arguments are coerced according to the type of the value found in the record;
+a record value of ``int`` or ``float`` is compared against the numeric form of
+the argument, a ``datetime`` or ``date`` value against the :rfc:`3339` form
+of the argument and a string value against the argument as is. A record
+which does not contain the selector (or whose value can not be compared with
+the argument) never satisfies a ``Constraint`` with a comparison.
+
+Attributes:
+    COMPARISON_FUNCTIONS (dict): Mappings of the common FIQL comparisons (See
+        ``COMPARISON_MAP``) to the functions implementing them.
+    ARGUMENT_COERCIONS (dict): Mappings of type to the function coercing an
+        argument into a value of that type (See
+        :meth:`Constraint.argument_as`).
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import re
+from datetime import date, datetime, timedelta, timezone
+from operator import eq, ne, gt, ge, lt, le
+
+from .constants import COMPARISON_MAP
+from .exceptions import FiqlObjectException
+from .expression import fold
+from .operator import OPERATOR_OR
+
+
+COMPARISON_FUNCTIONS = {
+    '==': eq,
+    '!=': ne,
+    '>': gt,
+    '>=': ge,
+    '<': lt,
+    '<=': le,
+}
+
+# Marker for a record value which can not be compared with the argument.
+_INCOMPARABLE = object()
+
+# Number of nested predicates (and so of nested calls) beyond which the
+# elements of an Expression are tested without recursion.
+_MAX_PREDICATE_DEPTH = 64
+
+# RFC 3339 full-date, optionally followed by a full-time (with a "T" or " ").
+_DATETIME_COMP = re.compile(
+    r'^(\d{4})-(\d{2})-(\d{2})(?:[Tt ](\d{2}):(\d{2}):(\d{2})'
+    r'(?:\.(\d{1,6})\d*)?([Zz]|[+-]\d{2}:\d{2})?)?$')
+
+
+def _default_getter(record, selector):
+    """Look the ``selector`` up in a ``dict`` like ``record``."""
+    return record.get(selector)
+
+
+def coerce_argument(argument):
+    """Coerce a FIQL argument into a number if it represents one.
+
+    Args:
+        argument (string): The URL decoded argument (or ``None``).
+
+    Returns:
+        int, float or string: The argument as an ``int`` or ``float`` if it
+        is a valid representation of either, otherwise the argument itself.
+    """
+    try:
+        return int(argument)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(argument)
+    except (TypeError, ValueError):
+        return argument
+
+
+def parse_bool(argument):
+    """Parse a FIQL argument of "true" or "false" (in any case).
+
+    Raises:
+        TypeError: The argument is not a string (e.g., ``None``).
+        ValueError: The argument is neither.
+    """
+    if not isinstance(argument, str):
+        raise TypeError("%r is not a boolean" % (argument,))
+    lowered = argument.lower()
+    if lowered not in ('true', 'false'):
+        raise ValueError("'%s' is not a boolean" % argument)
+    return lowered == 'true'
+
+
+def parse_datetime(argument):
+    """Parse a FIQL argument which is an :rfc:`3339` date-time; a full-date
+    alone is taken to be midnight.
+
+    Returns:
+        datetime: The ``datetime``; naive if the argument has no offset.
+
+    Raises:
+        ValueError: The argument is not a date-time.
+    """
+    match = _DATETIME_COMP.match(argument)
+    if match is None:
+        raise ValueError("'%s' is not an RFC 3339 date-time" % argument)
+    (year, month, day, hour, minute, second, fraction,
+     offset) = match.groups()
+    tzinfo = None
+    if offset:
+        minutes = 0 if offset in 'Zz' else (
+            int(offset[1:3]) * 60 + int(offset[4:6])) * (
+                -1 if offset[0] == '-' else 1)
+        tzinfo = timezone(timedelta(minutes=minutes))
+    return datetime(int(year), int(month), int(day), int(hour or 0),
+                    int(minute or 0), int(second or 0),
+                    int((fraction or '0').ljust(6, '0')), tzinfo)
+
+
+def parse_date(argument):
+    """Parse a FIQL argument which is an :rfc:`3339` full-date.
+
+    Raises:
+        ValueError: The argument is not a full-date.
+    """
+    match = _DATETIME_COMP.match(argument)
+    if match is None or match.group(4):
+        raise ValueError("'%s' is not an RFC 3339 full-date" % argument)
+    return date(*(int(part) for part in match.groups()[:3]))
+
+
+ARGUMENT_COERCIONS = {
+    int: int,
+    float: float,
+    bool: parse_bool,
+    datetime: parse_datetime,
+    date: parse_date,
+}
+
+
+def _typed_arguments(argument):
+    """Build the mapping of record value type to the argument coerced for
+    comparison with values of that type.
+
+    Args:
+        argument (string): The URL decoded argument (or ``None``).
+
+    Returns:
+        tuple: The ``dict`` of type specific arguments and the argument to
+        use for any other type.
+    """
+    if argument is None:
+        # A comparison without an argument; no value compares with it.
+        return {}, _INCOMPARABLE
+    coerced = coerce_argument(argument)
+    arguments = {type(argument): argument, type(None): _INCOMPARABLE}
+    if coerced is argument:
+        arguments[int] = arguments[float] = _INCOMPARABLE
+    else:
+        arguments[int] = arguments[float] = coerced
+    for value_type in (bool, datetime, date):
+        try:
+            arguments[value_type] = ARGUMENT_COERCIONS[value_type](argument)
+        except ValueError:
+            arguments[value_type] = _INCOMPARABLE
+    return arguments, coerced
+
+
+def compile_constraint(constraint, getter=None, comparisons=None):
+    """Compile a ``Constraint`` into a predicate.
+
+    Args:
+        constraint (Constraint): The ``Constraint`` to compile.
+        getter (callable, optional): Function taking a record and a selector
+            and returning the value of the selector for that record. Defaults
+            to ``record.get(selector)``.
+        comparisons (dict, optional): Additional mappings of FIQL comparisons
+            (e.g., "=in=") to functions taking the record value and the
+            (coerced) argument. These take precedence over
+            ``COMPARISON_FUNCTIONS``.
+
+    Returns:
+        callable: Function taking a record and returning ``True`` if the
+        record satisfies the ``Constraint``.
+
+    Raises:
+        FiqlObjectException: The comparison is not supported.
+    """
+    getter = getter or _default_getter
+    selector = constraint.selector
+    if not constraint.comparison:
+        return lambda record: getter(record, selector) is not None
+    comparison = constraint.comparison
+    function = (comparisons or {}).get(comparison) or \
+        COMPARISON_FUNCTIONS.get(COMPARISON_MAP.get(comparison))
+    if function is None:
+        raise FiqlObjectException(
+            "'%s' is not a supported FIQL comparison" % comparison)
+    arguments, fallback = _typed_arguments(constraint.argument)
+
+    def constraint_predicate(record):
+        """Test a single record against the compiled ``Constraint``."""
+        value = getter(record, selector)
+        argument = arguments.get(value.__class__, fallback)
+        if argument is _INCOMPARABLE:
+            return False
+        try:
+            return function(value, argument)
+        except TypeError:
+            return False
+
+    return constraint_predicate
+
+
+def compile_expression(expression, getter=None, comparisons=None):
+    """Compile an ``Expression`` (or ``Constraint``) into a predicate.
+
+    The elements joined by an "AND" ``Operator`` are tested in order until
+    one fails; those joined by an "OR" ``Operator`` until one succeeds.
+
+    Args:
+        expression (BaseExpression): The ``Expression`` or ``Constraint`` to
+            compile.
+        getter (callable, optional): See :func:`compile_constraint`.
+        comparisons (dict, optional): See :func:`compile_constraint`.
+
+    Returns:
+        callable: Function taking a record and returning ``True`` if the
+        record satisfies the ``Expression``. An ``Expression`` without any
+        elements is satisfied by every record.
+
+    Raises:
+        FiqlObjectException: A comparison is not supported.
+
+    Example:
+
+        >>> predicate = compile_expression(
+        ...     parse_str_to_expression("name==bar,age=gt=30"))
+        >>> predicate({'name': 'foo', 'age': 45})
+        True
+
+    """
+    # Each result is a predicate and the number of nested calls it makes.
+    return fold(
+        expression,
+        lambda constraint: (
+            compile_constraint(constraint, getter, comparisons), 1),
+        _combine_predicates)[0]
+
+
+def _combine_predicates(expression, results):
+    """Combine the predicates compiled from the elements of an
+    ``Expression``.
+
+    Args:
+        expression (Expression): The ``Expression``.
+        results (list): The predicate of each element and the number of
+            nested calls it makes.
+
+    Returns:
+        tuple: The predicate of the ``Expression`` and the number of nested
+        calls it makes.
+    """
+    if not results:
+        return (lambda record: True), 1
+    if len(results) == 1:
+        return results[0]
+    predicates = tuple(predicate for predicate, _ in results)
+    is_or = expression.operator is OPERATOR_OR
+    depth = 1 + max(depth for _, depth in results)
+    if depth > _MAX_PREDICATE_DEPTH:
+        # The junctions nested directly within are tested by this one,
+        # without a call of their own.
+        return _Junction(is_or, predicates), 1 + max(
+            depth - 1 if predicate.__class__ is _Junction else depth
+            for predicate, depth in results)
+    if is_or:
+        def disjunction(record):
+            """Test a record against each element until one succeeds."""
+            for predicate in predicates:
+                if predicate(record):
+                    return True
+            return False
+        return disjunction, depth
+
+    def conjunction(record):
+        """Test a record against each element until one fails."""
+        for predicate in predicates:
+            if not predicate(record):
+                return False
+        return True
+    return conjunction, depth
+
+
+class _Junction(object):
+    """
+    Predicate testing a record against the elements of a deeply nested
+    ``Expression`` without recursion; the elements joined by an "AND"
+    ``Operator`` until one fails and those joined by an "OR" ``Operator``
+    until one succeeds.
+
+    Attributes:
+        is_or (boolean): Whether the elements are joined by an "OR"
+            ``Operator``.
+        predicates (tuple): The predicates of the elements.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    __slots__ = ('is_or', 'predicates')
+
+    def __init__(self, is_or, predicates):
+        """Initialize instance of ``_Junction``."""
+        self.is_or = is_or
+        self.predicates = predicates
+
+    def __call__(self, record):
+        """Test a single record against the elements."""
+        # Each stack entry is whether the elements of a junction are joined
+        # by "OR" and an iterator over those not yet tested; ``value`` is
+        # the result of the junction last completed.
+        stack = [(self.is_or, iter(self.predicates))]
+        value = None
+        while stack:
+            is_or, predicates = stack[-1]
+            if value is is_or:
+                # Decided by the nested junction just completed.
+                stack.pop()
+                continue
+            for predicate in predicates:
+                if predicate.__class__ is _Junction:
+                    stack.append((predicate.is_or, iter(predicate.predicates)))
+                    value = None
+                    break
+                if bool(predicate(record)) is is_or:
+                    value = is_or
+                    stack.pop()
+                    break
+            else:
+                value = not is_or
+                stack.pop()
+        return value
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+The ``Expression`` object is ideally suited for use in filtering database
+queries. The ``sql`` module includes the code used to convert an
+``Expression`` into a parameterized SQL ``WHERE`` clause fragment.
+
+Selectors are never written into the SQL; each one must be mapped to a column
+by the caller. Arguments are never written into the SQL either; each one is
+bound as a parameter using the placeholder style of the database driver (See
+:pep:`249#paramstyle`). The SQL for two expressions which differ only in
+their arguments is therefore identical, as is its ``fingerprint``, so the
+database can reuse the prepared statement and its plan.
+
+Attributes:
+    SQL_COMPARISON_MAP (dict): Mappings of the common FIQL comparisons to SQL
+        comparison operators.
+    SqlQuery (namedtuple): The ``sql`` fragment, its bound ``params`` and the
+        ``fingerprint`` of the ``sql``.
+    SqlTemplate (namedtuple): The ``sql`` fragment, the position in the
+        ``Expression`` arguments and converter of each of its ``bindings``,
+        whether the params are ``named`` and the ``fingerprint`` of the
+        ``sql``.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import hashlib
+from collections import namedtuple
+
+from .exceptions import FiqlObjectException
+from .expression import fold
+from .operator import OPERATOR_AND, OPERATOR_OR
+
+
+SQL_COMPARISON_MAP = {
+    '==': '=',
+    '!=': '<>',
+    '=gt=': '>',
+    '=ge=': '>=',
+    '=lt=': '<',
+    '=le=': '<=',
+}
+
+SqlQuery = namedtuple('SqlQuery', ['sql', 'params', 'fingerprint'])
+
+SqlTemplate = namedtuple('SqlTemplate',
+                         ['sql', 'bindings', 'named', 'fingerprint'])
+
+# Placeholder format for each paramstyle and whether params are named.
+_PARAMSTYLES = {
+    'qmark': ('?', False),
+    'format': ('%s', False),
+    'numeric': (':{1}', False),
+    'named': (':p{0}', True),
+    'pyformat': ('%(p{0})s', True),
+}
+
+
+def _map_column(column_map, selector):
+    """Look up the column (and argument converter) for a ``selector``.
+
+    Returns:
+        tuple: The SQL column and a callable converting the argument or
+        ``None``.
+
+    Raises:
+        FiqlObjectException: The ``selector`` is not in ``column_map``.
+    """
+    try:
+        column = column_map[selector]
+    except KeyError as exc:
+        raise FiqlObjectException(
+            "'%s' is not a filterable selector" % selector) from exc
+    if isinstance(column, tuple):
+        return column
+    return column, None
+
+
+def to_sql(expression, column_map, dialect='qmark', cache=None):
+    """Convert an ``Expression`` (or ``Constraint``) into a parameterized SQL
+    ``WHERE`` clause fragment.
+
+    An "AND" ``Operator`` becomes ``AND`` and an "OR" ``Operator`` becomes
+    ``OR``; parentheses are only added where the precedence of the SQL
+    operators requires them. A ``Constraint`` without a comparison becomes
+    ``IS NOT NULL`` and an ``Expression`` without any elements ``1 = 1``.
+
+    Args:
+        expression (BaseExpression): The ``Expression`` or ``Constraint`` to
+            convert.
+        column_map (dict): Mappings of selector to SQL column. A column may
+            also be given as a tuple of the SQL column and a callable which
+            converts the argument before it is bound (e.g., ``int``).
+        dialect (string, optional): The :pep:`249` paramstyle of the database
+            driver; "qmark", "format", "numeric", "named" or "pyformat".
+            Defaults to "qmark".
+        cache (ShapeCache, optional): Cache of the ``SqlTemplate`` for each
+            shape of ``Expression`` (See :meth:`Expression.shape_key`). A
+            cache must only ever be used with the same ``column_map``.
+
+    Returns:
+        SqlQuery: The SQL fragment, its params (a ``list``, or a ``dict`` for
+        the named paramstyles) and the fingerprint of the SQL fragment.
+
+    Raises:
+        FiqlObjectException: A selector is not in ``column_map``, a comparison
+            is not supported or the dialect is unknown.
+
+    Example:
+
+        >>> query = to_sql(parse_str_to_expression("name==foo,age=gt=30"),
+        ...                {'name': 'users.name', 'age': 'users.age'})
+        >>> query.sql
+        'users.name = ? OR users.age > ?'
+        >>> query.params
+        ['foo', '30']
+
+    """
+    if cache is None:
+        template = compile_sql(expression, column_map, dialect)
+    else:
+        template = cache.get(
+            expression,
+            lambda expression: compile_sql(expression, column_map, dialect),
+            ('sql', dialect))
+    return bind_sql(template, expression)
+
+
+def compile_sql(expression, column_map, dialect='qmark'):
+    """Convert an ``Expression`` (or ``Constraint``) into a ``SqlTemplate``.
+
+    The ``SqlTemplate`` depends only on the shape of the ``Expression``; it
+    can be bound to any ``Expression`` of the same shape with
+    :func:`bind_sql`. See :func:`to_sql` for the arguments.
+
+    Returns:
+        SqlTemplate: The SQL fragment, its fingerprint and how to bind its
+        params.
+    """
+    # pylint: disable=too-many-locals
+    if dialect not in _PARAMSTYLES:
+        raise FiqlObjectException("'%s' is not a supported dialect" % dialect)
+    placeholder, named = _PARAMSTYLES[dialect]
+    bindings = []
+    position = [0]
+
+    def render_constraint(constraint):
+        """Render a ``Constraint`` recording how to bind its argument."""
+        column, converter = _map_column(column_map, constraint.selector)
+        position[0] += 1
+        if not constraint.comparison:
+            return column + " IS NOT NULL"
+        comparison = SQL_COMPARISON_MAP.get(constraint.comparison)
+        if comparison is None:
+            raise FiqlObjectException(
+                "'%s' is not a supported FIQL comparison" %
+                constraint.comparison)
+        bindings.append((position[0] - 1, converter))
+        return "%s %s %s" % (column, comparison, placeholder.format(
+            len(bindings) - 1, len(bindings)))
+
+    def render_expression(expression, parts):
+        """Render an ``Expression`` from its rendered elements; each is the
+        SQL, the operator joining its parts at the top and their number."""
+        if len(parts) == 1:
+            # Adds nothing; the parenthesization of the element depends on
+            # the Expression containing this one instead.
+            return parts[0]
+        operator = expression.operator or OPERATOR_AND
+        sql = (" OR " if operator is OPERATOR_OR else " AND ").join(
+            "(" + part[0] + ")" if part[2] > 1 and operator > part[1]
+            else part[0]
+            for part in parts) or "1 = 1"
+        return sql, operator, len(parts)
+
+    sql = fold(expression,
+               lambda constraint: (render_constraint(constraint), None, 1),
+               render_expression)[0]
+    return SqlTemplate(sql, tuple(bindings), named, fingerprint_sql(sql))
+
+
+def bind_sql(template, expression):
+    """Bind the arguments of an ``Expression`` to a ``SqlTemplate`` compiled
+    from an ``Expression`` of the same shape.
+
+    Args:
+        template (SqlTemplate): The compiled template.
+        expression (BaseExpression): The ``Expression`` or ``Constraint``
+            whose arguments are bound.
+
+    Returns:
+        SqlQuery: The SQL fragment, its params and its fingerprint.
+    """
+    arguments = expression.arguments()
+    params = [converter(arguments[index]) if converter else arguments[index]
+              for index, converter in template.bindings]
+    if template.named:
+        params = dict(('p%d' % i, param) for i, param in enumerate(params))
+    return SqlQuery(template.sql, params, template.fingerprint)
+
+
+def fingerprint_sql(sql):
+    """Compute a stable fingerprint for a SQL fragment.
+
+    Args:
+        sql (string): The SQL fragment.
+
+    Returns:
+        string: A 16 character hexadecimal digest of ``sql``.
+    """
+    return hashlib.sha1(sql.encode('utf-8')).hexdigest()[:16]
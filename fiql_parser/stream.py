@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Filtering data sets which are much larger than the memory available (audit
+and event logs for example) requires that records are read, tested and
+discarded one at a time.
+
+The ``stream`` module includes lazy building blocks for applying an
+``Expression`` to an iterable of records, a reader for JSON-lines files which
+reads them in fixed-size chunks, and the throughput statistics for both.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import json
+import time
+
+from .predicate import compile_expression
+
+
+class FilterStats(object):
+    """
+    The ``FilterStats`` are the running totals for a :func:`filter_iter`
+    pipeline.
+
+    Attributes:
+        scanned (integer): Number of records tested so far.
+        matched (integer): Number of records which satisfied the
+            ``Expression`` so far.
+        started (float): Time the first record was requested or ``None``.
+        finished (float): Time the input was exhausted or ``None``.
+    """
+
+    def __init__(self):
+        """Initialize instance of ``FilterStats``."""
+        self.scanned = 0
+        self.matched = 0
+        self.started = None
+        self.finished = None
+
+    @property
+    def elapsed(self):
+        """float: Seconds spent in the pipeline so far."""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def scanned_per_second(self):
+        """float: Records tested per second."""
+        elapsed = self.elapsed
+        return self.scanned / elapsed if elapsed else 0.0
+
+    @property
+    def matched_per_second(self):
+        """float: Records matched per second."""
+        elapsed = self.elapsed
+        return self.matched / elapsed if elapsed else 0.0
+
+    def __str__(self):
+        """Represent the ``FilterStats`` instance as a string.
+
+        Returns:
+            string: The represented ``FilterStats``.
+        """
+        return "scanned %d (%.1f/s), matched %d (%.1f/s) in %.3fs" % (
+            self.scanned, self.scanned_per_second,
+            self.matched, self.matched_per_second, self.elapsed)
+
+
+def filter_iter(expression, iterable, stats=None, getter=None):
+    """Lazily yield the records from ``iterable`` which satisfy
+    ``expression``.
+
+    The ``expression`` is compiled once (See
+    :func:`fiql_parser.predicate.compile_expression`) before the first record
+    is tested; no more than one record is held at a time.
+
+    Args:
+        expression (BaseExpression): The ``Expression`` or ``Constraint`` to
+            apply.
+        iterable (iterable): The records to filter.
+        stats (FilterStats, optional): Updated with the number of records
+            scanned and matched as the pipeline is consumed.
+        getter (callable, optional): Function taking a record and a selector
+            and returning the value of the selector for that record.
+
+    Yields:
+        The records which satisfy ``expression``.
+
+    Example:
+
+        >>> stats = FilterStats()
+        >>> with io.open('audit.jsonl', 'rb') as fd:
+        ...     for record in filter_iter(expression, iter_json_lines(fd),
+        ...                               stats):
+        ...         handle(record)
+        >>> print(stats)
+
+    """
+    predicate = compile_expression(expression, getter)
+    if stats is None:
+        for record in iterable:
+            if predicate(record):
+                yield record
+        return
+    stats.started = time.time()
+    stats.finished = None
+    for record in iterable:
+        stats.scanned += 1
+        if predicate(record):
+            stats.matched += 1
+            yield record
+    stats.finished = time.time()
+
+
+def iter_json_lines(fileobj, chunk_size=65536):
+    """Lazily decode a JSON-lines file.
+
+    The file is read ``chunk_size`` characters (or bytes) at a time so that
+    memory use does not depend on the size of the file. Blank lines are
+    skipped.
+
+    Args:
+        fileobj (file): File opened in text or binary mode; binary content
+            must be UTF-8 encoded.
+        chunk_size (integer, optional): Size of each read. Defaults to
+            ``65536``.
+
+    Yields:
+        The decoded JSON value of each line.
+
+    Raises:
+        ValueError: A line is not valid JSON.
+    """
+    # Pieces of a line which spans more than one chunk.
+    pending = []
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        lines = chunk.split(b'\n' if isinstance(chunk, bytes) else '\n')
+        if len(lines) == 1:
+            pending.append(chunk)
+            continue
+        if pending:
+            pending.append(lines[0])
+            lines[0] = chunk[:0].join(pending)
+        pending = [lines.pop()]
+        for line in lines:
+            if line.strip():
+                yield _loads(line)
+    if pending:
+        line = pending[0][:0].join(pending)
+        if line.strip():
+            yield _loads(line)
+
+
+def _loads(line):
+    """Decode a single JSON line which may be ``bytes``."""
+    if isinstance(line, bytes):
+        line = line.decode('utf-8')
+    return json.loads(line)
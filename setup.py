@@ -37,7 +37,11 @@ setup(
     include_package_data = True,
     packages=['fiql_parser'],
     install_requires = [],
+    extras_require = {
+        'numpy': ['numpy'],
+    },
     tests_require = tests_require,
+    python_requires = '>=3.6',
     platforms = ['any'],
     classifiers = [
         'Development Status :: 3 - Alpha',
@@ -47,10 +51,9 @@ setup(
         'Natural Language :: English',
         'Operating System :: OS Independent',
         'Programming Language :: Python',
-        'Programming Language :: Python :: 2',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.4',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.6',
         'Topic :: Internet :: WWW/HTTP',
         'Topic :: Software Development :: Libraries',
     ],
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Tests against the asyncio parsing and filtering coroutines.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import asyncio
+import unittest
+
+from fiql_parser import (parse_str_to_expression, FiqlFormatException,
+        FilterStats, ParseLimits)
+from fiql_parser.exceptions import FiqlBudgetException, FiqlLengthException
+from fiql_parser.aio import parse_str_to_expression_async, filter_iter_async
+
+
+RECORDS = [{'age': age} for age in range(100)]
+
+
+def run(coroutine):
+    """Run a coroutine to completion in a new event loop."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def collect(agen):
+    """Collect the values of an asynchronous generator, and the number of
+    times it returned control to the event loop while producing them."""
+    loop = asyncio.new_event_loop()
+    values = []
+    switches = []
+    def count_switch():
+        switches.append(None)
+        loop.call_soon(count_switch)
+    try:
+        loop.call_soon(count_switch)
+        while True:
+            try:
+                values.append(loop.run_until_complete(agen.__anext__()))
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.close()
+    return values, len(switches)
+
+
+class TestAio(unittest.TestCase):
+
+    def test_parse_str_to_expression_async(self):
+        for fiql_str in ("a==1;b==2,(c==3;d==4)", b"a==1;b==2",
+                         "last_name==foo*,(age=lt=55;age=gt=5)"):
+            for yield_every in (1, 2, 256):
+                self.assertEqual(
+                    str(parse_str_to_expression(fiql_str)),
+                    str(run(parse_str_to_expression_async(
+                        fiql_str, yield_every=yield_every))))
+
+    def test_parse_str_to_expression_async_failure(self):
+        for fiql_str in ("", "(a==1", "a==1;;b==2", "a==1)"):
+            self.assertRaises(FiqlFormatException, run,
+                              parse_str_to_expression_async(
+                                  fiql_str, yield_every=1))
+
+    def test_parse_str_to_expression_async_budget(self):
+        fiql_str = ";".join("a==%d" % index for index in range(100))
+        self.assertRaisesRegex(
+            FiqlBudgetException, "Exceeded the time allowed", run,
+            parse_str_to_expression_async(fiql_str, yield_every=1,
+                                          max_seconds=-1))
+        # The same limits (and exceptions) as parse_str_to_expression.
+        self.assertRaisesRegex(
+            FiqlLengthException, "exceeds the maximum length", run,
+            parse_str_to_expression_async(fiql_str,
+                                          ParseLimits(max_length=100)))
+        self.assertRaises(
+            FiqlFormatException, run,
+            parse_str_to_expression_async(fiql_str,
+                                          limits=ParseLimits(max_length=100)))
+
+    def test_filter_iter_async(self):
+        stats = FilterStats()
+        matches, switches = collect(filter_iter_async(
+            parse_str_to_expression("age=ge=90"), RECORDS, stats,
+            yield_every=10))
+        self.assertEqual(RECORDS[90:], matches)
+        self.assertEqual(100, stats.scanned)
+        self.assertEqual(10, stats.matched)
+        self.assertIsNotNone(stats.finished)
+        self.assertGreaterEqual(switches, 10)
+
+    def test_filter_iter_async_budget(self):
+        matches = filter_iter_async(parse_str_to_expression("age=lt=5"),
+                                    RECORDS, max_records=50)
+        self.assertRaisesRegex(FiqlBudgetException,
+                               "maximum number of records", collect,
+                               matches)
+        matches = filter_iter_async(parse_str_to_expression("age=lt=5"),
+                                    RECORDS, yield_every=1, max_seconds=-1)
+        self.assertRaisesRegex(FiqlBudgetException,
+                               "Exceeded the time allowed", collect,
+                               matches)
+        self.assertEqual(RECORDS[:5], collect(filter_iter_async(
+            parse_str_to_expression("age=lt=5"), RECORDS,
+            max_records=100))[0])
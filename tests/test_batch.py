@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Tests against batch parsing and the pickling of parsed expressions.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import copy
+import pickle
+import sys
+import unittest
+
+from fiql_parser import (parse_str_to_expression, parse_many,
+        FiqlException)
+from fiql_parser.frozen import FrozenExpression
+
+
+def deep_fiql(depth):
+    fiql_str = 'z==1'
+    for level in range(depth):
+        fiql_str = 'a%d==1%s(%s)' % (level, ';,'[level % 2], fiql_str)
+    return fiql_str
+
+
+FIQL_STRS = [
+    "foo==bar;(goo=gt=5,goo=lt=10)",
+    "foo==",
+    "a==1,b=ge=2;c",
+    ";;foo",
+    "foo%24==bar%23+more",
+]
+
+
+class TestBatch(unittest.TestCase):
+
+    def test_pickle_expression(self):
+        expression = parse_str_to_expression("a==1,(b=ge=2;c),d=in=x")
+        restored = pickle.loads(pickle.dumps(expression))
+        self.assertEqual(str(expression), str(restored))
+        self.assertEqual(expression.to_python(), restored.to_python())
+        self.assertEqual(restored, restored.elements[1].get_parent())
+        self.assertNotIn(b'_working_fragment', pickle.dumps(expression))
+
+    def test_pickle_deep_nesting(self):
+        expression = parse_str_to_expression(
+            deep_fiql(sys.getrecursionlimit() * 2))
+        fiql_str = str(expression)
+        self.assertEqual(fiql_str, str(pickle.loads(pickle.dumps(expression))))
+        self.assertEqual(fiql_str, str(copy.deepcopy(expression)))
+        frozen = expression.freeze()
+        restored = pickle.loads(pickle.dumps(frozen))
+        self.assertIsInstance(restored, FrozenExpression)
+        self.assertEqual(frozen, restored)
+
+    def check_results(self, results, fiql_strs=FIQL_STRS):
+        self.assertEqual(len(fiql_strs), len(results))
+        for fiql_str, result in zip(fiql_strs, results):
+            try:
+                expected = str(parse_str_to_expression(fiql_str))
+            except FiqlException as exc:
+                self.assertIsNone(result.expression)
+                self.assertEqual(type(exc), type(result.error))
+                self.assertEqual(str(exc), str(result.error))
+            else:
+                self.assertIsNone(result.error)
+                self.assertEqual(expected, str(result.expression))
+
+    def test_parse_many_in_process(self):
+        self.check_results(parse_many(FIQL_STRS, workers=1))
+
+    def test_parse_many_process_pool(self):
+        self.check_results(parse_many(FIQL_STRS, workers=2, chunksize=2))
+
+    def test_parse_many_deep_nesting(self):
+        fiql_strs = ['a==1', deep_fiql(sys.getrecursionlimit() + 200),
+                     'b==2', 'c==']
+        self.check_results(parse_many(fiql_strs, workers=2, chunksize=1),
+                           fiql_strs)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Tests against the binary encoding of expressions.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import unittest
+
+from fiql_parser import (parse_str_to_expression, Expression, Constraint,
+        FiqlFormatException)
+from fiql_parser.binary import dumps, loads, iter_constraints, MAGIC
+
+
+FIQL_STR = "last_name==foo*,(age=lt=55;age=gt=5;x%20y==a%2Cb;active)"
+
+
+class TestBinary(unittest.TestCase):
+
+    def test_round_trip(self):
+        expression = parse_str_to_expression(FIQL_STR)
+        buffer = dumps(expression)
+        self.assertTrue(buffer.startswith(MAGIC))
+        decoded = loads(buffer)
+        self.assertIsInstance(decoded, Expression)
+        self.assertEqual(str(expression), str(decoded))
+        self.assertEqual(expression.to_python(), decoded.to_python())
+        self.assertIs(decoded, decoded.elements[1].parent)
+        self.assertEqual(str(expression), str(loads(bytearray(buffer))))
+        self.assertEqual(str(expression), str(loads(memoryview(buffer))))
+
+    def test_round_trip_constraint(self):
+        for constraint in (Constraint('foo', '==', 'bar'),
+                           Constraint('foo', '>', 'bar'),
+                           Constraint('foo')):
+            decoded = loads(dumps(constraint))
+            self.assertIsInstance(decoded, Constraint)
+            self.assertEqual(constraint.to_python(), decoded.to_python())
+            self.assertIsNone(decoded.parent)
+
+    def test_round_trip_unicode(self):
+        expression = Expression().op_and(
+            Constraint('naïve', '==', 'café'), Constraint('名', '!=', '値'))
+        self.assertEqual(expression.to_python(),
+                         loads(dumps(expression)).to_python())
+
+    def test_round_trip_large_table(self):
+        expression = Expression().op_or(*[
+            Constraint('s%d' % index, '==', 'a%d' % index)
+            for index in range(300)])
+        decoded = loads(dumps(expression))
+        self.assertEqual(str(expression), str(decoded))
+        self.assertEqual(300, len(list(iter_constraints(dumps(expression)))))
+
+    def test_round_trip_deep_nesting(self):
+        fiql_str = 'z'
+        for level in range(3000):
+            fiql_str = 'a%d%s(%s)' % (level, ';,'[level % 2], fiql_str)
+        expression = parse_str_to_expression(fiql_str)
+        self.assertEqual(str(expression), str(loads(dumps(expression))))
+
+    def test_iter_constraints(self):
+        buffer = dumps(parse_str_to_expression(FIQL_STR))
+        self.assertEqual([('last_name', '==', 'foo*'),
+                          ('age', '=lt=', '55'),
+                          ('age', '=gt=', '5'),
+                          ('x y', '==', 'a,b'),
+                          ('active', None, None)],
+                         list(iter_constraints(buffer)))
+
+    def test_invalid(self):
+        buffer = dumps(parse_str_to_expression(FIQL_STR))
+        self.assertRaisesRegex(FiqlFormatException, "Not a binary",
+                               loads, b'JSON' + buffer[4:])
+        self.assertRaisesRegex(FiqlFormatException, "Unsupported",
+                               loads, MAGIC + b'\x02' + buffer[5:])
+        self.assertRaisesRegex(FiqlFormatException, "Unsupported",
+                               loads, MAGIC)
+        self.assertRaisesRegex(FiqlFormatException, "Truncated",
+                               loads, buffer[:-1])
+        self.assertRaisesRegex(FiqlFormatException, "Truncated",
+                               loads, buffer[:10])
+        self.assertRaisesRegex(FiqlFormatException, "Unexpected data",
+                               loads, buffer + b'\x00')
+        # An empty string table followed by an unknown tag.
+        self.assertRaisesRegex(FiqlFormatException, "Invalid tag 7",
+                               loads, MAGIC + b'\x01\x00\x00\x07')
+        self.assertRaisesRegex(FiqlFormatException, "Invalid tag 7", list,
+                               iter_constraints(MAGIC + b'\x01\x00\x00\x07'))
+        # A constraint referring to a string not in the (empty) table.
+        self.assertRaisesRegex(FiqlFormatException, "Invalid string index",
+                               loads, MAGIC + b'\x01\x00\x00\x10\x01\x00\x00')
+        try:
+            loads(buffer[:-1])
+        except FiqlFormatException as exception:
+            self.assertEqual(len(buffer) - 1, exception.position)
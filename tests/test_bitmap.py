@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Tests against the bitmap row sets.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import random
+import unittest
+
+from fiql_parser.bitmap import Bitmap
+
+
+class TestBitmap(unittest.TestCase):
+
+    def test_add_discard_contains(self):
+        bitmap = Bitmap([3, 0, 17, 3])
+        self.assertEqual([0, 3, 17], list(bitmap))
+        self.assertEqual(3, len(bitmap))
+        self.assertIn(17, bitmap)
+        self.assertNotIn(16, bitmap)
+        self.assertNotIn(10000, bitmap)
+        bitmap.discard(3)
+        bitmap.discard(10000)
+        self.assertEqual([0, 17], list(bitmap))
+        bitmap.discard(0)
+        bitmap.discard(17)
+        self.assertFalse(bitmap)
+        self.assertEqual(0, len(bitmap))
+        self.assertEqual(Bitmap(), bitmap)
+
+    def test_set_operations(self):
+        rng = random.Random(0)
+        left = set(rng.sample(range(5000), 1200))
+        right = set(rng.sample(range(7000), 900))
+        bitmap_left, bitmap_right = Bitmap(left), Bitmap(right)
+        self.assertEqual(sorted(left & right),
+                         list(bitmap_left & bitmap_right))
+        self.assertEqual(sorted(left | right),
+                         list(bitmap_left | bitmap_right))
+        self.assertEqual(sorted(left - right),
+                         list(bitmap_left - bitmap_right))
+        self.assertEqual(sorted(left ^ right),
+                         list(bitmap_left ^ bitmap_right))
+        self.assertEqual(sorted(left & right), list(
+            Bitmap.intersection(bitmap_left, bitmap_right)))
+        self.assertEqual(sorted(left | right), list(
+            Bitmap.union(bitmap_left, bitmap_right)))
+        self.assertEqual(Bitmap(), Bitmap.intersection())
+        # A sparse bitmap of high rows with dense ones of low rows.
+        sparse = Bitmap([10 ** 5, rng.choice(sorted(left & right))])
+        self.assertEqual(sorted(left & right & set(sparse)), list(
+            Bitmap.intersection(bitmap_left, sparse, bitmap_right)))
+        self.assertEqual(sorted(left), list(bitmap_left))
+
+    def test_in_place_operations(self):
+        bitmap = Bitmap([1, 2, 3])
+        other = bitmap.copy()
+        bitmap &= Bitmap([2, 3, 4])
+        self.assertEqual([2, 3], list(bitmap))
+        bitmap |= Bitmap([9])
+        self.assertEqual([2, 3, 9], list(bitmap))
+        bitmap -= Bitmap([3])
+        self.assertEqual([2, 9], list(bitmap))
+        bitmap.add(100)
+        self.assertIn(100, bitmap)
+        self.assertEqual([1, 2, 3], list(other))
+        self.assertNotEqual(other, bitmap)
+        self.assertEqual("Bitmap([1, 2, 3])", repr(other))
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Tests against the parsed expression cache.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import sys
+import unittest
+
+from fiql_parser import (ExpressionCache, ShapeCache, Constraint,
+        parse_str_to_expression,
+        FiqlException)
+
+
+class TestExpressionCache(unittest.TestCase):
+
+    def test_cache_hit_returns_copy(self):
+        cache = ExpressionCache()
+        first = cache.parse("foo==bar;(goo=gt=5,goo=lt=10)")
+        second = cache.parse("foo==bar;(goo=gt=5,goo=lt=10)")
+        self.assertIsNot(first, second)
+        self.assertEqual(str(first), str(second))
+        self.assertEqual(first.to_python(), second.to_python())
+        self.assertIsNot(first.elements[1], second.elements[1])
+        self.assertEqual(second, second.elements[1].get_parent())
+        first.op_or(Constraint('baa'))
+        self.assertEqual("foo==bar;(goo=gt=5,goo=lt=10)",
+                         str(cache.parse("foo==bar;(goo=gt=5,goo=lt=10)")))
+        self.assertEqual((2, 1, 0, 128, 1), tuple(cache.info()))
+
+    def test_cache_eviction(self):
+        cache = ExpressionCache(maxsize=2)
+        cache.parse("a==1")
+        cache.parse("b==2")
+        cache.parse("a==1")
+        cache.parse("c==3")
+        self.assertIn("a==1", cache)
+        self.assertNotIn("b==2", cache)
+        self.assertIn("c==3", cache)
+        info = cache.info()
+        self.assertEqual(1, info.hits)
+        self.assertEqual(3, info.misses)
+        self.assertEqual(1, info.evictions)
+        self.assertEqual(2, info.currsize)
+        cache.clear()
+        self.assertEqual((0, 0, 0, 2, 0), tuple(cache.info()))
+
+    def test_cache_failure_not_cached(self):
+        cache = ExpressionCache()
+        self.assertRaises(FiqlException, cache.parse, "foo;;bar")
+        self.assertEqual(0, len(cache))
+        self.assertRaises(ValueError, ExpressionCache, 0)
+
+    def test_cache_buffers(self):
+        cache = ExpressionCache()
+        buffer = bytearray(b"foo==bar;goo=gt=5")
+        for fiql_str in (memoryview(buffer), buffer, bytes(buffer)):
+            self.assertEqual("foo==bar;goo=gt=5", str(cache.parse(fiql_str)))
+        self.assertEqual((2, 1, 0, 128, 1), tuple(cache.info()))
+        # The key is not changed along with the buffer it came from.
+        buffer[:3] = b"baa"
+        self.assertEqual("baa==bar;goo=gt=5",
+                         str(cache.parse(memoryview(buffer))))
+
+    def test_cache_deep_nesting(self):
+        depth = sys.getrecursionlimit() * 2
+        fiql_str = 'z'
+        for level in range(depth):
+            fiql_str = 'a%d%s(%s)' % (level, ';,'[level % 2], fiql_str)
+        cache = ExpressionCache()
+        first = cache.parse(fiql_str)
+        second = cache.parse(fiql_str)
+        self.assertIsNot(first, second)
+        self.assertEqual(str(first), str(second))
+        self.assertEqual(str(parse_str_to_expression(fiql_str)), str(second))
+
+
+class TestShapeCache(unittest.TestCase):
+
+    def test_shape_cache(self):
+        cache = ShapeCache(maxsize=2)
+        built = []
+
+        def factory(expression):
+            built.append(str(expression))
+            return len(built)
+
+        get = lambda fiql_str: cache.get(parse_str_to_expression(fiql_str),
+                                         factory)
+        self.assertEqual(1, get("status==new;created=gt=2020"))
+        self.assertEqual(1, get("status==old;created=gt=2021"))
+        self.assertEqual(2, get("status==old,created=gt=2021"))
+        self.assertEqual(3, get("status!=old;created=gt=2021"))
+        self.assertEqual(["status==new;created=gt=2020",
+                          "status==old,created=gt=2021",
+                          "status!=old;created=gt=2021"], built)
+        self.assertEqual((1, 3, 1, 2, 2), tuple(cache.info()))
+        self.assertEqual(4, cache.get(Constraint('a', '==', 'b'), factory,
+                                      namespace='other'))
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Tests against the vectorized (NumPy) evaluation of expressions.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import os
+import subprocess
+import sys
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from fiql_parser import (parse_str_to_expression, evaluate_columns,
+        Constraint, Expression)
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestColumnar(unittest.TestCase):
+
+    def setUp(self):
+        self.columns = {
+            'name': numpy.array(['foo', 'bar', 'baa', 'foo']),
+            'age': numpy.array([45, 12, 33, 70]),
+            'score': numpy.array([1.5, numpy.nan, 9.0, 2.0]),
+            'active': numpy.array([True, False, False, True]),
+        }
+
+    def mask(self, fiql_str):
+        return evaluate_columns(
+            parse_str_to_expression(fiql_str), self.columns).tolist()
+
+    def test_constraints(self):
+        self.assertEqual([True, False, False, True], self.mask("name==foo"))
+        self.assertEqual([True, False, True, True], self.mask("age=gt=30"))
+        self.assertEqual([False, False, True, False],
+                         self.mask("score=ge=9"))
+        self.assertEqual([True, False, False, True],
+                         self.mask("active==true"))
+        self.assertEqual([True, False, True, True], self.mask("score"))
+        self.assertEqual([False] * 4, self.mask("age==old"))
+        self.assertEqual([False] * 4, self.mask("missing==1"))
+
+    def test_operators(self):
+        self.assertEqual([True, False, False, True],
+                         self.mask("name==foo;age=gt=30"))
+        self.assertEqual([True, True, False, True],
+                         self.mask("name==foo,age=lt=30"))
+        self.assertEqual([False, True, True, False],
+                         self.mask("(name==bar,name==baa);age=lt=50"))
+        self.assertEqual([True] * 4,
+                         evaluate_columns(Expression(), self.columns).tolist())
+
+    def test_object_columns(self):
+        self.columns['mixed'] = numpy.array([45, None, 'x', 12.5],
+                                            dtype=object)
+        self.assertEqual([True, False, True, False],
+                         self.mask("mixed=gt=30"))
+        self.assertEqual([False, False, True, False],
+                         self.mask("mixed==x"))
+        self.assertEqual([True, False, True, True], self.mask("mixed"))
+
+    def test_comparison_without_argument(self):
+        for selector in ('name', 'age', 'score', 'active'):
+            self.assertEqual([False] * 4, evaluate_columns(
+                Constraint(selector, '=gt='), self.columns).tolist())
+
+
+class TestColumnarWithoutNumpy(unittest.TestCase):
+
+    def test_numpy_not_imported(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.check_output(
+            [sys.executable, '-c',
+             "import sys, fiql_parser; print('numpy' in sys.modules)"],
+            cwd=root)
+        self.assertEqual(b'False', output.strip())
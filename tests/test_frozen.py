@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Tests against the frozen (immutable) expression objects.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import pickle
+import threading
+import unittest
+
+from fiql_parser import (parse_str_to_expression, Expression, Constraint,
+        FrozenExpression, FrozenConstraint, FiqlObjectException)
+from fiql_parser.operator import OPERATOR_AND
+from fiql_parser.frozen import freeze
+
+
+FIQL_STR = "last_name==foo*,(age=lt=55;age=gt=5;x%20y==a%2Cb)"
+
+
+class TestFrozen(unittest.TestCase):
+
+    def test_freeze(self):
+        expression = parse_str_to_expression(FIQL_STR)
+        frozen = expression.freeze()
+        self.assertIsInstance(frozen, FrozenExpression)
+        self.assertIsInstance(frozen.elements, tuple)
+        self.assertIsInstance(frozen.elements[0], FrozenConstraint)
+        self.assertIs(frozen, frozen.elements[1].parent)
+        self.assertEqual(str(expression), str(frozen))
+        self.assertEqual(expression.to_python(), frozen.to_python())
+        # Each caller gets its own copy of the shared deconstruction.
+        python = frozen.to_python()
+        python[2].pop()
+        python.append(('foo', None, None))
+        self.assertEqual(expression.to_python(), frozen.to_python())
+        self.assertIs(frozen, freeze(frozen))
+        constraint = Constraint('foo', '==', 'bar').freeze()
+        self.assertEqual('foo==bar', str(constraint))
+        self.assertIsNone(constraint.parent)
+
+    def test_frozen_equality(self):
+        frozen = parse_str_to_expression(FIQL_STR).freeze()
+        same = parse_str_to_expression(FIQL_STR).freeze()
+        self.assertEqual(frozen, same)
+        self.assertEqual(hash(frozen), hash(same))
+        self.assertEqual(1, len(set([frozen, same])))
+        for other in ("last_name==foo*,(age=lt=55;age=gt=5)",
+                      "last_name==foo*;(age=lt=55,age=gt=5,x%20y==a%2Cb)",
+                      "last_name==foo,(age=lt=55;age=gt=5;x%20y==a%2Cb)"):
+            self.assertNotEqual(frozen, parse_str_to_expression(
+                other).freeze())
+        self.assertNotEqual(frozen, parse_str_to_expression(FIQL_STR))
+        self.assertEqual(FrozenConstraint('a', '>', '1'),
+                         FrozenConstraint('a', '=gt=', '1'))
+        self.assertNotEqual(FrozenConstraint('a', '>', '1'),
+                            FrozenConstraint('a', '>', '2'))
+
+    def test_frozen_is_immutable(self):
+        frozen = parse_str_to_expression(FIQL_STR).freeze()
+        constraint = frozen.elements[0]
+        for change in (lambda: frozen.add_element(Constraint('a')),
+                       lambda: frozen.add_operator(OPERATOR_AND),
+                       lambda: frozen.create_nested_expression(),
+                       lambda: frozen.op_and(Constraint('a')),
+                       lambda: frozen.op_or(Constraint('a')),
+                       lambda: constraint.set_parent(Expression()),
+                       lambda: Expression().add_element(constraint)):
+            self.assertRaisesRegex(FiqlObjectException, "can not be changed",
+                                   change)
+        self.assertRaises(AttributeError, setattr, frozen, 'operator', None)
+        self.assertRaises(AttributeError, setattr, constraint, 'argument',
+                          'bar')
+        self.assertRaises(AttributeError, delattr, constraint, 'selector')
+        self.assertRaisesRegex(FiqlObjectException, "not a valid element",
+                               FrozenExpression, None, [Constraint('a')])
+        self.assertRaisesRegex(FiqlObjectException, "already an element",
+                               FrozenExpression, None, [constraint])
+
+    def test_frozen_copy(self):
+        frozen = parse_str_to_expression(FIQL_STR).freeze()
+        copy = frozen.copy()
+        self.assertIs(Expression, type(copy))
+        self.assertIs(Constraint, type(copy.elements[0]))
+        copy.add_element(Constraint('foo'))
+        self.assertEqual(str(parse_str_to_expression(FIQL_STR)),
+                         str(frozen))
+
+    def test_frozen_pickle(self):
+        frozen = parse_str_to_expression(FIQL_STR).freeze()
+        restored = pickle.loads(pickle.dumps(frozen))
+        self.assertIsInstance(restored, FrozenExpression)
+        self.assertEqual(frozen, restored)
+        self.assertIs(restored, restored.elements[1].parent)
+
+    def test_frozen_shared_between_threads(self):
+        frozen = parse_str_to_expression(FIQL_STR).freeze()
+        predicate = frozen.compile()
+        results = []
+        def work():
+            results.append((str(frozen), predicate({'last_name': 'foo*'}),
+                            frozen.elements[1].elements[0].argument_as(int)))
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(
+            [(str(parse_str_to_expression(FIQL_STR)), True, 55)] * 8,
+            results)
+
+    def test_freeze_deep_nesting(self):
+        fiql_str = 'z'
+        for level in range(3000):
+            fiql_str = 'a%d%s(%s)' % (level, ';,'[level % 2], fiql_str)
+        frozen = parse_str_to_expression(fiql_str).freeze()
+        self.assertEqual(frozen, parse_str_to_expression(fiql_str).freeze())
+        self.assertEqual(str(parse_str_to_expression(fiql_str)), str(frozen))
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Tests against the indexed document store.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import datetime
+import random
+import sys
+import unittest
+
+from fiql_parser import parse_str_to_expression, Constraint, Expression
+from fiql_parser.index import DocumentIndex
+
+
+FIQL_STRINGS = [
+    "name==foo",
+    "name!=foo",
+    "age=gt=30",
+    "age=ge=45",
+    "age=lt=45",
+    "age=le=12",
+    "age==45",
+    "age!=45",
+    "score=gt=1",
+    "active==true",
+    "active!=false",
+    "name",
+    "age",
+    "city==paris",
+    "name==foo;age=gt=30",
+    "name==foo,age=lt=18",
+    "city==paris;age=gt=30",
+    "city==paris,age=gt=30",
+    "city==paris,city==rome",
+    "(name==foo,name==bar);(age=lt=18,city==rome)",
+    "name=lt=c;(score=ge=2.5,age=le=30)",
+    "when=gt=2020",
+]
+
+
+def documents(count, seed=0):
+    rng = random.Random(seed)
+    names = ['foo', 'bar', 'baa', 'cat']
+    cities = ['paris', 'rome', None]
+    for doc_id in range(count):
+        document = {
+            'name': rng.choice(names),
+            'age': rng.choice([rng.randint(0, 90), None, '45', 45.0]),
+            'score': rng.random() * 5,
+            'active': rng.choice([True, False, 1]),
+            'city': rng.choice(cities),
+            'when': rng.choice([datetime.date(2021, 1, 1), 'x', 2021]),
+        }
+        if rng.random() < 0.1:
+            del document['name']
+        yield doc_id, document
+
+
+class TestDocumentIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.documents = dict(documents(300))
+        self.index = DocumentIndex(
+            hashed=['name', 'active', 'age'],
+            ordered=['age', 'score', 'name', 'when'])
+        for doc_id, document in self.documents.items():
+            self.index.add(doc_id, document)
+
+    def expected(self, expression):
+        predicate = expression.compile()
+        return set(doc_id for doc_id, document in self.documents.items()
+                   if predicate(document))
+
+    def test_query_matches_predicate(self):
+        for fiql_str in FIQL_STRINGS:
+            expression = parse_str_to_expression(fiql_str)
+            self.assertEqual(self.expected(expression),
+                             self.index.query(expression), fiql_str)
+
+    def test_query_constraint_and_empty(self):
+        constraint = Constraint('name', '==', 'foo')
+        self.assertEqual(self.expected(constraint),
+                         self.index.query(constraint))
+        self.assertEqual(set(self.documents),
+                         self.index.query(Expression()))
+        expression = parse_str_to_expression("name==foo;age=gt=30")
+        self.assertEqual(len(self.expected(expression)),
+                         self.index.count(expression))
+
+    def test_query_deep_nesting(self):
+        for selector in ('name', 'city'):
+            fiql_str = '%s==foo' % selector
+            for level in range(sys.getrecursionlimit() * 2):
+                fiql_str = 'city==rome%s(%s,%s)' % (
+                    ';,'[level % 2], fiql_str, 'age=lt=%d' % (level % 90))
+            expression = parse_str_to_expression(fiql_str)
+            self.assertEqual(self.expected(expression),
+                             self.index.query(expression))
+
+    def test_query_comparison_without_argument(self):
+        for constraint in (Constraint('age', '=gt='),
+                           Constraint('city', '==')):
+            self.assertEqual(set(), self.index.query(constraint))
+            self.assertEqual(set(), self.expected(constraint))
+
+    def test_incremental_updates(self):
+        expression = parse_str_to_expression("name==foo;age=gt=30")
+        for doc_id in range(0, 300, 3):
+            self.index.remove(doc_id)
+            del self.documents[doc_id]
+        self.index.add(1, {'name': 'foo', 'age': 99})
+        self.documents[1] = {'name': 'foo', 'age': 99}
+        self.index.add(1000, {'name': 'foo', 'age': 31})
+        self.documents[1000] = {'name': 'foo', 'age': 31}
+        self.assertEqual(len(self.documents), len(self.index))
+        self.assertIn(1000, self.index)
+        self.assertEqual(self.documents[1], self.index.get(1))
+        for fiql_str in FIQL_STRINGS:
+            expression = parse_str_to_expression(fiql_str)
+            self.assertEqual(self.expected(expression),
+                             self.index.query(expression), fiql_str)
+        self.assertRaises(KeyError, self.index.remove, 0)
+
+    def test_example(self):
+        index = DocumentIndex(hashed=['status'], ordered=['age'])
+        index.add(1, {'status': 'new', 'age': 45})
+        index.add(2, {'status': 'old', 'age': 12})
+        index.add(3, {'status': 'old', 'age': 30})
+        self.assertEqual(set([1, 2]), index.query(
+            parse_str_to_expression("status==new,age=lt=18")))
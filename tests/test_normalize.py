@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Tests against the normalization of expressions.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import itertools
+import sys
+import unittest
+
+from fiql_parser import (parse_str_to_expression, Constraint, Expression,
+        Operator)
+
+
+class TestNormalize(unittest.TestCase):
+
+    def test_normalize(self):
+        fiql_strings = [
+            ("a;(b;c)", "a;b;c"),
+            ("((foo))", "foo"),
+            ("c;b;a;b", "a;b;c"),
+            ("b==2;(a==1;b==2)", "a==1;b==2"),
+            ("(x,y);(y,x)", "x,y"),
+            ("a,(a;b)", "a"),
+            ("a;(a,b)", "a"),
+            ("a,b;c,d", "a,d,b;c"),
+            ("x,(a,b;c,d)", "a,d,x,b;c"),
+            ("d;(c,(b,a))", "d;(a,b,c)"),
+        ]
+        for test_str, expected_str in fiql_strings:
+            expression = parse_str_to_expression(test_str)
+            original_py = expression.to_python()
+            normalized = expression.normalize()
+            self.assertEqual(expected_str, str(normalized))
+            self.assertEqual(original_py, expression.to_python())
+            self.assertEqual(str(normalized), str(normalized.normalize()))
+
+    def test_normalize_canonical(self):
+        self.assertEqual(
+            str(parse_str_to_expression("b==2,(d;c),a==1").normalize()),
+            str(parse_str_to_expression("c;d,a==1,b==2,a==1").normalize()))
+        self.assertEqual(
+            str(parse_str_to_expression("(a,b);(c,d);e").normalize()),
+            str(parse_str_to_expression("e;(d,c);(b,a)").normalize()))
+
+    def test_normalize_constants(self):
+        expression = Expression()
+        expression.create_nested_expression()
+        expression.add_operator(Operator(';'))
+        expression.add_element(Constraint('a'))
+        self.assertEqual("a", str(expression.normalize()))
+        expression.operator = Operator(',')
+        normalized = expression.normalize()
+        self.assertEqual([], normalized.elements)
+        self.assertEqual("", str(normalized))
+        self.assertEqual("", str(Expression().normalize()))
+
+    def test_normalize_constraint(self):
+        constraint = Constraint('foo', '==', 'bar')
+        normalized = constraint.normalize()
+        self.assertIsInstance(normalized, Expression)
+        self.assertEqual("foo==bar", str(normalized))
+        self.assertIsNot(constraint, normalized.elements[0])
+
+    def test_normalize_equivalent(self):
+        fiql_str = "a==1;(b==1,(a==1;c==0)),(c==1;c==1;(b==0,a==0))"
+        expression = parse_str_to_expression(fiql_str)
+        normalized = expression.normalize()
+        predicate = expression.compile()
+        normalized_predicate = normalized.compile()
+        for values in itertools.product('01', repeat=3):
+            record = dict(zip('abc', values))
+            self.assertEqual(predicate(record), normalized_predicate(record))
+
+    def test_normalize_deep_nesting(self):
+        depth = sys.getrecursionlimit() * 2
+        fiql_str = 'z'
+        for level in range(depth):
+            fiql_str = 'a%d;(%s)' % (level, fiql_str)
+        normalized = parse_str_to_expression(fiql_str).normalize()
+        self.assertEqual(depth + 1, len(normalized.elements))
+        self.assertEqual(
+            ('a0', None, None), normalized.elements[0].to_python())
+
+    def test_normalize_deep_alternating_nesting(self):
+        depth = sys.getrecursionlimit() * 2
+        fiql_str = 'z'
+        for level in range(depth):
+            fiql_str = 'a%d%s(%s)' % (level, ';,'[level % 2], fiql_str)
+        expression = parse_str_to_expression(fiql_str)
+        normalized = expression.normalize()
+        self.assertEqual(str(expression), str(normalized))
+
+    def test_normalize_scales_with_same_operator_depth(self):
+        # Nested expressions of the same operator are only built once
+        # flattened; each element is added to a new Expression once.
+        added = []
+        add_element = Expression.add_element
+
+        def counting_add_element(expression, element):
+            added.append(element)
+            return add_element(expression, element)
+
+        for depth in (1000, 4000):
+            fiql_str = 'z'
+            for level in range(depth):
+                fiql_str = 'a%d;(%s)' % (level, fiql_str)
+            expression = parse_str_to_expression(fiql_str)
+            del added[:]
+            Expression.add_element = counting_add_element
+            try:
+                normalized = expression.normalize()
+            finally:
+                Expression.add_element = add_element
+            self.assertEqual(depth + 1, len(normalized.elements))
+            self.assertEqual(depth + 1, len(added))
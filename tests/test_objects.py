@@ -5,18 +5,31 @@ Tests against the classes representing FIQL query objects.
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
+import copy
+import datetime
+import pickle
+import sys
 import unittest
 
+try:
+    #pylint: disable=no-name-in-module
+    from urllib import quote_plus
+except ImportError:
+    #pylint: disable=import-error,no-name-in-module
+    from urllib.parse import quote_plus
+
 from fiql_parser import (Operator, Constraint, Expression,
                          FiqlObjectException)
+from fiql_parser.expression import release_builder_state, fold, walk
+from fiql_parser.constraint import _UNDECODED
 
 
 class TestObjects(unittest.TestCase):
 
     def test_operator_init(self):
-        self.assertRaisesRegexp(FiqlObjectException,
-                                "'i' is not a valid FIQL operator",
-                                Operator, 'i')
+        self.assertRaisesRegex(FiqlObjectException,
+                               "'i' is not a valid FIQL operator",
+                               Operator, 'i')
 
     def test_operator_precedence(self):
         operator_and = Operator(';')
@@ -33,6 +46,17 @@ class TestObjects(unittest.TestCase):
         self.assertEqual(operator_and, Operator(';'))
         self.assertEqual(operator_or, Operator(','))
 
+    def test_operator_interned(self):
+        self.assertIs(Operator(';'), Operator('AND'))
+        self.assertIs(Operator(','), Operator('OR'))
+        self.assertIsNot(Operator(';'), Operator(','))
+        self.assertEqual(2, Operator(';').precedence)
+        self.assertEqual(1, Operator(',').precedence)
+        self.assertIs(Operator(';'), pickle.loads(pickle.dumps(Operator(';'))))
+        self.assertIs(Operator(','), copy.deepcopy(Operator(',')))
+        self.assertRaises(AttributeError, setattr, Operator(';'), 'value', ',')
+        self.assertEqual(';', str(Operator(';')))
+
     def test_constraint_init_with_defaults(self):
         constraint = Constraint('foo')
         self.assertEqual('foo', constraint.selector)
@@ -48,9 +72,9 @@ class TestObjects(unittest.TestCase):
         self.assertEqual('foo=lt=bar', str(constraint))
 
     def test_constraint_init_invalid_comparison(self):
-        self.assertRaisesRegexp(FiqlObjectException,
-                                "'=gt' is not a valid FIQL comparison",
-                                Constraint, 'foo', '=gt', 'bar')
+        self.assertRaisesRegex(FiqlObjectException,
+                               "'=gt' is not a valid FIQL comparison",
+                               Constraint, 'foo', '=gt', 'bar')
 
     def test_constraint_init_comparison_value(self):
         constraint = Constraint('foo', '<', 'bar')
@@ -59,25 +83,89 @@ class TestObjects(unittest.TestCase):
         self.assertEqual('bar', constraint.argument)
         self.assertEqual('foo=lt=bar', str(constraint))
 
+    def test_constraint_from_encoded(self):
+        constraint = Constraint.from_encoded('foo%24', '=gt=', 'bar%23+more')
+        self.assertEqual('foo$', constraint.selector)
+        self.assertEqual('bar%23+more', constraint._encoded_argument)
+        self.assertEqual('bar# more', constraint.argument)
+        self.assertEqual('foo%24=gt=bar%23+more', str(constraint))
+        self.assertEqual(('foo$', '>', 'bar# more'),
+                         constraint.copy().to_python())
+        self.assertEqual(('foo$', '>', 'bar# more'), pickle.loads(
+            pickle.dumps(constraint)).to_python())
+        constraint.argument = 'baz'
+        self.assertIsNone(constraint._encoded_argument)
+        self.assertEqual('foo%24=gt=baz', str(constraint))
+        self.assertIsNone(Constraint.from_encoded('foo').argument)
+
+    def test_constraint_to_string_encoding(self):
+        # An argument already parsed as only unreserved characters is
+        # rendered as is, without being decoded.
+        constraint = Constraint.from_encoded('foo', '==', 'bar-1.2_~')
+        self.assertEqual('foo==bar-1.2_~', str(constraint))
+        self.assertIs(_UNDECODED, constraint._argument)
+        # Anything else is encoded just as ``quote_plus`` does.
+        for argument in ('a b', 'a*b', 'a:b', 'a%b', 'a+b', '\u00e9', ''):
+            expected = 'x%24==' + quote_plus(argument) if argument else 'x$'
+            self.assertEqual(expected, str(Constraint('x$', '==', argument)))
+            self.assertEqual(expected, str(Constraint.from_encoded(
+                'x%24', '==', quote_plus(argument))))
+
+    def test_constraint_argument_as(self):
+        self.assertEqual(42, Constraint('a', '==', '42').argument_as(int))
+        self.assertEqual(4.5, Constraint('a', '==', '4.5').argument_as(float))
+        self.assertIs(True, Constraint('a', '==', 'TRUE').argument_as(bool))
+        self.assertEqual(
+            datetime.datetime(2015, 8, 27, 10, 30, 0, 250000),
+            Constraint('a', '==', '2015-08-27T10:30:00.25').argument_as(
+                datetime.datetime))
+        aware = Constraint('a', '==', '2015-08-27T10:30:00-02:00')
+        self.assertEqual(datetime.timedelta(hours=-2),
+                         aware.argument_as(datetime.datetime).utcoffset())
+        self.assertIs(aware.argument_as(datetime.datetime),
+                      aware.argument_as(datetime.datetime))
+        self.assertEqual(
+            datetime.date(1990, 1, 1),
+            Constraint('a', '==', '1990-01-01').argument_as(datetime.date))
+        self.assertRaisesRegex(FiqlObjectException,
+                               "'x' is not a valid int",
+                               Constraint('a', '==', 'x').argument_as, int)
+        self.assertRaises(FiqlObjectException,
+                          Constraint('a', '==', '1990-01-01T00:00:00')
+                          .argument_as, datetime.date)
+        self.assertRaises(FiqlObjectException,
+                          Constraint('a', '==', '1').argument_as, complex)
+        for argument_type in (int, float, bool, datetime.datetime,
+                              datetime.date):
+            self.assertRaisesRegex(FiqlObjectException,
+                                   "'None' is not a valid %s" % (
+                                       argument_type.__name__),
+                                   Constraint('a').argument_as,
+                                   argument_type)
+        constraint = Constraint('a', '==', '1')
+        self.assertEqual(1, constraint.argument_as(int))
+        constraint.argument = '2'
+        self.assertEqual(2, constraint.argument_as(int))
+
     def test_constraint_set_parent(self):
         constraint = Constraint('foo')
         another_constraint = Constraint('bar')
-        self.assertRaisesRegexp(FiqlObjectException,
-                                "Parent must be of" +
-                                " <class 'fiql_parser.expression.Expression'>" +
-                                " not <class 'fiql_parser.constraint.Constraint'>",
-                                constraint.set_parent, another_constraint)
+        self.assertRaisesRegex(FiqlObjectException,
+                               "Parent must be of" +
+                               " <class 'fiql_parser.expression.Expression'>" +
+                               " not <class 'fiql_parser.constraint.Constraint'>",
+                               constraint.set_parent, another_constraint)
         expression = Expression()
         constraint.set_parent(expression)
         self.assertEqual(expression, constraint.parent)
 
     def test_constraint_get_parent(self):
         constraint = Constraint('foo')
-        self.assertRaisesRegexp(FiqlObjectException,
-                                "Parent must be of" +
-                                " <class 'fiql_parser.expression.Expression'>" +
-                                " not {0}".format(type(None)),
-                                constraint.get_parent)
+        self.assertRaisesRegex(FiqlObjectException,
+                               "Parent must be of" +
+                               " <class 'fiql_parser.expression.Expression'>" +
+                               " not {0}".format(type(None)),
+                               constraint.get_parent)
         expression = Expression()
         constraint.set_parent(expression)
         self.assertEqual(expression, constraint.get_parent())
@@ -90,10 +178,10 @@ class TestObjects(unittest.TestCase):
 
     def test_expression_add_operator(self):
         expression = Expression()
-        self.assertRaisesRegexp(FiqlObjectException,
-                                "<class 'fiql_parser.constraint.Constraint'>" +
-                                " is not a valid element type",
-                                expression.add_operator, Constraint('foo'))
+        self.assertRaisesRegex(FiqlObjectException,
+                               "<class 'fiql_parser.constraint.Constraint'>" +
+                               " is not a valid element type",
+                               expression.add_operator, Constraint('foo'))
         expression.add_operator(Operator(';'))
         self.assertEqual(Operator(';'), expression.operator)
         new_expression = expression.add_operator(Operator(','))
@@ -101,11 +189,38 @@ class TestObjects(unittest.TestCase):
         self.assertNotEqual(expression, new_expression)
         self.assertEqual(Operator(','), new_expression.operator)
 
+    def test_expression_add_operator_nested(self):
+        # An explicitly nested Expression keeps a lower precedence operator.
+        expression = Expression()
+        nested = expression.create_nested_expression()
+        nested.add_element(Constraint('a')).add_operator(Operator(';'))
+        nested.add_element(Constraint('b'))
+        self.assertIs(nested, nested.add_operator(Operator(',')))
+        nested.add_element(Constraint('c'))
+        self.assertEqual(['OR', ['AND', ('a', None, None),
+                                 ('b', None, None)], ('c', None, None)],
+                         nested.to_python())
+        sub_expression = nested.elements[0]
+        self.assertIs(nested, sub_expression.parent)
+        self.assertIs(sub_expression, sub_expression.elements[0].parent)
+        self.assertIsNone(expression.operator)
+        self.assertEqual("(a;b,c)", str(expression))
+        # An implicitly nested fragment leaves the operator to its parent.
+        expression = Expression().add_element(Constraint('a'))
+        expression.add_operator(Operator(','))
+        expression.add_element(Constraint('b'))
+        self.assertIs(expression, expression.add_operator(Operator(';')))
+        expression.add_element(Constraint('c'))
+        self.assertIs(expression, expression.add_operator(Operator(',')))
+        expression.add_element(Constraint('d'))
+        self.assertEqual("a,b;c,d", str(expression))
+        self.assertEqual(3, len(expression.elements))
+
     def test_expression_add_element(self):
         expression = Expression()
-        self.assertRaisesRegexp(FiqlObjectException,
-                                "{0} is not a valid element type".format(type("")),
-                                expression.add_element, 'foo')
+        self.assertRaisesRegex(FiqlObjectException,
+                               "{0} is not a valid element type".format(type("")),
+                               expression.add_element, 'foo')
         expression.add_element(Constraint('foo'))
         expression.add_element(Constraint('bar'))
         expression.add_element(Operator(';'))
@@ -129,11 +244,11 @@ class TestObjects(unittest.TestCase):
 
     def test_expression_get_parent(self):
         expression = Expression()
-        self.assertRaisesRegexp(FiqlObjectException,
-                                "Parent must be of" +
-                                " <class 'fiql_parser.expression.Expression'>" +
-                                " not {0}".format(type(None)),
-                                expression.get_parent)
+        self.assertRaisesRegex(FiqlObjectException,
+                               "Parent must be of" +
+                               " <class 'fiql_parser.expression.Expression'>" +
+                               " not {0}".format(type(None)),
+                               expression.get_parent)
         sub_expression = expression.create_nested_expression()
         self.assertEqual(expression, sub_expression.get_parent())
 
@@ -147,9 +262,9 @@ class TestObjects(unittest.TestCase):
         )
         self.assertEqual("foo==bar,age=lt=55;age=gt=5",
                          str(expression))
-        self.assertRaisesRegexp(FiqlObjectException,
-                                "{0} is not a valid element type".format(type('')),
-                                Expression().op_or, 'foo')
+        self.assertRaisesRegex(FiqlObjectException,
+                               "{0} is not a valid element type".format(type('')),
+                               Expression().op_or, 'foo')
 
     def test_constraint_fluent(self):
         expression = Constraint('foo', '==', 'bar').op_or(
@@ -207,3 +322,128 @@ class TestObjects(unittest.TestCase):
             ('bar', '>', '45'),
             ('key', None, None)
         ], expression.to_python())
+
+    def test_slotted_nodes(self):
+        for node in (Operator(';'), Constraint('foo'), Expression()):
+            self.assertFalse(hasattr(node, '__dict__'))
+        expression = Expression()
+        expression.add_element(Constraint('a'))
+        expression.add_element(Operator(','))
+        expression.add_element(Constraint('b'))
+        expression.add_element(Operator(';'))
+        expression.add_element(Constraint('c'))
+        self.assertEqual("a,b;c", str(expression))
+        release_builder_state(expression)
+        self.assertIsNone(expression._working_fragment)
+        expression.add_element(Operator(';'))
+        expression.add_element(Constraint('d'))
+        self.assertEqual("a,b;c;d", str(expression))
+
+    def test_memoized_rendering(self):
+        nested = Expression().op_or(Constraint('b', '==', '2'),
+                                    Constraint('c'))
+        expression = Expression().op_and(Constraint('a', '==', '1'), nested)
+        self.assertEqual("a==1;(b==2,c)", str(expression))
+        self.assertIs(str(expression), str(expression))
+        self.assertEqual(expression.to_python(), expression.to_python())
+        # The result is a copy; changing it does not change the kept one.
+        python = expression.to_python()
+        python[2].append(('d', None, None))
+        self.assertEqual(['AND', ('a', '==', '1'),
+                          ['OR', ('b', '==', '2'), ('c', None, None)]],
+                         expression.to_python())
+        self.assertEqual(['OR', ('b', '==', '2'), ('c', None, None)],
+                         nested.to_python())
+        self.assertEqual("(b==2,c)", str(nested))
+        # Changes drop the renderings of the changed node and those above.
+        nested.elements[0].argument = '3'
+        self.assertEqual("a==1;(b==3,c)", str(expression))
+        self.assertEqual(['AND', ('a', '==', '1'),
+                          ['OR', ('b', '==', '3'), ('c', None, None)]],
+                         expression.to_python())
+        nested.add_element(Constraint('d'))
+        self.assertEqual("a==1;(b==3,c,d)", str(expression))
+        nested.elements[1].selector = 'e'
+        nested.elements[1].comparison = '!='
+        self.assertEqual("a==1;(b==3,e,d)", str(expression))
+        expression = expression.op_or(Constraint('f'))
+        self.assertEqual("a==1;(b==3,e,d),f", str(expression))
+        # The parenthesization of a nested Expression depends on its parent.
+        expression = Expression()
+        nested = expression.create_nested_expression().op_or(
+            Constraint('a'), Constraint('b'))
+        self.assertEqual("(a,b)", str(nested))
+        expression.add_operator(Operator(','))
+        self.assertEqual("a,b", str(nested))
+        self.assertEqual(['OR', ('a', None, None), ('b', None, None)],
+                         expression.to_python())
+
+    def test_rendering_within(self):
+        innermost = Constraint('z', '==', '1')
+        expression = Expression().add_element(innermost)
+        depth = sys.getrecursionlimit() * 2
+        for level in range(depth):
+            operator = Operator(';,'[level % 2])
+            outer = Expression()
+            outer.add_element(Constraint('a%d' % level)).add_operator(
+                operator).add_element(expression)
+            expression = outer
+        fiql_str = str(expression)
+        self.assertTrue(fiql_str.startswith('a%d,a%d;(a%d,' % (
+            depth - 1, depth - 2, depth - 3)))
+        self.assertTrue(fiql_str.endswith(',a0;z==1' + ')' * (depth // 2 - 1)))
+        # Nested expressions are rendered within the outermost one; a change
+        # deep within still drops its string.
+        innermost.argument = '2'
+        self.assertEqual(fiql_str.replace('z==1', 'z==2'), str(expression))
+        # A nested Expression rendered on its own is reused.
+        nested = expression.elements[1]
+        self.assertEqual(str(expression)[len('a%d,' % (depth - 1)):],
+                         str(nested))
+        self.assertEqual(fiql_str.replace('z==1', 'z==2'), str(expression))
+
+    def test_shape_key_and_arguments(self):
+        expression = Expression().op_and(
+            Constraint('status', '==', 'new'),
+            Expression().op_or(Constraint('created', '>', '2020'),
+                               Constraint('deleted')))
+        self.assertEqual(((';', 2), 'status', '==', (',', 2),
+                          'created', '=gt=', 'deleted', None),
+                         expression.shape_key())
+        self.assertEqual(['new', '2020', None], expression.arguments())
+        other = Expression().op_and(
+            Constraint('status', '==', 'old'),
+            Expression().op_or(Constraint('created', '>', '1999'),
+                               Constraint('deleted')))
+        self.assertEqual(hash(expression.shape_key()),
+                         hash(other.shape_key()))
+        self.assertNotEqual(expression.shape_key(),
+                            Expression().op_and(
+                                Constraint('status', '==', 'new'),
+                                Constraint('created', '>', '2020'),
+                                Constraint('deleted')).shape_key())
+        self.assertEqual(('a', None), Constraint('a').shape_key())
+        self.assertEqual(['b'], Constraint('a', '==', 'b').arguments())
+
+    def test_fold_and_walk(self):
+        expression = Expression().op_and(
+            Constraint('a'),
+            Expression().op_or(Constraint('b'), Constraint('c')),
+            Constraint('d'))
+        self.assertEqual(
+            "a+(b|c)+d",
+            fold(expression, lambda constraint: constraint.selector,
+                 lambda node, parts: "(%s)" % "|".join(parts)
+                 if node.parent else "+".join(parts)))
+        self.assertEqual("a", fold(Constraint('a'), str, None))
+        self.assertEqual(
+            [expression, expression.elements[0], expression.elements[1],
+             expression.elements[1].elements[0],
+             expression.elements[1].elements[1], expression.elements[2]],
+            list(walk(expression)))
+        deep = Constraint('z')
+        for _ in range(3000):
+            deep = Expression().add_element(deep)
+        self.assertEqual(3000, fold(deep, lambda constraint: 0,
+                                    lambda node, depths: depths[0] + 1))
+        self.assertEqual(3001, len(list(walk(deep))))
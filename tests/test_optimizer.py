@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Tests against the selectivity based reordering of expressions.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import random
+import unittest
+
+from fiql_parser import parse_str_to_expression, Constraint, Expression
+from fiql_parser.optimizer import (optimize, gather_stats, SelectorStats,
+        DEFAULT_STATS)
+
+
+STATS = {
+    'a': SelectorStats(1.0, 0.9),
+    'b': SelectorStats(1.0, 0.1),
+    'c': SelectorStats(10.0, 0.5),
+}
+
+
+class TestOptimizer(unittest.TestCase):
+
+    def test_optimize_and(self):
+        expression = parse_str_to_expression("a==1;c==3;b==2")
+        plan = expression.optimize(STATS)
+        self.assertEqual("b==2;a==1;c==3", str(plan.expression))
+        self.assertEqual("a==1;c==3;b==2", str(expression))
+        self.assertAlmostEqual(0.9 * 0.5 * 0.1, plan.selectivity)
+        self.assertAlmostEqual(1 + 0.9 + 0.45, plan.checks_before)
+        self.assertAlmostEqual(1 + 0.1 + 0.09, plan.checks_after)
+        self.assertAlmostEqual(1 + 9.0 + 0.45, plan.cost_before)
+        self.assertAlmostEqual(1 + 0.1 + 0.9, plan.cost_after)
+
+    def test_optimize_or(self):
+        plan = parse_str_to_expression("b==2,a==1").optimize(STATS)
+        self.assertEqual("a==1,b==2", str(plan.expression))
+        self.assertAlmostEqual(1 - 0.1 * 0.9, plan.selectivity)
+        self.assertAlmostEqual(1.9, plan.checks_before)
+        self.assertAlmostEqual(1.1, plan.checks_after)
+
+    def test_optimize_nested(self):
+        plan = parse_str_to_expression("(a==1;c==3),b==2").optimize(STATS)
+        self.assertEqual("b==2,a==1;c==3", str(plan.expression))
+        self.assertEqual(['OR', ('b', '==', '2'),
+                          ['AND', ('a', '==', '1'), ('c', '==', '3')]],
+                         plan.expression.to_python())
+        self.assertLessEqual(plan.cost_after, plan.cost_before)
+
+    def test_optimize_mixed_nesting(self):
+        # Each nested Expression is ranked using its own Operator.
+        plan = parse_str_to_expression(
+            "(a==1;c==3;b==2),((b==2,a==1);(c==3,b==2))").optimize(STATS)
+        self.assertEqual("(a==1,b==2);(b==2,c==3),b==2;a==1;c==3",
+                         str(plan.expression))
+        self.assertLessEqual(plan.cost_after, plan.cost_before)
+
+    def test_optimize_defaults(self):
+        plan = optimize(Constraint('foo', '==', 'bar'))
+        self.assertEqual("foo==bar", str(plan.expression))
+        self.assertEqual(DEFAULT_STATS.selectivity, plan.selectivity)
+        self.assertEqual(1.0, plan.checks_after)
+        plan = optimize(Expression())
+        self.assertEqual(1.0, plan.selectivity)
+        self.assertEqual(0.0, plan.checks_after)
+        plan = optimize(parse_str_to_expression("b==2;a==1"),
+                        {'a==1': SelectorStats(1.0, 0.0)})
+        self.assertEqual("a==1;b==2", str(plan.expression))
+
+    def test_gather_stats(self):
+        rng = random.Random(0)
+        records = [{'a': rng.randint(0, 9), 'b': rng.randint(0, 1)}
+                   for _ in range(500)]
+        expression = parse_str_to_expression("b==1;a==0;a==0")
+        stats = gather_stats(expression, records)
+        self.assertEqual(set(['b==1', 'a==0']), set(stats))
+        self.assertAlmostEqual(
+            sum(1 for record in records if record['a'] == 0) / 500.0,
+            stats['a==0'].selectivity)
+        self.assertAlmostEqual(2.0, sum(s.cost for s in stats.values()))
+        plan = expression.optimize(stats)
+        self.assertEqual("a==0;a==0;b==1", str(plan.expression))
+        predicate = expression.compile()
+        optimized = plan.expression.compile()
+        for record in records:
+            self.assertEqual(predicate(record), optimized(record))
+        self.assertEqual({}, gather_stats(expression, []))
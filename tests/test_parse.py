@@ -5,10 +5,15 @@ Tests against the FIQL string parsing functions.
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
+import pickle
+import sys
 import unittest
 
 from fiql_parser import (parse_str_to_expression,
-        FiqlException)
+        FiqlException, FiqlFormatException, FiqlLimitException, ParseLimits)
+from fiql_parser.exceptions import (FiqlLengthException,
+        FiqlConstraintCountException, FiqlDepthException,
+        FiqlArgumentLengthException)
 from fiql_parser.parser import iter_parse, from_python_to_expression
 
 
@@ -24,6 +29,45 @@ class TestParse(unittest.TestCase):
                 ('))', None, None, None),
             ], list(iter_parse(fiql_str)))
 
+    def test_iter_parse_edge_cases(self):
+        self.assertEqual([], list(iter_parse('')))
+        self.assertEqual([(';;', None, None, None)], list(iter_parse(';;')))
+        self.assertEqual([
+                ('(', 'a', None, None),
+                (')', 'b', '==', 'c d'),
+            ], list(iter_parse('(a)b==c+d')))
+
+    def test_iter_parse_long_string(self):
+        fiql_str = ';'.join('f%d=gt=%d' % (i, i) for i in range(5000))
+        tokens = list(iter_parse(fiql_str))
+        self.assertEqual(5000, len(tokens))
+        self.assertEqual(('', 'f0', '=gt=', '0'), tokens[0])
+        self.assertEqual((';', 'f4999', '=gt=', '4999'), tokens[-1])
+
+    def test_iter_parse_bytes(self):
+        fiql_str = 'a==23;(b=gt=4,(c=ge=5;c%20d=lt=15+x))'
+        expected = list(iter_parse(fiql_str))
+        self.assertEqual((';', 'c d', '=lt=', '15 x'), expected[3])
+        for fiql_bytes in (fiql_str.encode('ascii'),
+                           bytearray(fiql_str.encode('ascii')),
+                           memoryview(fiql_str.encode('ascii'))):
+            self.assertEqual(expected, list(iter_parse(fiql_bytes)))
+        self.assertEqual([], list(iter_parse(b'')))
+        self.assertEqual([], list(iter_parse(memoryview(b''))))
+
+    def test_parse_bytes_to_expression(self):
+        fiql_str = 'foo%24==bar%23+more;(d=gt=2015-01-01T00:00:00Z,%C3%A9)'
+        expression = parse_str_to_expression(fiql_str.encode('ascii'))
+        self.assertEqual(str(parse_str_to_expression(fiql_str)),
+                         str(expression))
+        self.assertEqual(['AND', ('foo$', '==', 'bar# more'),
+                          ['OR', ('d', '>', '2015-01-01T00:00:00Z'),
+                           ('\u00e9', None, None)]],
+                         expression.to_python())
+        for not_fiql in (b'foo==bar;\xff', b'', b'foo==bar)'):
+            self.assertRaises(FiqlException, parse_str_to_expression,
+                              not_fiql)
+
     def test_parse_str_to_expression_pct_encoding(self):
         fiql_strings = [
             ("foo%24==bar%23+more",
@@ -114,6 +158,47 @@ class TestParse(unittest.TestCase):
             self.assertEqual(test_str, str(expression))
             self.assertEqual(expected_py, expression.to_python())
 
+    def test_parse_str_to_expression_mixed_nesting(self):
+        fiql_strings = [
+            ("a,b;c,d", "a,b;c,d",
+                ['OR', ('a', None, None), ['AND', ('b', None, None),
+                    ('c', None, None)], ('d', None, None)]),
+            ("(a;b,c);d", "(a;b,c);d",
+                ['AND', ['OR', ['AND', ('a', None, None), ('b', None, None)],
+                    ('c', None, None)], ('d', None, None)]),
+            ("a,b;(c)", "a,b;c",
+                ['OR', ('a', None, None), ['AND', ('b', None, None),
+                    ('c', None, None)]]),
+            ("x,(a,b;c,d)", "x,a,b;c,d",
+                ['OR', ('x', None, None), ['OR', ('a', None, None),
+                    ['AND', ('b', None, None), ('c', None, None)],
+                    ('d', None, None)]]),
+        ]
+        for test_str, expected_str, expected_py in fiql_strings:
+            expression = parse_str_to_expression(test_str)
+            self.assertEqual(expected_str, str(expression))
+            self.assertEqual(expected_py, expression.to_python())
+
+    def test_parse_str_to_expression_closing_nesting(self):
+        # A closing parenthesis returns to the Expression it was opened in,
+        # even when that is an implicitly nested fragment.
+        fiql_strings = [
+            ("a,b;(c)", ['OR', ('a', None, None),
+                ['AND', ('b', None, None), ('c', None, None)]]),
+            ("a,b;(c,d);e", ['OR', ('a', None, None),
+                ['AND', ('b', None, None), ['OR', ('c', None, None),
+                    ('d', None, None)], ('e', None, None)]]),
+            ("a;b,(c;d),e", ['OR', ['AND', ('a', None, None),
+                ('b', None, None)], ['AND', ('c', None, None),
+                    ('d', None, None)], ('e', None, None)]),
+        ]
+        for test_str, expected_py in fiql_strings:
+            self.assertEqual(expected_py,
+                             parse_str_to_expression(test_str).to_python())
+        self.assertRaisesRegex(FiqlFormatException,
+                               "closed without being opened",
+                               parse_str_to_expression, "a,b;(c))")
+
     def test_parse_str_to_expression_failure(self):
         not_fiql_strings = [
             "foo=bar",
@@ -126,7 +211,8 @@ class TestParse(unittest.TestCase):
             ";foo==bar",
             "foo==bar;,foo==bar",
             "foo>bar",
-            "(foo==bar)AND(foo==bar)"
+            "(foo==bar)AND(foo==bar)",
+            "(foo==bar))",
         ]
         for test_str in not_fiql_strings:
             try:
@@ -135,6 +221,72 @@ class TestParse(unittest.TestCase):
             except FiqlException:
                 pass
 
+    def test_parse_str_to_expression_error_position(self):
+        failures = [
+            ("a==1;;b==2", 5, ';', ('constraint', '(')),
+            (";a==1", 0, ';', ('constraint', '(')),
+            ("foo>bar", 3, '>', (';', ',')),
+            ("(a==1;b)(c)", 8, '(', (';', ',')),
+            ("(a==1,(b)c)", 9, 'c', (';', ',', ')')),
+            ("a==1)", 4, ')', (';', ',')),
+            ("(a==1", 5, None, (')',)),
+            (b"a%20b==1;,c", 9, ',', ('constraint', '(')),
+        ]
+        for fiql_str, position, token, expected in failures:
+            with self.assertRaises(FiqlFormatException) as context:
+                parse_str_to_expression(fiql_str)
+            error = pickle.loads(pickle.dumps(context.exception))
+            self.assertEqual((position, token, expected),
+                             (error.position, error.token, error.expected))
+            if token is not None:
+                self.assertIn("position %d" % position, str(error))
+
+    def test_parse_str_to_expression_limits(self):
+        limits = ParseLimits(max_length=40, max_constraints=4, max_depth=2,
+                             max_argument_length=5)
+        for fiql_str in ("a==1;((b==2,c==3));d", "a==12345",
+                         b"a==1;(b==2)"):
+            self.assertEqual(
+                str(parse_str_to_expression(fiql_str)),
+                str(parse_str_to_expression(fiql_str, limits)))
+        failures = [
+            ("a==1;" * 10, FiqlLengthException, 40),
+            ("a==1;b==2;c;d==4;e", FiqlConstraintCountException, 17),
+            ("a==1;(b==2,(c==3;(d)))", FiqlDepthException, 17),
+            ("a==1;(((b", FiqlDepthException, 7),
+            ("a==1;b==123456", FiqlArgumentLengthException, 8),
+        ]
+        for fiql_str, exception, position in failures:
+            with self.assertRaises(exception) as context:
+                parse_str_to_expression(fiql_str, limits)
+            self.assertEqual(position, context.exception.position)
+            self.assertIn("maximum", str(context.exception))
+            self.assertIsInstance(context.exception, FiqlLimitException)
+            self.assertIsInstance(context.exception, FiqlFormatException)
+            error = pickle.loads(pickle.dumps(context.exception))
+            self.assertIs(exception, type(error))
+            self.assertEqual(position, error.position)
+        # Rejected without scanning the remainder of the string.
+        self.assertRaises(FiqlConstraintCountException,
+                          parse_str_to_expression, "a;b;c;d" + ";;;" * 1000,
+                          ParseLimits(max_constraints=3))
+
+    def test_deep_nesting(self):
+        depth = sys.getrecursionlimit() * 2
+        fiql_str = 'z'
+        for level in range(depth):
+            fiql_str = 'a%d%s(%s)' % (level, ';,'[level % 2], fiql_str)
+        expression = parse_str_to_expression(fiql_str)
+        rendered = str(expression)
+        self.assertEqual(fiql_str.replace('(', '').replace(')', ''),
+                         rendered.replace('(', '').replace(')', ''))
+        self.assertEqual(rendered, str(parse_str_to_expression(rendered)))
+        python_obj = expression.to_python()
+        self.assertEqual(['OR', ('a%d' % (depth - 1), None, None)],
+                         python_obj[:2])
+        self.assertEqual(rendered,
+                         str(from_python_to_expression(python_obj)))
+
     def test_parse_python_to_expression(self):
         constraints = [
             'OR',
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Tests against the in-memory predicate compiler.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import datetime
+import sys
+import unittest
+
+from fiql_parser import (parse_str_to_expression, Constraint, Expression,
+        FiqlObjectException)
+
+
+RECORDS = [
+    {'name': 'foo', 'age': 45, 'score': 1.5, 'active': True},
+    {'name': 'bar', 'age': 12, 'score': 9.0, 'active': False},
+    {'name': 'baa', 'age': None},
+    {'age': 70, 'active': True},
+]
+
+
+def matching(fiql_str, records=None):
+    predicate = parse_str_to_expression(fiql_str).compile()
+    return [i for i, record in enumerate(records or RECORDS)
+            if predicate(record)]
+
+
+class TestPredicate(unittest.TestCase):
+
+    def test_constraint_comparisons(self):
+        self.assertEqual([0], matching("name==foo"))
+        self.assertEqual([1, 2], matching("name!=foo"))
+        self.assertEqual([0, 3], matching("age=gt=12"))
+        self.assertEqual([0, 1, 3], matching("age=ge=12"))
+        self.assertEqual([1], matching("age=lt=45"))
+        self.assertEqual([0, 1], matching("age=le=45"))
+        self.assertEqual([1], matching("score=gt=1.5"))
+        self.assertEqual([0, 3], matching("active==true"))
+
+    def test_constraint_without_comparison(self):
+        self.assertEqual([0, 1, 3], matching("age"))
+        self.assertEqual([0, 1], matching("score"))
+
+    def test_constraint_incomparable_values(self):
+        self.assertEqual([], matching("age==old"))
+        self.assertEqual([0], matching("name=gt=bar"))
+        self.assertEqual([], matching("score!=x"))
+
+    def test_constraint_datetime_values(self):
+        records = [
+            {'dob': datetime.date(1990, 5, 1),
+             'seen': datetime.datetime(2015, 8, 27, 10, 30)},
+            {'dob': datetime.date(1970, 1, 1),
+             'seen': datetime.datetime(2015, 8, 27, 9, 0)},
+        ]
+        self.assertEqual([0], matching("dob=gt=1980-01-01", records))
+        self.assertEqual([1], matching("dob==1970-01-01", records))
+        self.assertEqual([], matching("dob==yesterday", records))
+        self.assertEqual([0], matching("seen=ge=2015-08-27T10:00:00",
+                                       records))
+        self.assertEqual([0, 1], matching("seen=lt=2015-08-28", records))
+        self.assertEqual([], matching("seen=lt=2015-08-27T10", records))
+        # Naive and aware values can not be compared.
+        self.assertEqual([], matching("seen=lt=2015-08-28T00:00:00Z",
+                                      records))
+
+    def test_expression_operators(self):
+        self.assertEqual([0], matching("name==foo;age=gt=30"))
+        self.assertEqual([0, 1, 3], matching("name==bar,age=gt=30"))
+        self.assertEqual([0, 1], matching("name==bar,age=gt=30;score"))
+        self.assertEqual([1], matching("(name==bar,age=gt=30);age=lt=30"))
+        self.assertTrue(Expression().compile()({}))
+
+    def test_short_circuit(self):
+        calls = []
+
+        def getter(record, selector):
+            calls.append(selector)
+            return record.get(selector)
+
+        predicate = parse_str_to_expression("a==1,b==2;c==3").compile(getter)
+        self.assertTrue(predicate({'a': 1}))
+        self.assertEqual(['a'], calls)
+        del calls[:]
+        self.assertFalse(predicate({'a': 0, 'b': 0}))
+        self.assertEqual(['a', 'b'], calls)
+
+    def test_custom_comparisons(self):
+        self.assertRaisesRegex(FiqlObjectException,
+                               "'=in=' is not a supported FIQL comparison",
+                               Constraint('a', '=in=', 'x').compile)
+        predicate = Constraint('a', '=in=', 'x').compile(
+            comparisons={'=in=': lambda value, arg: arg in value})
+        self.assertTrue(predicate({'a': 'xyz'}))
+        self.assertFalse(predicate({'a': 'abc'}))
+
+    def test_deep_nesting(self):
+        depth = sys.getrecursionlimit() * 2
+        fiql_str = 'z==1'
+        for level in range(depth):
+            fiql_str = 'a%d==1%s(%s)' % (level, ';,'[level % 2], fiql_str)
+        predicate = parse_str_to_expression(fiql_str).compile()
+        # The outermost Expression is an "OR" (depth is even).
+        self.assertTrue(predicate({'a%d' % (depth - 1): 1}))
+        self.assertFalse(predicate({}))
+        # Only decided by the innermost Expression.
+        record = dict(('a%d' % level, 1) for level in range(0, depth, 2))
+        self.assertFalse(predicate(record))
+        record['z'] = 1
+        self.assertTrue(predicate(record))
+
+    def test_comparison_without_argument(self):
+        predicate = Constraint('age', '==').compile()
+        for record in RECORDS:
+            self.assertFalse(predicate(record))
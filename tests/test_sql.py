@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Tests against the SQL WHERE clause conversion.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import sqlite3
+import unittest
+
+from fiql_parser import (parse_str_to_expression, Constraint, Expression,
+        ShapeCache, FiqlObjectException)
+
+
+COLUMNS = {
+    'name': 'name',
+    'age': ('age', int),
+    'dob': 'dob',
+}
+
+ROWS = [
+    (1, 'foo', 45, '1970-01-01'),
+    (2, 'bar', 12, '2003-05-04'),
+    (3, 'baa', 33, None),
+    (4, 'foo', 70, '1945-11-30'),
+]
+
+
+class TestSql(unittest.TestCase):
+
+    def test_to_sql(self):
+        query = parse_str_to_expression(
+            "name==foo;age=gt=30,dob").to_sql(COLUMNS)
+        self.assertEqual("name = ? AND age > ? OR dob IS NOT NULL",
+                         query.sql)
+        self.assertEqual(['foo', 30], query.params)
+        query = parse_str_to_expression(
+            "name!=foo;(age=le=30,age=ge=60)").to_sql(COLUMNS)
+        self.assertEqual("name <> ? AND (age <= ? OR age >= ?)", query.sql)
+        self.assertEqual(['foo', 30, 60], query.params)
+        self.assertEqual("1 = 1", Expression().to_sql(COLUMNS).sql)
+        # Nesting which adds nothing does not hide the need for parentheses.
+        for fiql_str, expected in (
+                ("name==foo;((age=le=30,age=ge=60))",
+                 "name = ? AND (age <= ? OR age >= ?)"),
+                ("((age=le=30,age=ge=60));name==foo",
+                 "(age <= ? OR age >= ?) AND name = ?"),
+                ("((age=le=30,age=ge=60))", "age <= ? OR age >= ?"),
+                ("((name==foo;age=le=30)),dob",
+                 "name = ? AND age <= ? OR dob IS NOT NULL")):
+            self.assertEqual(
+                expected,
+                parse_str_to_expression(fiql_str).to_sql(COLUMNS).sql)
+        self.assertEqual("age < ?",
+                         Constraint('age', '<', '5').to_sql(COLUMNS).sql)
+
+    def test_to_sql_paramstyles(self):
+        expression = parse_str_to_expression("name==foo;age=lt=30")
+        self.assertEqual("name = %s AND age < %s",
+                         expression.to_sql(COLUMNS, 'format').sql)
+        self.assertEqual("name = :1 AND age < :2",
+                         expression.to_sql(COLUMNS, 'numeric').sql)
+        query = expression.to_sql(COLUMNS, 'named')
+        self.assertEqual("name = :p0 AND age < :p1", query.sql)
+        self.assertEqual({'p0': 'foo', 'p1': 30}, query.params)
+        self.assertEqual("name = %(p0)s AND age < %(p1)s",
+                         expression.to_sql(COLUMNS, 'pyformat').sql)
+
+    def test_to_sql_errors(self):
+        self.assertRaisesRegex(FiqlObjectException,
+                               "'secret' is not a filterable selector",
+                               Constraint('secret', '==', 'x').to_sql,
+                               COLUMNS)
+        self.assertRaisesRegex(FiqlObjectException,
+                               "'=in=' is not a supported FIQL comparison",
+                               Constraint('name', '=in=', 'x').to_sql,
+                               COLUMNS)
+        self.assertRaisesRegex(FiqlObjectException,
+                               "'oracle' is not a supported dialect",
+                               Constraint('name').to_sql, COLUMNS, 'oracle')
+
+    def test_fingerprint_ignores_arguments(self):
+        first = parse_str_to_expression("name==foo;age=gt=30").to_sql(COLUMNS)
+        second = parse_str_to_expression("name==bar;age=gt=5").to_sql(COLUMNS)
+        third = parse_str_to_expression("name==bar,age=gt=5").to_sql(COLUMNS)
+        self.assertEqual(first.fingerprint, second.fingerprint)
+        self.assertNotEqual(first.params, second.params)
+        self.assertNotEqual(first.fingerprint, third.fingerprint)
+
+    def test_to_sql_shape_cache(self):
+        cache = ShapeCache()
+        first = parse_str_to_expression("name==foo;dob;age=gt=30").to_sql(
+            COLUMNS, cache=cache)
+        second = parse_str_to_expression("name==bar;dob;age=gt=5").to_sql(
+            COLUMNS, cache=cache)
+        named = parse_str_to_expression("name==bar;dob;age=gt=5").to_sql(
+            COLUMNS, 'named', cache=cache)
+        self.assertEqual("name = ? AND dob IS NOT NULL AND age > ?",
+                         second.sql)
+        self.assertEqual(['foo', 30], first.params)
+        self.assertEqual(['bar', 5], second.params)
+        self.assertEqual({'p0': 'bar', 'p1': 5}, named.params)
+        self.assertEqual((1, 2, 0, 128, 2), tuple(cache.info()))
+
+    def test_to_sql_sqlite(self):
+        connection = sqlite3.connect(':memory:')
+        connection.execute(
+            "CREATE TABLE users (id INTEGER, name TEXT, age INTEGER, dob TEXT)")
+        connection.executemany("INSERT INTO users VALUES (?, ?, ?, ?)", ROWS)
+        fiql_strings = [
+            ("name==foo", [1, 4]),
+            ("name==foo;age=lt=50", [1]),
+            ("name==bar,age=gt=60", [2, 4]),
+            ("dob;(age=lt=20,age=gt=60)", [2, 4]),
+            ("dob=lt=1980-01-01,name==baa", [1, 3, 4]),
+            ("name==bar;((age=gt=60,dob))", [2]),
+            ("((age=gt=60,dob));name==bar", [2]),
+        ]
+        for fiql_str, expected in fiql_strings:
+            query = parse_str_to_expression(fiql_str).to_sql(COLUMNS)
+            rows = connection.execute(
+                "SELECT id FROM users WHERE " + query.sql + " ORDER BY id",
+                query.params).fetchall()
+            self.assertEqual(expected, [row[0] for row in rows])
+        connection.close()
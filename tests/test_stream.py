@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Tests against the streaming filter pipeline.
+"""
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import io
+import json
+import unittest
+
+from fiql_parser import (parse_str_to_expression, FilterStats, filter_iter,
+        iter_json_lines)
+
+
+RECORDS = [
+    {'name': 'foo', 'age': 45},
+    {'name': 'bar   baa', 'age': 12},
+    {'name': 'baa', 'age': 33},
+]
+
+
+class TestStream(unittest.TestCase):
+
+    def test_filter_iter_is_lazy(self):
+        def records():
+            for record in RECORDS:
+                yield record
+            self.fail("Input consumed past the first match")
+        matches = filter_iter(parse_str_to_expression("age=gt=40"),
+                              records())
+        self.assertEqual(RECORDS[0], next(matches))
+
+    def test_filter_iter_stats(self):
+        stats = FilterStats()
+        matches = list(filter_iter(parse_str_to_expression("age=lt=40"),
+                                   iter(RECORDS), stats))
+        self.assertEqual(RECORDS[1:], matches)
+        self.assertEqual(3, stats.scanned)
+        self.assertEqual(2, stats.matched)
+        self.assertIsNotNone(stats.finished)
+        self.assertGreaterEqual(stats.scanned_per_second,
+                                stats.matched_per_second)
+        self.assertIn("scanned 3", str(stats))
+
+    def test_iter_json_lines(self):
+        content = "\n".join(json.dumps(record) for record in RECORDS)
+        content = content + "\n\n"
+        for chunk_size in (1, 7, 65536):
+            self.assertEqual(RECORDS, list(iter_json_lines(
+                io.StringIO(content), chunk_size)))
+            self.assertEqual(RECORDS, list(iter_json_lines(
+                io.BytesIO(content.encode('utf-8')), chunk_size)))
+        self.assertEqual(RECORDS, list(iter_json_lines(
+            io.StringIO(content.rstrip()), 5)))